@@ -0,0 +1,29 @@
+"""Headless batch processing of the Spectra app.
+
+Applies the chain of steps in `batch.steps` to every file of a folder,
+using the smooth, baseline and peaks settings of src/conf/config.yaml:
+
+    python batch.py batch.input=<folder> batch.output=<folder>
+
+Never imports PyQt5, matplotlib or seaborn.
+"""
+
+import hydra
+from hydra.core.config_store import ConfigStore
+
+from src.classes.config import Config
+from src.functions.batch import run_batch
+
+cs = ConfigStore.instance()
+# Registering the Config class.
+cs.store(name="spectra_config", node=Config)
+
+
+@hydra.main(version_base=None, config_path="src/conf", config_name="config")
+def main(cfg: Config) -> None:
+    """Main function of the batch processing."""
+    run_batch(cfg)
+
+
+if __name__ == "__main__":
+    main()
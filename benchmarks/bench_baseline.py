@@ -0,0 +1,84 @@
+"""Benchmark of the banded AsLS engine against the sparse solver.
+
+Run from the root folder with:
+
+    python -m benchmarks.bench_baseline
+    python -m benchmarks.bench_baseline --sizes 1000 10000 --repeat 5
+
+"""
+
+import argparse
+import time
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse import linalg
+
+from src.functions.asls import asls
+from src.functions.asls import penalty_bands
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+
+
+def asls_sparse(y: np.ndarray, lam: float, p: float, niter: int) -> np.ndarray:
+    """The previous implementation using a general sparse solver."""
+    L = len(y)
+    D = sparse.diags([1, -2, 1], [0, -1, -2], shape=(L, L - 2))
+    D = lam * D.dot(D.transpose())
+    w = np.ones(L)
+    W = sparse.spdiags(w, 0, L, L)
+    for _ in range(niter):
+        W.setdiag(w)
+        Z = W + D
+        z = linalg.spsolve(Z, w * y)
+        w = p * (y > z) + (1 - p) * (y < z)
+    return z
+
+
+def synthetic_spectrum(size: int, seed: int = 0) -> np.ndarray:
+    """Returns a Raman-like spectrum with a curved baseline and noise."""
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0, 1, size)
+    y = 5 * x**2 + 2 * x
+    for center in rng.uniform(0.05, 0.95, 12):
+        y += rng.uniform(1, 10) * np.exp(-((x - center) ** 2) / 2e-5)
+    return y + rng.normal(0, 0.05, size)
+
+
+def timeit(func, *args, repeat: int = 3) -> float:
+    """Returns the best wall time of `repeat` calls in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--lam", type=float, default=10000)
+    parser.add_argument("--p", type=float, default=0.001)
+    parser.add_argument("--niter", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    params = (args.lam, args.p, args.niter)
+    print(f"{'points':>10} {'sparse (s)':>12} {'banded (s)':>12} {'speedup':>9} {'max |diff|':>11}")
+    for size in args.sizes:
+        y = synthetic_spectrum(size)
+        penalty_bands.cache_clear()
+
+        t_sparse = timeit(asls_sparse, y, *params, repeat=args.repeat)
+        t_banded = timeit(asls, y, *params, repeat=args.repeat)
+        diff = np.abs(asls_sparse(y, *params) - asls(y, *params)).max()
+
+        print(
+            f"{size:>10} {t_sparse:>12.4f} {t_banded:>12.4f} "
+            f"{t_sparse / t_banded:>8.1f}x {diff:>11.2e}"
+        )
+
+
+if __name__ == "__main__":
+    main()
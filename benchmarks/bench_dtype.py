@@ -0,0 +1,72 @@
+"""Benchmark of the float32 data mode against float64.
+
+Run from the root folder with:
+
+    python -m benchmarks.bench_dtype
+    python -m benchmarks.bench_dtype --rows 100 --points 10000 --repeat 5
+
+"""
+
+import argparse
+
+import numpy as np
+from omegaconf import OmegaConf
+
+from src.classes.store import SpectrumStore
+from src.functions.kernels import asls_rows
+from src.functions.kernels import min_max_rows
+from src.functions.kernels import peaks_indices
+from src.functions.kernels import savgol_rows
+from src.functions.kernels import z_score_rows
+
+from .bench_baseline import synthetic_spectrum
+from .bench_baseline import timeit
+
+
+def chain(y: np.ndarray, cfg) -> np.ndarray:
+    """Smoothing, baseline and Min-Max Normalization, as in the GUI."""
+    y = savgol_rows(y, cfg.smooth)
+    y = asls_rows(y, cfg.baseline)
+    return min_max_rows(y)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20)
+    parser.add_argument("--points", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    cfg = OmegaConf.load("src/conf/config.yaml")
+    y64 = np.stack([synthetic_spectrum(args.points, seed) for seed in range(args.rows)])
+    x = np.linspace(0, 1, args.points)
+
+    results = {}
+    for dtype in ("float64", "float32"):
+        store = SpectrumStore([(x, row) for row in y64], dtype)
+        y = store.y.reshape(args.rows, args.points)
+        results[dtype] = {
+            "store (MB)": store.nbytes / 2**20,
+            "smooth (s)": timeit(savgol_rows, y, cfg.smooth, repeat=args.repeat),
+            "baseline (s)": timeit(asls_rows, y, cfg.baseline, repeat=args.repeat),
+            "min-max (s)": timeit(min_max_rows, y, repeat=args.repeat),
+            "z-score (s)": timeit(z_score_rows, y, repeat=args.repeat),
+            "chain": chain(y, cfg),
+            "peaks": [peaks_indices(row, cfg.peaks) for row in chain(y, cfg)],
+        }
+
+    print(f"{args.rows} spectra of {args.points} points")
+    print(f"{'':>14} {'float64':>10} {'float32':>10}")
+    for key in ("store (MB)", "smooth (s)", "baseline (s)", "min-max (s)", "z-score (s)"):
+        print(f"{key:>14} {results['float64'][key]:>10.4f} {results['float32'][key]:>10.4f}")
+
+    diff = np.abs(results["float64"]["chain"] - results["float32"]["chain"]).max()
+    pairs = list(zip(results["float64"]["peaks"], results["float32"]["peaks"]))
+    common = sum(np.intersect1d(p64, p32).size for p64, p32 in pairs)
+    total = sum(np.union1d(p64, p32).size for p64, p32 in pairs)
+    print(f"max |diff| after smooth, baseline and min-max: {diff:.2e}")
+    print(f"peaks found in both modes: {common / max(total, 1):.1%} of {total}")
+
+
+if __name__ == "__main__":
+    main()
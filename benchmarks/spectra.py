@@ -0,0 +1,59 @@
+"""Synthetic Raman, IR and XRF-like spectra for the benchmarks."""
+
+from typing import Callable
+
+import numpy as np
+
+
+def raman_spectrum(size: int, seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    """Lorentzian bands over a fluorescence background, 100-3200 cm⁻¹."""
+    rng = np.random.default_rng(seed)
+    x = np.linspace(100, 3200, size)
+    y = 200 * np.exp(-x / 1500) + 0.01 * x
+    for center, width, height in zip(
+        rng.uniform(200, 3100, 15), rng.uniform(4, 15, 15), rng.uniform(20, 500, 15)
+    ):
+        y += height / (1 + ((x - center) / width) ** 2)
+    return x, y + rng.normal(0, 2, size)
+
+
+def ir_spectrum(size: int, seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    """Transmittance (%) with broad absorption bands, decreasing 4000-400 cm⁻¹."""
+    rng = np.random.default_rng(seed)
+    x = np.linspace(4000, 400, size)
+    absorbance = 0.02 + 0.00001 * (4000 - x)
+    for center, width, depth in zip(
+        rng.uniform(500, 3900, 10), rng.uniform(10, 80, 10), rng.uniform(0.1, 1.5, 10)
+    ):
+        absorbance += depth * np.exp(-(((x - center) / width) ** 2))
+    return x, 100 * 10**-absorbance + rng.normal(0, 0.2, size)
+
+
+def xrf_spectrum(size: int, seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    """Gaussian lines over a bremsstrahlung continuum, 0.1-40 keV, with counting noise."""
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0.1, 40, size)
+    counts = 50 * (45 - x) / x
+    for center, area in zip(rng.uniform(1, 38, 12), rng.uniform(1e3, 5e4, 12)):
+        # The detector resolution grows with the energy
+        sigma = np.sqrt(0.0025 + 0.0001 * center)
+        peak = np.exp(-((x - center) ** 2) / (2 * sigma**2)) / (sigma * np.sqrt(2 * np.pi))
+        counts += area * peak / 100
+    return x, rng.poisson(np.clip(counts, 0, None)).astype(np.float64)
+
+
+KINDS: dict[str, Callable[[int, int], tuple[np.ndarray, np.ndarray]]] = {
+    "raman": raman_spectrum,
+    "ir": ir_spectrum,
+    "xrf": xrf_spectrum,
+}
+
+
+def spectra_batch(
+    kind: str, size: int, batch: int, seed: int = 0
+) -> list[tuple[np.ndarray, np.ndarray]]:
+    """Returns `batch` spectra of one kind, differing by their noise."""
+    x, y = KINDS[kind](size, seed)
+    rng = np.random.default_rng(seed + 1)
+    scale = 0.01 * np.std(y)
+    return [(x, y + rng.normal(0, scale, size)) for _ in range(batch)]
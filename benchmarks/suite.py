@@ -0,0 +1,309 @@
+"""Benchmark suite of the spectra processing and data loading functions.
+
+Runs headless (matplotlib Agg, no Qt) on synthetic Raman, IR and
+XRF-like spectra, records the throughput and the peak memory of each
+case in a JSON file and flags the regressions against a stored baseline.
+
+Run from the root folder with:
+
+    python -m benchmarks.suite
+    python -m benchmarks.suite --preset full
+    python -m benchmarks.suite --steps baseline --kinds xrf --sizes 100000
+    python -m benchmarks.suite --save-baseline
+
+The exit status is 1 if a case is slower, or uses more memory, than
+in the baseline by more than the tolerance. The baseline is specific
+to a machine and is not committed: store one with --save-baseline
+first. A baseline from another machine is not compared.
+"""
+
+import os
+
+# Headless, before anything imports matplotlib
+os.environ["MPLBACKEND"] = "Agg"
+
+import argparse
+import datetime
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Optional
+
+import numpy as np
+from matplotlib.figure import Figure
+from omegaconf import DictConfig
+from omegaconf import OmegaConf
+
+from src.classes.peaks import PeakLayer
+from src.classes.spectra import Spectrum
+from src.functions.data_process import csv_to_arrays
+from src.functions.data_process import csv_to_dataframe
+from src.functions.spectra_process import BATCH_FUNCTIONS
+from src.functions.spectra_process import baseline
+from src.functions.spectra_process import norm_min_max
+from src.functions.spectra_process import norm_z
+from src.functions.spectra_process import peaks_find
+from src.functions.spectra_process import process_batch
+from src.functions.spectra_process import smoothing
+
+from .spectra import KINDS
+from .spectra import spectra_batch
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+BATCHES = [1, 10, 100, 1_000, 10_000]
+
+# Largest number of points (size x batch) of a case
+PRESETS = {"quick": 2_000_000, "full": 100_000_000}
+
+PROCESS_STEPS = {
+    "smoothing": smoothing,
+    "baseline": baseline,
+    "peaks_find": peaks_find,
+    "norm_min_max": norm_min_max,
+    "norm_z": norm_z,
+}
+LOAD_STEPS = ["csv_to_dataframe", "csv_to_arrays", "csv_to_arrays_cached"]
+STEPS = list(PROCESS_STEPS) + LOAD_STEPS
+
+RESULTS = "benchmarks/results.json"
+BASELINE = "benchmarks/baseline.json"
+
+
+class HeadlessCanvas:
+    """The parts of the Canvas used by `peaks_find`, without Qt."""
+
+    def __init__(self) -> None:
+        self.fig = Figure()
+        self.axes = self.fig.add_subplot(111)
+        self.peak_layer = PeakLayer(self.axes)
+
+
+def process_case(
+    step: str, data: list[tuple[np.ndarray, np.ndarray]], cfg: DictConfig
+) -> Callable[[], None]:
+    """Returns a run of the step over the spectra, as called by the GUI."""
+    function = PROCESS_STEPS[step]
+    spectra = Spectrum.from_arrays([(x, y, f"s{i}") for i, (x, y) in enumerate(data)])
+    params = {
+        "smoothing": cfg.smooth,
+        "baseline": cfg.baseline,
+        "norm_min_max": None,
+        "norm_z": None,
+    }.get(step)
+
+    def run() -> None:
+        # Every run starts from the original data
+        for sp in spectra:
+            sp.y_data = sp.y_orig
+
+        if function is peaks_find:
+            canvas = HeadlessCanvas()
+            for sp in spectra:
+                function(sp, [cfg.peaks, canvas])
+        elif function in BATCH_FUNCTIONS and len(spectra) > 1:
+            process_batch(function, spectra, params)
+        else:
+            for sp in spectra:
+                function(sp, params)
+
+    return run
+
+
+def write_csv(data: list[tuple[np.ndarray, np.ndarray]], folder: str) -> list[str]:
+    """Writes the spectra as CSV files and returns their paths."""
+    import pandas as pd
+
+    files = []
+    for i, (x, y) in enumerate(data):
+        path = os.path.join(folder, f"spectrum_{i}.csv")
+        pd.DataFrame({"x": x, "y": y}).to_csv(path, index=False)
+        files.append(path)
+    return files
+
+
+def load_case(step: str, files: list[str], folder: str) -> Callable[[], None]:
+    """Returns a run reading the CSV files."""
+    cache = os.path.join(folder, f"cache_{step}")
+
+    def run() -> None:
+        for path in files:
+            if step == "csv_to_dataframe":
+                csv_to_dataframe(path, sep=",", engine="c")
+            elif step == "csv_to_arrays":
+                csv_to_arrays(path, sep=",", engine="c")
+            else:
+                csv_to_arrays(path, sep=",", engine="c", cache_dir=cache)
+
+    if step == "csv_to_arrays_cached":
+        # Fill the cache before the timed runs
+        run()
+    return run
+
+
+def measure(run: Callable[[], None], repeat: int) -> tuple[float, float]:
+    """Returns the best wall time in seconds and the peak memory in MB.
+    The memory is traced in a separate run, tracing slows down the code.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+        # A single run is enough for the slow cases
+        if best > 2:
+            break
+
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak / 2**20
+
+
+def case_key(result: dict) -> str:
+    return f"{result['step']}/{result['kind']}/{result['points']}x{result['batch']}"
+
+
+def run_suite(args: argparse.Namespace, cfg: DictConfig) -> list[dict]:
+    """Runs every case within the size limit of the preset."""
+    limit = PRESETS[args.preset]
+    results = []
+    for kind in args.kinds:
+        for size in args.sizes:
+            for batch in args.batches:
+                if size * batch > limit:
+                    continue
+                data = spectra_batch(kind, size, batch)
+                folder = tempfile.TemporaryDirectory()
+                files = None
+                for step in args.steps:
+                    if step in PROCESS_STEPS:
+                        run = process_case(step, data, cfg)
+                    else:
+                        if files is None:
+                            files = write_csv(data, folder.name)
+                        run = load_case(step, files, folder.name)
+                    seconds, peak_mb = measure(run, args.repeat)
+
+                    result = {
+                        "step": step,
+                        "kind": kind,
+                        "points": size,
+                        "batch": batch,
+                        "seconds": seconds,
+                        "points_per_s": size * batch / seconds,
+                        "spectra_per_s": batch / seconds,
+                        "peak_mb": peak_mb,
+                    }
+                    results.append(result)
+                    print(
+                        f"{case_key(result):<40} {seconds:>10.4f} s "
+                        f"{result['points_per_s']:>12.3g} pts/s {peak_mb:>9.1f} MB",
+                        flush=True,
+                    )
+                folder.cleanup()
+    return results
+
+
+def compare(
+    results: list[dict], baseline: list[dict], tolerance: float
+) -> list[tuple[str, str, float, float]]:
+    """Returns the (case, metric, baseline, new) values worse than the baseline."""
+    previous = {case_key(result): result for result in baseline}
+    regressions = []
+    for result in results:
+        old = previous.get(case_key(result))
+        if old is None:
+            continue
+        for metric in ("seconds", "peak_mb"):
+            # Ignore differences below the timer and allocator noise
+            floor = 1e-3 if metric == "seconds" else 1.0
+            if result[metric] > max(old[metric] * (1 + tolerance), old[metric] + floor):
+                regressions.append((case_key(result), metric, old[metric], result[metric]))
+    return regressions
+
+
+def metadata(args: argparse.Namespace) -> dict:
+    import scipy
+    import pandas as pd
+
+    return {
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "preset": args.preset,
+        "repeat": args.repeat,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "scipy": scipy.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpus": os.cpu_count(),
+    }
+
+
+# Metadata that must match for the timings to be comparable
+MACHINE = ("platform", "processor", "cpus")
+
+
+def same_machine(meta: dict, baseline_meta: dict) -> bool:
+    return all(meta.get(key) == baseline_meta.get(key) for key in MACHINE)
+
+
+def main() -> Optional[int]:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--preset", choices=PRESETS, default="quick")
+    parser.add_argument("--kinds", nargs="+", choices=KINDS, default=list(KINDS))
+    parser.add_argument("--steps", nargs="+", choices=STEPS, default=STEPS)
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--batches", type=int, nargs="+", default=BATCHES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default=RESULTS)
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="Store the results as the baseline"
+    )
+    args = parser.parse_args()
+
+    cfg = OmegaConf.load("src/conf/config.yaml")
+    results = run_suite(args, cfg)
+
+    # Only the processing and loading code should have been imported
+    assert "PyQt5" not in sys.modules
+    report = {"meta": metadata(args), "results": results}
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=1)
+    print(f"\n{len(results)} cases written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=1)
+        print(f"Baseline stored in {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline in {args.baseline}, run with --save-baseline to store one")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if not same_machine(report["meta"], baseline["meta"]):
+        print(
+            f"WARNING: {args.baseline} was stored on another machine "
+            f"({', '.join(str(baseline['meta'].get(key)) for key in MACHINE)}), "
+            "not compared. Run with --save-baseline to store one for this machine"
+        )
+        return 0
+    regressions = compare(results, baseline["results"], args.tolerance)
+    for case, metric, old, new in regressions:
+        print(f"REGRESSION {case:<40} {metric:<8} {old:>10.4f} -> {new:>10.4f}")
+    print(f"{len(regressions)} regressions (tolerance {args.tolerance:.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,14 +2,24 @@
 
 import sys
 
+# First, times the imports below
+from src.functions.startup import timer
+
 import hydra
 from hydra.core.config_store import ConfigStore
 
+timer.mark("import hydra")
+
+from PyQt5 import QtCore
 from PyQt5 import QtWidgets
 
+timer.mark("import PyQt5")
+
 from src.classes.config import Config
 from src.gui.main_window import QtMain
 
+timer.mark("import app modules")
+
 cs = ConfigStore.instance()
 # Registering the Config class.
 cs.store(name="spectra_config", node=Config)
@@ -18,12 +28,25 @@ cs.store(name="spectra_config", node=Config)
 @hydra.main(version_base=None, config_path="src/conf", config_name="config")
 def main(cfg: Config) -> None:
     """Main function of the Spectra app that executes the program."""
+    timer.mark("config (hydra)")
+
     # Load the program
     app = QtWidgets.QApplication(sys.argv)
+    timer.mark("QApplication")
     window = QtMain(settings=cfg)
     window.show()
+
+    if cfg.general.profile_startup:
+        # Runs once the window is shown and the event loop is idle
+        QtCore.QTimer.singleShot(0, report_startup)
     app.exec_()
 
 
+def report_startup() -> None:
+    """Prints the time of each step of the start."""
+    timer.mark("first paint")
+    print(timer.report())
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+
+# Form implementation generated from reading ui file 'src/UI/main.ui'
+#
+# Created by: PyQt5 UI code generator 5.15.11
+#
+# WARNING: Any manual changes made to this file will be lost when pyuic5 is
+# run again.  Do not edit this file unless you know what you are doing.
+
+
+from PyQt5 import QtCore, QtGui, QtWidgets
+
+
+class Ui_MainWindow(object):
+    def setupUi(self, MainWindow):
+        MainWindow.setObjectName("MainWindow")
+        MainWindow.resize(1130, 657)
+        self.centralwidget = QtWidgets.QWidget(MainWindow)
+        self.centralwidget.setObjectName("centralwidget")
+        self.gridLayout = QtWidgets.QGridLayout(self.centralwidget)
+        self.gridLayout.setObjectName("gridLayout")
+        self.verticalLayout_3 = QtWidgets.QVBoxLayout()
+        self.verticalLayout_3.setObjectName("verticalLayout_3")
+        self.graph_widget = QtWidgets.QWidget(self.centralwidget)
+        self.graph_widget.setEnabled(True)
+        self.graph_widget.setObjectName("graph_widget")
+        self.verticalLayout_3.addWidget(self.graph_widget)
+        self.main_layout = QtWidgets.QGridLayout()
+        self.main_layout.setSpacing(10)
+        self.main_layout.setObjectName("main_layout")
+        spacerItem = QtWidgets.QSpacerItem(40, 20, QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Minimum)
+        self.main_layout.addItem(spacerItem, 0, 0, 1, 8)
+        self.verticalLayout_5 = QtWidgets.QVBoxLayout()
+        self.verticalLayout_5.setObjectName("verticalLayout_5")
+        self.button_reverse_y = QtWidgets.QPushButton(self.centralwidget)
+        self.button_reverse_y.setObjectName("button_reverse_y")
+        self.verticalLayout_5.addWidget(self.button_reverse_y)
+        self.button_reverse_x = QtWidgets.QPushButton(self.centralwidget)
+        self.button_reverse_x.setEnabled(True)
+        self.button_reverse_x.setMinimumSize(QtCore.QSize(101, 0))
+        self.button_reverse_x.setObjectName("button_reverse_x")
+        self.verticalLayout_5.addWidget(self.button_reverse_x)
+        self.button_normalize = QtWidgets.QPushButton(self.centralwidget)
+        self.button_normalize.setObjectName("button_normalize")
+        self.verticalLayout_5.addWidget(self.button_normalize)
+        self.button_normalize_z = QtWidgets.QPushButton(self.centralwidget)
+        self.button_normalize_z.setObjectName("button_normalize_z")
+        self.verticalLayout_5.addWidget(self.button_normalize_z)
+        self.main_layout.addLayout(self.verticalLayout_5, 1, 4, 1, 1)
+        self.lineEdit_prominence = QtWidgets.QLineEdit(self.centralwidget)
+        self.lineEdit_prominence.setText("")
+        self.lineEdit_prominence.setObjectName("lineEdit_prominence")
+        self.main_layout.addWidget(self.lineEdit_prominence, 2, 3, 1, 2)
+        self.button_change = QtWidgets.QPushButton(self.centralwidget)
+        self.button_change.setObjectName("button_change")
+        self.main_layout.addWidget(self.button_change, 2, 5, 1, 1)
+        self.horizontalLayout_3 = QtWidgets.QHBoxLayout()
+        self.horizontalLayout_3.setObjectName("horizontalLayout_3")
+        self.dropbox_lbl = QtWidgets.QComboBox(self.centralwidget)
+        self.dropbox_lbl.setEditable(False)
+        self.dropbox_lbl.setObjectName("dropbox_lbl")
+        self.dropbox_lbl.addItem("")
+        self.dropbox_lbl.addItem("")
+        self.dropbox_lbl.addItem("")
+        self.dropbox_lbl.addItem("")
+        self.dropbox_lbl.addItem("")
+        self.dropbox_lbl.addItem("")
+        self.dropbox_lbl.addItem("")
+        self.dropbox_lbl.addItem("")
+        self.dropbox_lbl.addItem("")
+        self.horizontalLayout_3.addWidget(self.dropbox_lbl)
+        self.button_lbl = QtWidgets.QPushButton(self.centralwidget)
+        self.button_lbl.setObjectName("button_lbl")
+        self.horizontalLayout_3.addWidget(self.button_lbl)
+        self.main_layout.addLayout(self.horizontalLayout_3, 2, 0, 1, 1)
+        self.verticalLayout_4 = QtWidgets.QVBoxLayout()
+        self.verticalLayout_4.setObjectName("verticalLayout_4")
+        self.button_load = QtWidgets.QPushButton(self.centralwidget)
+        self.button_load.setObjectName("button_load")
+        self.verticalLayout_4.addWidget(self.button_load)
+        self.button_save_as = QtWidgets.QPushButton(self.centralwidget)
+        self.button_save_as.setObjectName("button_save_as")
+        self.verticalLayout_4.addWidget(self.button_save_as)
+        self.button_settings = QtWidgets.QPushButton(self.centralwidget)
+        self.button_settings.setObjectName("button_settings")
+        self.verticalLayout_4.addWidget(self.button_settings)
+        self.button_edit = QtWidgets.QPushButton(self.centralwidget)
+        self.button_edit.setObjectName("button_edit")
+        self.verticalLayout_4.addWidget(self.button_edit)
+        self.main_layout.addLayout(self.verticalLayout_4, 1, 5, 1, 1)
+        spacerItem1 = QtWidgets.QSpacerItem(20, 40, QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Expanding)
+        self.main_layout.addItem(spacerItem1, 1, 6, 2, 1)
+        self.horizontalLayout_2 = QtWidgets.QHBoxLayout()
+        self.horizontalLayout_2.setObjectName("horizontalLayout_2")
+        self.button_save_table = QtWidgets.QPushButton(self.centralwidget)
+        self.button_save_table.setObjectName("button_save_table")
+        self.horizontalLayout_2.addWidget(self.button_save_table)
+        self.button_clear_table = QtWidgets.QPushButton(self.centralwidget)
+        self.button_clear_table.setObjectName("button_clear_table")
+        self.horizontalLayout_2.addWidget(self.button_clear_table)
+        self.main_layout.addLayout(self.horizontalLayout_2, 2, 1, 1, 1)
+        spacerItem2 = QtWidgets.QSpacerItem(20, 40, QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Expanding)
+        self.main_layout.addItem(spacerItem2, 1, 2, 2, 1)
+        self.scrollArea = QtWidgets.QScrollArea(self.centralwidget)
+        self.scrollArea.setWidgetResizable(True)
+        self.scrollArea.setObjectName("scrollArea")
+        self.scrollAreaWidgetContents = QtWidgets.QWidget()
+        self.scrollAreaWidgetContents.setGeometry(QtCore.QRect(0, 0, 363, 245))
+        self.scrollAreaWidgetContents.setObjectName("scrollAreaWidgetContents")
+        self.gridLayout_2 = QtWidgets.QGridLayout(self.scrollAreaWidgetContents)
+        self.gridLayout_2.setObjectName("gridLayout_2")
+        spacerItem3 = QtWidgets.QSpacerItem(20, 40, QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Expanding)
+        self.gridLayout_2.addItem(spacerItem3, 1, 1, 1, 1)
+        self.table = QtWidgets.QTableWidget(self.scrollAreaWidgetContents)
+        self.table.setObjectName("table")
+        self.table.setColumnCount(2)
+        self.table.setRowCount(0)
+        item = QtWidgets.QTableWidgetItem()
+        item.setTextAlignment(QtCore.Qt.AlignCenter)
+        self.table.setHorizontalHeaderItem(0, item)
+        item = QtWidgets.QTableWidgetItem()
+        item.setTextAlignment(QtCore.Qt.AlignCenter)
+        self.table.setHorizontalHeaderItem(1, item)
+        self.gridLayout_2.addWidget(self.table, 1, 0, 1, 1)
+        self.formLayout = QtWidgets.QFormLayout()
+        self.formLayout.setObjectName("formLayout")
+        self.lbl_move_axis = QtWidgets.QLabel(self.scrollAreaWidgetContents)
+        font = QtGui.QFont()
+        font.setStyleStrategy(QtGui.QFont.PreferDefault)
+        self.lbl_move_axis.setFont(font)
+        self.lbl_move_axis.setAlignment(QtCore.Qt.AlignCenter)
+        self.lbl_move_axis.setObjectName("lbl_move_axis")
+        self.formLayout.setWidget(1, QtWidgets.QFormLayout.SpanningRole, self.lbl_move_axis)
+        self.lbl_move_axis_x = QtWidgets.QLabel(self.scrollAreaWidgetContents)
+        font = QtGui.QFont()
+        font.setStyleStrategy(QtGui.QFont.PreferDefault)
+        self.lbl_move_axis_x.setFont(font)
+        self.lbl_move_axis_x.setAlignment(QtCore.Qt.AlignCenter)
+        self.lbl_move_axis_x.setObjectName("lbl_move_axis_x")
+        self.formLayout.setWidget(2, QtWidgets.QFormLayout.LabelRole, self.lbl_move_axis_x)
+        self.doubleSpinBox_x_axis = QtWidgets.QDoubleSpinBox(self.scrollAreaWidgetContents)
+        self.doubleSpinBox_x_axis.setDecimals(4)
+        self.doubleSpinBox_x_axis.setMinimum(-9999.99)
+        self.doubleSpinBox_x_axis.setMaximum(99999.99)
+        self.doubleSpinBox_x_axis.setSingleStep(0.01)
+        self.doubleSpinBox_x_axis.setObjectName("doubleSpinBox_x_axis")
+        self.formLayout.setWidget(2, QtWidgets.QFormLayout.FieldRole, self.doubleSpinBox_x_axis)
+        self.lbl_move_axis_y = QtWidgets.QLabel(self.scrollAreaWidgetContents)
+        font = QtGui.QFont()
+        font.setStyleStrategy(QtGui.QFont.PreferDefault)
+        self.lbl_move_axis_y.setFont(font)
+        self.lbl_move_axis_y.setAlignment(QtCore.Qt.AlignCenter)
+        self.lbl_move_axis_y.setObjectName("lbl_move_axis_y")
+        self.formLayout.setWidget(3, QtWidgets.QFormLayout.LabelRole, self.lbl_move_axis_y)
+        self.doubleSpinBox_y_axis = QtWidgets.QDoubleSpinBox(self.scrollAreaWidgetContents)
+        self.doubleSpinBox_y_axis.setDecimals(4)
+        self.doubleSpinBox_y_axis.setMinimum(-9999.99)
+        self.doubleSpinBox_y_axis.setMaximum(99999.99)
+        self.doubleSpinBox_y_axis.setSingleStep(0.01)
+        self.doubleSpinBox_y_axis.setObjectName("doubleSpinBox_y_axis")
+        self.formLayout.setWidget(3, QtWidgets.QFormLayout.FieldRole, self.doubleSpinBox_y_axis)
+        self.legend_checkBox = QtWidgets.QCheckBox(self.scrollAreaWidgetContents)
+        self.legend_checkBox.setEnabled(True)
+        self.legend_checkBox.setChecked(False)
+        self.legend_checkBox.setTristate(False)
+        self.legend_checkBox.setObjectName("legend_checkBox")
+        self.formLayout.setWidget(4, QtWidgets.QFormLayout.LabelRole, self.legend_checkBox)
+        self.button_apply_offset = QtWidgets.QPushButton(self.scrollAreaWidgetContents)
+        self.button_apply_offset.setObjectName("button_apply_offset")
+        self.formLayout.setWidget(4, QtWidgets.QFormLayout.FieldRole, self.button_apply_offset)
+        self.button_undo = QtWidgets.QPushButton(self.scrollAreaWidgetContents)
+        self.button_undo.setObjectName("button_undo")
+        self.formLayout.setWidget(5, QtWidgets.QFormLayout.SpanningRole, self.button_undo)
+        self.button_redo = QtWidgets.QPushButton(self.scrollAreaWidgetContents)
+        self.button_redo.setObjectName("button_redo")
+        self.formLayout.setWidget(6, QtWidgets.QFormLayout.SpanningRole, self.button_redo)
+        self.gridLayout_2.addLayout(self.formLayout, 1, 2, 1, 1)
+        self.scrollArea.setWidget(self.scrollAreaWidgetContents)
+        self.main_layout.addWidget(self.scrollArea, 1, 7, 2, 1)
+        self.verticalLayout = QtWidgets.QVBoxLayout()
+        self.verticalLayout.setObjectName("verticalLayout")
+        self.button_baseline = QtWidgets.QPushButton(self.centralwidget)
+        self.button_baseline.setEnabled(True)
+        self.button_baseline.setObjectName("button_baseline")
+        self.verticalLayout.addWidget(self.button_baseline)
+        self.button_savgol = QtWidgets.QPushButton(self.centralwidget)
+        self.button_savgol.setObjectName("button_savgol")
+        self.verticalLayout.addWidget(self.button_savgol)
+        self.button_peaks = QtWidgets.QPushButton(self.centralwidget)
+        self.button_peaks.setObjectName("button_peaks")
+        self.verticalLayout.addWidget(self.button_peaks)
+        self.button_add_plot = QtWidgets.QPushButton(self.centralwidget)
+        self.button_add_plot.setObjectName("button_add_plot")
+        self.verticalLayout.addWidget(self.button_add_plot)
+        self.main_layout.addLayout(self.verticalLayout, 1, 3, 1, 1)
+        self.scrollArea_peaks = QtWidgets.QScrollArea(self.centralwidget)
+        self.scrollArea_peaks.setWidgetResizable(True)
+        self.scrollArea_peaks.setObjectName("scrollArea_peaks")
+        self.scrollAreaWidgetContents_2 = QtWidgets.QWidget()
+        self.scrollAreaWidgetContents_2.setGeometry(QtCore.QRect(0, 0, 332, 210))
+        self.scrollAreaWidgetContents_2.setObjectName("scrollAreaWidgetContents_2")
+        self.horizontalLayout = QtWidgets.QHBoxLayout(self.scrollAreaWidgetContents_2)
+        self.horizontalLayout.setObjectName("horizontalLayout")
+        self.table_peaks = QtWidgets.QTableView(self.scrollAreaWidgetContents_2)
+        self.table_peaks.setObjectName("table_peaks")
+        self.horizontalLayout.addWidget(self.table_peaks)
+        self.scrollArea_peaks.setWidget(self.scrollAreaWidgetContents_2)
+        self.main_layout.addWidget(self.scrollArea_peaks, 1, 0, 1, 2)
+        self.verticalLayout_3.addLayout(self.main_layout)
+        self.verticalLayout_3.setStretch(0, 10)
+        self.gridLayout.addLayout(self.verticalLayout_3, 1, 1, 1, 1)
+        spacerItem4 = QtWidgets.QSpacerItem(40, 20, QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Minimum)
+        self.gridLayout.addItem(spacerItem4, 2, 0, 1, 3)
+        spacerItem5 = QtWidgets.QSpacerItem(40, 20, QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Minimum)
+        self.gridLayout.addItem(spacerItem5, 0, 0, 1, 3)
+        spacerItem6 = QtWidgets.QSpacerItem(20, 40, QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Expanding)
+        self.gridLayout.addItem(spacerItem6, 1, 2, 1, 1)
+        spacerItem7 = QtWidgets.QSpacerItem(20, 40, QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Expanding)
+        self.gridLayout.addItem(spacerItem7, 1, 0, 1, 1)
+        MainWindow.setCentralWidget(self.centralwidget)
+        self.statusbar = QtWidgets.QStatusBar(MainWindow)
+        self.statusbar.setObjectName("statusbar")
+        MainWindow.setStatusBar(self.statusbar)
+
+        self.retranslateUi(MainWindow)
+        QtCore.QMetaObject.connectSlotsByName(MainWindow)
+
+    def retranslateUi(self, MainWindow):
+        _translate = QtCore.QCoreApplication.translate
+        MainWindow.setWindowTitle(_translate("MainWindow", "MainWindow"))
+        self.button_reverse_y.setToolTip(_translate("MainWindow", "<html><head/><body><p>Reverses Y axis</p></body></html>"))
+        self.button_reverse_y.setText(_translate("MainWindow", "Reverse Y"))
+        self.button_reverse_x.setToolTip(_translate("MainWindow", "<html><head/><body><p>Reverses X axis</p></body></html>"))
+        self.button_reverse_x.setText(_translate("MainWindow", "Reverse X"))
+        self.button_normalize.setToolTip(_translate("MainWindow", "<html><head/><body><p>Normalizes the Spectra</p></body></html>"))
+        self.button_normalize.setText(_translate("MainWindow", "Normalize"))
+        self.button_normalize_z.setText(_translate("MainWindow", "Normalize (Z-score)"))
+        self.button_change.setToolTip(_translate("MainWindow", "<html><head/><body><p>Changes prominence</p></body></html>"))
+        self.button_change.setText(_translate("MainWindow", "Change"))
+        self.dropbox_lbl.setItemText(0, _translate("MainWindow", "Raman"))
+        self.dropbox_lbl.setItemText(1, _translate("MainWindow", "IR (Ref)"))
+        self.dropbox_lbl.setItemText(2, _translate("MainWindow", "IR (Abs)"))
+        self.dropbox_lbl.setItemText(3, _translate("MainWindow", "IR (Trans)"))
+        self.dropbox_lbl.setItemText(4, _translate("MainWindow", "UV-Vis"))
+        self.dropbox_lbl.setItemText(5, _translate("MainWindow", "Reflectance"))
+        self.dropbox_lbl.setItemText(6, _translate("MainWindow", "XRF"))
+        self.dropbox_lbl.setItemText(7, _translate("MainWindow", "XRD"))
+        self.dropbox_lbl.setItemText(8, _translate("MainWindow", "None"))
+        self.button_lbl.setToolTip(_translate("MainWindow", "<html><head/><body><p>Adds labels</p></body></html>"))
+        self.button_lbl.setText(_translate("MainWindow", "Label"))
+        self.button_load.setToolTip(_translate("MainWindow", "<html><head/><body><p>Loads Spectra</p></body></html>"))
+        self.button_load.setText(_translate("MainWindow", "Load"))
+        self.button_save_as.setToolTip(_translate("MainWindow", "<html><head/><body><p>Saves Spectra</p></body></html>"))
+        self.button_save_as.setText(_translate("MainWindow", "Save As CSV"))
+        self.button_settings.setToolTip(_translate("MainWindow", "<html><head/><body><p>Open Settings</p></body></html>"))
+        self.button_settings.setText(_translate("MainWindow", "Settings"))
+        self.button_edit.setToolTip(_translate("MainWindow", "<html><head/><body><p>Open Edit Mode</p></body></html>"))
+        self.button_edit.setText(_translate("MainWindow", "Edit"))
+        self.button_save_table.setToolTip(_translate("MainWindow", "<html><head/><body><p>Saves text</p></body></html>"))
+        self.button_save_table.setText(_translate("MainWindow", "Save Peaks"))
+        self.button_clear_table.setToolTip(_translate("MainWindow", "<html><head/><body><p>Clears text</p></body></html>"))
+        self.button_clear_table.setText(_translate("MainWindow", "Clear Table"))
+        item = self.table.horizontalHeaderItem(0)
+        item.setText(_translate("MainWindow", "Spectrum"))
+        item = self.table.horizontalHeaderItem(1)
+        item.setText(_translate("MainWindow", "Peaks"))
+        self.lbl_move_axis.setText(_translate("MainWindow", "Move Axis"))
+        self.lbl_move_axis_x.setText(_translate("MainWindow", "X axis"))
+        self.lbl_move_axis_y.setText(_translate("MainWindow", "Y axis"))
+        self.legend_checkBox.setText(_translate("MainWindow", "Legend"))
+        self.button_apply_offset.setToolTip(_translate("MainWindow", "Apply the X and Y offsets to the data"))
+        self.button_apply_offset.setText(_translate("MainWindow", "Apply"))
+        self.button_undo.setText(_translate("MainWindow", "Undo"))
+        self.button_redo.setText(_translate("MainWindow", "Redo"))
+        self.button_baseline.setToolTip(_translate("MainWindow", "<html><head/><body><p>Adds a baseline</p></body></html>"))
+        self.button_baseline.setText(_translate("MainWindow", "Baseline"))
+        self.button_savgol.setToolTip(_translate("MainWindow", "<html><head/><body><p>Removes the spectral noise</p></body></html>"))
+        self.button_savgol.setText(_translate("MainWindow", "Smoothing"))
+        self.button_peaks.setToolTip(_translate("MainWindow", "<html><head/><body><p>Finds Peaks</p></body></html>"))
+        self.button_peaks.setText(_translate("MainWindow", "Peaks"))
+        self.button_add_plot.setToolTip(_translate("MainWindow", "<html><head/><body><p>Adds another plot</p></body></html>"))
+        self.button_add_plot.setText(_translate("MainWindow", "Add Plot"))
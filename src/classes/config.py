@@ -11,6 +11,12 @@ class General:
     sep: str
     engine: str
     lw: float
+    cache: Optional[str]
+    lod_points: int
+    preview_points: int
+    profile_startup: bool
+    dtype: str
+    snap_peaks: bool
 
 @dataclass
 class Smooth:
@@ -34,6 +40,39 @@ class Peaks:
   prominence: Optional[int | float | Iterable]
   width: Optional[int | float | Iterable]
 
+@dataclass
+class Pool:
+  enabled: bool
+  workers: Optional[int]
+  min_points: int
+
+@dataclass
+class History:
+  mode: str
+  budget_mb: float
+  checkpoint_interval: int
+  save: bool
+
+@dataclass
+class Memory:
+  cap_mb: float
+  policy: str
+  spill_dir: Optional[str]
+
+@dataclass
+class Timings:
+  enabled: bool
+  window: int
+  trace: Optional[str]
+
+@dataclass
+class Batch:
+  input: Optional[str]
+  output: Optional[str]
+  pattern: str
+  steps: list[str]
+  workers: Optional[int]
+
 @dataclass
 class Shortcuts:
   Load: str
@@ -50,6 +89,9 @@ class Shortcuts:
   Settings: str
   Normalize: str
   Normalize_Z: str
+  Preview: str
+  Open_Session: str
+  Save_Session: str
 
 @dataclass
 class Config:
@@ -57,4 +99,9 @@ class Config:
     smooth: Smooth
     baseline: Baseline
     peaks: Peaks
+    pool: Pool
+    history: History
+    memory: Memory
+    batch: Batch
+    timings: Timings
     shortcuts: Shortcuts
\ No newline at end of file
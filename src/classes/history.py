@@ -0,0 +1,117 @@
+"""History class used for the undo-redo of the data processing."""
+
+from collections import OrderedDict
+from copy import deepcopy
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+from .spectra import Spectrum
+
+
+class ReplayHistory:
+    """Undo history that stores the operations and their parameters
+    instead of full array snapshots.
+
+    The y data of a Spectrum is rebuilt by replaying the operations
+    from `y_orig` or from the nearest checkpoint. A checkpoint is kept
+    every `checkpoint_interval` operations, evicting the least recently
+    used ones once they exceed `budget` bytes.
+    """
+
+    def __init__(self, checkpoint_interval: int, budget: int) -> None:
+        self.checkpoint_interval: int = max(1, checkpoint_interval)
+        self.budget: int = budget
+
+        # Operations and current position of each Spectrum id
+        self._ops: dict[int, list[tuple[Callable, Any]]] = {}
+        self._position: dict[int, int] = {}
+
+        # Checkpoints keyed by (Spectrum id, position)
+        self._checkpoints: OrderedDict[tuple[int, int], np.ndarray] = OrderedDict()
+        self.nbytes: int = 0
+
+    def record(self, sp: Spectrum, kernel: Callable, params: Any) -> None:
+        """Records an operation already applied to the Spectrum."""
+        pos = self._position.get(sp.id, 0)
+
+        # A new operation drops the ones that could be redone
+        ops = self._ops.setdefault(sp.id, [])
+        del ops[pos:]
+        for key in [k for k in self._checkpoints if k[0] == sp.id and k[1] > pos]:
+            self._evict(key)
+
+        ops.append((kernel, deepcopy(params)))
+        self._position[sp.id] = pos + 1
+        self._checkpoint(sp.id, pos + 1, sp.y)
+
+    def undo(self, sp: Spectrum) -> np.ndarray:
+        """Steps back one operation and returns the rebuilt y data."""
+        pos = self._position.get(sp.id, 0) - 1
+        if pos < 0:
+            return sp.y
+        self._position[sp.id] = pos
+        return self.state(sp, pos)
+
+    def redo(self, sp: Spectrum) -> Optional[np.ndarray]:
+        """Applies the next operation again, if any."""
+        pos = self._position.get(sp.id, 0)
+        ops = self._ops.get(sp.id, [])
+        if pos >= len(ops):
+            return None
+
+        kernel, params = ops[pos]
+        y = kernel(sp.y[np.newaxis], params)[0]
+
+        self._position[sp.id] = pos + 1
+        self._checkpoint(sp.id, pos + 1, y)
+        return y
+
+    def operations(self, sp: Spectrum) -> tuple[list[tuple[Callable, Any]], int]:
+        """Returns the operations of the Spectrum and its position."""
+        return list(self._ops.get(sp.id, [])), self._position.get(sp.id, 0)
+
+    def restore(
+        self, sp: Spectrum, ops: list[tuple[Callable, Any]], position: int
+    ) -> None:
+        """Sets the operations of a Spectrum whose y data is the one after
+        the first `position` operations, e.g. read from a session.
+        """
+        self._ops[sp.id] = [(kernel, deepcopy(params)) for kernel, params in ops]
+        self._position[sp.id] = position
+
+    def state(self, sp: Spectrum, pos: int) -> np.ndarray:
+        """Rebuilds the y data after the first `pos` operations."""
+        start, y = 0, sp.y_orig
+        for key in self._checkpoints:
+            if key[0] == sp.id and start < key[1] <= pos:
+                start = key[1]
+        if start:
+            self._checkpoints.move_to_end((sp.id, start))
+            y = self._checkpoints[(sp.id, start)]
+
+        for i, (kernel, params) in enumerate(self._ops[sp.id][start:pos], start=start + 1):
+            y = kernel(y[np.newaxis], params)[0]
+            self._checkpoint(sp.id, i, y)
+        return y
+
+    def _checkpoint(self, sp_id: int, pos: int, y: np.ndarray) -> None:
+        """Keeps a copy of the y data every `checkpoint_interval` operations."""
+        key = (sp_id, pos)
+        if pos % self.checkpoint_interval or key in self._checkpoints:
+            return
+
+        self._checkpoints[key] = np.array(y, copy=True)
+        self.nbytes += y.nbytes
+
+        # Evict the least recently used checkpoints
+        while self.nbytes > self.budget and self._checkpoints:
+            self._evict(next(iter(self._checkpoints)))
+
+    def trim(self, nbytes: int) -> None:
+        """Evicts the least recently used checkpoints down to `nbytes` bytes."""
+        while self.nbytes > nbytes and self._checkpoints:
+            self._evict(next(iter(self._checkpoints)))
+
+    def _evict(self, key: tuple[int, int]) -> None:
+        self.nbytes -= self._checkpoints.pop(key).nbytes
@@ -0,0 +1,86 @@
+"""Level of detail class used to draw long spectra."""
+
+from typing import Optional
+
+import numpy as np
+
+
+class MinMaxPyramid:
+    """Min/max pyramid of a spectrum with monotonic x data.
+
+    Level k keeps, for each block of 2**k points, the indices of the
+    minimum and the maximum y value. Drawing only these two points per
+    block keeps the envelope of the line at a fraction of the points.
+    """
+
+    def __init__(self, x: np.ndarray, y: np.ndarray) -> None:
+        # Work on ascending x data
+        if x.size > 1 and x[0] > x[-1]:
+            x, y = x[::-1], y[::-1]
+        if np.any(np.diff(x) < 0):
+            raise ValueError("The x data must be monotonic.")
+
+        self.x: np.ndarray = x
+        self.y: np.ndarray = y
+
+        # Level 0 is the raw data itself
+        dtype = np.int32 if x.size < 2**31 else np.int64
+        imin = imax = np.arange(x.size, dtype=dtype)
+        self.levels: list[Optional[tuple[np.ndarray, np.ndarray]]] = [None]
+
+        while imin.size > 2:
+            imin = self._reduce(imin, np.less_equal)
+            imax = self._reduce(imax, np.greater_equal)
+            self.levels.append((imin, imax))
+
+    @classmethod
+    def from_levels(
+        cls, x: np.ndarray, y: np.ndarray, levels: list[tuple[np.ndarray, np.ndarray]]
+    ) -> "MinMaxPyramid":
+        """Creates the pyramid of the data from the indices of its levels
+        above level 0, as kept in `levels`, without computing them again.
+        """
+        pyramid = cls.__new__(cls)
+        if x.size > 1 and x[0] > x[-1]:
+            x, y = x[::-1], y[::-1]
+        pyramid.x, pyramid.y = x, y
+        pyramid.levels = [None] + list(levels)
+        return pyramid
+
+    def _reduce(self, idx: np.ndarray, keep_first) -> np.ndarray:
+        """Merges the blocks pairwise, keeping the index of the extreme value."""
+        if idx.size % 2:
+            idx = np.append(idx, idx[-1])
+        first, second = idx[0::2], idx[1::2]
+        return np.where(keep_first(self.y[first], self.y[second]), first, second)
+
+    def decimate(
+        self,
+        x0: Optional[float] = None,
+        x1: Optional[float] = None,
+        columns: int = 2000,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Returns about two points per pixel column for the x range."""
+        lo, hi = sorted((x0, x1)) if x0 is not None and x1 is not None else (None, None)
+        i0 = 0 if lo is None else max(int(np.searchsorted(self.x, lo)) - 1, 0)
+        i1 = self.x.size if hi is None else min(int(np.searchsorted(self.x, hi)) + 1, self.x.size)
+
+        n = i1 - i0
+        if n <= 2 * columns:
+            return self.x[i0:i1], self.y[i0:i1]
+
+        # Blocks of 2**k points, at most one block per column
+        k = min(int(np.ceil(np.log2(n / columns))), len(self.levels) - 1)
+        imin, imax = self.levels[k]
+        b0, b1 = i0 >> k, ((i1 - 1) >> k) + 1
+        imin, imax = imin[b0:b1], imax[b0:b1]
+
+        # Keep the x order inside each block and the ends of the range
+        idx = np.stack([np.minimum(imin, imax), np.maximum(imin, imax)], axis=1).ravel()
+        idx = np.concatenate([[i0], idx[(idx > i0) & (idx < i1 - 1)], [i1 - 1]])
+        return self.x[idx], self.y[idx]
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the pyramid indices."""
+        return sum(imin.nbytes + imax.nbytes for imin, imax in self.levels[1:])
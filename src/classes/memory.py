@@ -0,0 +1,115 @@
+"""Memory accounting of the data held by the GUI app."""
+
+import os
+import tempfile
+from itertools import count
+from typing import Any, Optional
+
+import numpy as np
+
+from .peaks import ManualPeaks
+from .peaks import Peaks
+from .spectra import Spectrum
+
+
+def _root(a: np.ndarray) -> np.ndarray:
+    """Returns the array owning the memory of a view."""
+    while isinstance(a.base, np.ndarray):
+        a = a.base
+    return a
+
+
+def held_bytes(obj: Any, seen: set[int]) -> int:
+    """Returns the bytes held by the arrays, spectra and peaks reachable
+    from `obj` (through tuples, lists and dicts) that are not in `seen`.
+
+    Arrays are counted once per owner of their memory, so the rows of
+    a stacked batch count as the whole batch. Arrays mapped read-only
+    from a file hold no memory of their own, the pages of copy-on-write
+    maps (sessions) are held once changed and are counted.
+    """
+    if isinstance(obj, np.ndarray):
+        root = _root(obj)
+        if id(root) in seen:
+            return 0
+        if isinstance(root, np.memmap) and not root.flags.writeable:
+            return 0
+        seen.add(id(root))
+        return root.nbytes
+
+    if isinstance(obj, Spectrum):
+        if id(obj) in seen:
+            return 0
+        seen.add(id(obj))
+        # The peaks of a Spectrum go with it
+        return obj.nbytes + held_bytes(obj.peaks, seen)
+
+    if isinstance(obj, (Peaks, ManualPeaks)):
+        if id(obj) in seen:
+            return 0
+        seen.add(id(obj))
+        return obj.nbytes
+
+    if isinstance(obj, (tuple, list)):
+        return sum(held_bytes(item, seen) for item in obj)
+
+    if isinstance(obj, dict):
+        return sum(held_bytes(k, seen) + held_bytes(v, seen) for k, v in obj.items())
+
+    return 0
+
+
+def spilled(action: tuple) -> bool:
+    """Whether the arrays of an undo entry are mapped from a file."""
+    return any(isinstance(a, np.ndarray) and isinstance(_root(a), np.memmap) for a in action)
+
+
+class SpillStore:
+    """Temporary folder holding the arrays moved out of memory.
+
+    A spilled array is written as a .npy file and read back as a
+    read-only memory map, used like the array it replaces. The file is
+    deleted when the array is released, the rest when the store is
+    closed.
+    """
+
+    def __init__(self, folder: Optional[str] = None) -> None:
+        self._dir = tempfile.TemporaryDirectory(
+            prefix="spectra_spill_", dir=folder, ignore_cleanup_errors=True
+        )
+        self._names = count()
+
+        # Size of the data of each file
+        self._files: dict[str, int] = {}
+        self.nbytes: int = 0
+
+    @property
+    def files(self) -> int:
+        return len(self._files)
+
+    def spill(self, a: np.ndarray) -> np.ndarray:
+        """Writes the array to a file and returns its memory map."""
+        path = os.path.abspath(os.path.join(self._dir.name, f"{next(self._names)}.npy"))
+        np.save(path, a)
+        self._files[path] = a.nbytes
+        self.nbytes += a.nbytes
+        return np.load(path, mmap_mode="r")
+
+    def release(self, a: np.ndarray) -> None:
+        """Deletes the file of a spilled array no longer used.
+        Arrays mapped from other files are left alone.
+        """
+        path = getattr(_root(a), "filename", None)
+        if path is None or path not in self._files:
+            return
+        self.nbytes -= self._files.pop(path)
+        try:
+            os.remove(path)
+        except OSError:
+            # Still mapped on Windows, removed with the folder
+            pass
+
+    def close(self) -> None:
+        self._dir.cleanup()
+        self._files.clear()
+        self.nbytes = 0
@@ -1,44 +1,234 @@
-"""Peaks class used in the GUI."""
+"""Peaks classes used in the GUI."""
 
 from typing import Optional
 
-from matplotlib.collections import PathCollection
 import numpy as np
-from matplotlib.lines import Line2D
 from matplotlib.axes import Axes
-from zipp import Path
+from matplotlib.collections import PathCollection
+from matplotlib.colors import to_rgba
 
 
-class Peaks:
-    """Peaks class for peaks contained in Spectrum objects."""
+class PeakLayer:
+    """Single marker collection holding the peaks of every Spectrum of an Axes.
+
+    The offsets, colors and owner ids are kept in preallocated arrays
+    where each owner (Spectrum id) takes one contiguous slice, so adding,
+    hiding or removing the peaks of one Spectrum only touches that slice.
+    """
+
+    def __init__(self, axes: Axes, size: float = 2, capacity: int = 1024) -> None:
+        self.axes: Axes = axes
+        self.size: int = 0
+
+        self._offsets: np.ndarray = np.empty((capacity, 2))
+        self._colors: np.ndarray = np.empty((capacity, 4))
+        self._owners: np.ndarray = np.empty(capacity, dtype=np.int64)
+        self._spans: dict[int, tuple[int, int]] = {}
+
+        self.collection: PathCollection = axes.scatter(
+            np.empty(0), np.empty(0), s=size, zorder=3, label="peak_layer"
+        )
+
+    @property
+    def offsets(self) -> np.ndarray:
+        return self._offsets[: self.size]
+
+    @property
+    def owners(self) -> np.ndarray:
+        return self._owners[: self.size]
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the preallocated arrays."""
+        return self._offsets.nbytes + self._colors.nbytes + self._owners.nbytes
+
+    def __contains__(self, owner: int) -> bool:
+        return owner in self._spans
+
+    def _reserve(self, size: int) -> None:
+        """Grows the arrays to hold at least `size` points."""
+        capacity = self._owners.size
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        for name in ("_offsets", "_colors", "_owners"):
+            old = getattr(self, name)
+            new = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[: self.size] = old[: self.size]
+            setattr(self, name, new)
+
+    def set(
+        self,
+        owner: int,
+        x: np.ndarray,
+        y: np.ndarray,
+        color: str = "red",
+        visible: bool = True,
+    ) -> None:
+        """Sets the peaks of an owner, replacing the previous ones."""
+        n = x.size
+        span = self._spans.get(owner)
+        if span is None or span[1] - span[0] != n:
+            self._delete(owner)
+            self._reserve(self.size + n)
+            span = (self.size, self.size + n)
+            self._spans[owner] = span
+            self._owners[span[0] : span[1]] = owner
+            self.size += n
+
+        start, stop = span
+        self._offsets[start:stop, 0] = x
+        self._offsets[start:stop, 1] = y
+        self._colors[start:stop] = to_rgba(color, 1.0 if visible else 0.0)
+        self._sync()
+
+    def set_visible(self, owner: int, visible: bool) -> None:
+        """Shows or hides the peaks of an owner."""
+        if owner in self._spans:
+            start, stop = self._spans[owner]
+            self._colors[start:stop, 3] = 1.0 if visible else 0.0
+            self._sync()
+
+    def remove(self, owner: int) -> None:
+        """Removes the peaks of an owner."""
+        if owner in self._spans:
+            self._delete(owner)
+            self._sync()
+
+    def clear(self) -> None:
+        """Removes every peak."""
+        self._spans.clear()
+        self.size = 0
+        self._sync()
+
+    def _delete(self, owner: int) -> None:
+        """Closes the gap left by the slice of an owner."""
+        span = self._spans.pop(owner, None)
+        if span is None:
+            return
+        start, stop = span
+        n = stop - start
+        tail = slice(stop, self.size)
+        for arr in (self._offsets, self._colors, self._owners):
+            arr[start : self.size - n] = arr[tail]
+        for key, (s, e) in self._spans.items():
+            if s >= stop:
+                self._spans[key] = (s - n, e - n)
+        self.size -= n
+
+    def _sync(self) -> None:
+        """Pushes the arrays to the collection."""
+        # Clearing the Axes drops the collection
+        if self.collection not in self.axes.collections:
+            self.axes.add_collection(self.collection, autolim=False)
+        self.collection.set_offsets(self._offsets[: self.size])
+        self.collection.set_facecolor(self._colors[: self.size])
+        self.collection.set_edgecolor(self._colors[: self.size])
 
-    def __init__(self, obj: Optional[PathCollection] = None) -> None:
-        self._obj: PathCollection = obj
-        self._x: np.ndarray = self._obj.get_offsets()[:, 0] if self._obj is not None else None
 
+class Peaks:
+    """Peaks class for peaks contained in Spectrum objects.
+    The markers are drawn by the PeakLayer of the axes.
+    """
 
-        # self._x: np.ndarray = self._obj.get_xdata() if self._obj is not None else None
-        self._label: str = self._obj.get_label() if self._obj is not None else None
+    def __init__(
+        self,
+        layer: PeakLayer,
+        owner: int,
+        x: np.ndarray,
+        y: np.ndarray,
+        label: str,
+        color: str = "red",
+        visible: bool = True,
+    ) -> None:
+        self._layer: PeakLayer = layer
+        self._owner: int = owner
+        self._x: np.ndarray = x
+        self._y: np.ndarray = y
+        self._label: str = label
+        self._color: str = color
+        self._visible: bool = visible
 
     @property
     def x(self) -> np.ndarray:
         return self._x
 
+    @property
+    def y(self) -> np.ndarray:
+        return self._y
+
     @property
     def name(self) -> str:
         return self._label
 
+    @property
+    def nbytes(self) -> int:
+        return self._x.nbytes + self._y.nbytes
+
+    @property
+    def is_visible(self) -> bool:
+        return self._visible
+
     def visible(self) -> None:
-        self._obj.set_visible(True)
+        self._visible = True
+        self._layer.set_visible(self._owner, True)
 
     def invisible(self) -> None:
-        self._obj.set_visible(False)
+        self._visible = False
+        self._layer.set_visible(self._owner, False)
 
     def remove(self) -> None:
-        self._obj.remove()
+        self._layer.remove(self._owner)
 
-    def add_to_axes(self, ax: Axes) -> None:
-        ax.add_collection(self._obj)
+    def add_to_axes(self, ax: Optional[Axes] = None) -> None:
+        self._layer.set(self._owner, self._x, self._y, self._color, self._visible)
 
     def __str__(self) -> str:
         return f"{self.name}"
+
+
+class ManualPeaks:
+    """Manual peaks added on the Canvas, kept in a preallocated
+    growable (n, 2) array with O(1) append and pop.
+    """
+
+    def __init__(self, capacity: int = 64) -> None:
+        self._xy: np.ndarray = np.empty((capacity, 2))
+        self.size: int = 0
+
+    @property
+    def xy(self) -> np.ndarray:
+        return self._xy[: self.size]
+
+    @property
+    def x(self) -> np.ndarray:
+        return self._xy[: self.size, 0]
+
+    @property
+    def empty(self) -> bool:
+        return self.size == 0
+
+    @property
+    def nbytes(self) -> int:
+        return self._xy.nbytes
+
+    def __len__(self) -> int:
+        return self.size
+
+    def append(self, x: float, y: float) -> None:
+        """Adds a peak at the end."""
+        if self.size == self._xy.shape[0]:
+            grown = np.empty((max(2 * self.size, 16), 2))
+            grown[: self.size] = self._xy
+            self._xy = grown
+        self._xy[self.size] = x, y
+        self.size += 1
+
+    def pop(self) -> tuple[float, float]:
+        """Removes the last peak and returns it."""
+        if self.size == 0:
+            raise IndexError("pop from empty ManualPeaks")
+        self.size -= 1
+        x, y = self._xy[self.size]
+        return float(x), float(y)
@@ -0,0 +1,202 @@
+"""Processing pipeline used for the undo-redo of the data processing."""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from copy import deepcopy
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+import numpy as np
+from omegaconf import DictConfig
+from omegaconf import OmegaConf
+
+if TYPE_CHECKING:
+    from .spectra import Spectrum
+
+
+def op_key(kernel: Callable, params: Any) -> str:
+    """Returns a text key of a row kernel and its parameters."""
+    if isinstance(params, DictConfig):
+        params = OmegaConf.to_container(params, resolve=True)
+    return f"{kernel.__module__}.{kernel.__qualname__}({params!r})"
+
+
+def chain_key(prefix: str, kernel: Callable, params: Any) -> str:
+    """Returns the key of the data after `prefix` and one more operation."""
+    text = f"{prefix}|{op_key(kernel, params)}".encode()
+    return hashlib.blake2b(text, digest_size=16).hexdigest()
+
+
+class OpChain:
+    """Declarative chain of the operations of a Spectrum.
+
+    `ops[:position]` are the active operations, the ones after
+    `position` can be redone. `keys[i]` is the key of the data
+    after the first i + 1 operations.
+    """
+
+    __slots__ = ("ops", "keys", "position", "source")
+
+    def __init__(self) -> None:
+        self.ops: list[tuple[Callable, Any]] = []
+        self.keys: list[str] = []
+        self.position: int = 0
+
+        # Key of the original data, hashed on first use
+        self.source: Optional[str] = None
+
+    def __len__(self) -> int:
+        return self.position
+
+    @property
+    def active(self) -> list[tuple[Callable, Any]]:
+        """The operations applied to the data."""
+        return self.ops[: self.position]
+
+    def push(self, kernel: Callable, params: Any, key: str) -> None:
+        """Adds an operation, dropping the ones that could be redone."""
+        del self.ops[self.position :]
+        del self.keys[self.position :]
+        self.ops.append((kernel, deepcopy(params)))
+        self.keys.append(key)
+        self.position += 1
+
+
+class Pipeline:
+    """Undo history evaluating the operation chain of each Spectrum
+    from its original data.
+
+    The result after every prefix of a chain is memoized by a hash of
+    the original data and of the operations of the prefix, so undoing,
+    redoing or changing the parameters of the last step starts from the
+    memoized data of the steps before it. The least recently used
+    results are evicted once they exceed `budget` bytes.
+    """
+
+    def __init__(self, budget: int) -> None:
+        self.budget: int = budget
+
+        self._memo: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+        self.nbytes: int = 0
+
+    def source(self, sp: "Spectrum") -> str:
+        """Returns the key of the original data of the Spectrum."""
+        if sp.chain.source is None:
+            y = np.ascontiguousarray(sp.y_orig)
+            digest = hashlib.blake2b(y, digest_size=16)
+            digest.update(f"{y.dtype.str}{y.size}".encode())
+            sp.chain.source = digest.hexdigest()
+        return sp.chain.source
+
+    def key(self, sp: "Spectrum") -> str:
+        """Returns the key of the current data of the Spectrum."""
+        chain = sp.chain
+        return chain.keys[chain.position - 1] if chain.position else self.source(sp)
+
+    def evaluate(
+        self,
+        sp: "Spectrum",
+        op: Optional[tuple[Callable, Any]] = None,
+        replace: bool = False,
+    ) -> np.ndarray:
+        """Returns the y data after the active operations, and `op` if given.
+        With `replace`, `op` takes the place of the last active operation.
+        Only the operations after the longest memoized prefix are computed.
+        """
+        ops = sp.chain.active
+        keys = [self.source(sp)] + sp.chain.keys[: sp.chain.position]
+        if replace and ops:
+            ops.pop()
+            keys.pop()
+        if op is not None:
+            ops.append(op)
+            keys.append(chain_key(keys[-1], *op))
+
+        start, y = 0, sp.y_orig
+        for pos in range(len(ops), 0, -1):
+            cached = self._get(keys[pos])
+            if cached is not None:
+                start, y = pos, cached
+                break
+
+        for pos in range(start, len(ops)):
+            kernel, params = ops[pos]
+            y = kernel(y[np.newaxis], params)[0]
+            self._put(keys[pos + 1], y)
+        return y
+
+    def record(self, sp: "Spectrum", kernel: Callable, params: Any) -> None:
+        """Adds an operation already applied to the Spectrum to its chain."""
+        key = chain_key(self.key(sp), kernel, params)
+        sp.chain.push(kernel, params, key)
+        self._put(key, sp.y)
+
+    def operations(self, sp: "Spectrum") -> tuple[list[tuple[Callable, Any]], int]:
+        """Returns the operation chain of the Spectrum and its position."""
+        return list(sp.chain.ops), sp.chain.position
+
+    def restore(
+        self, sp: "Spectrum", ops: list[tuple[Callable, Any]], position: int
+    ) -> None:
+        """Sets the chain of a Spectrum whose y data is the one after
+        the first `position` operations, e.g. read from a session.
+        """
+        sp.chain = OpChain()
+        for kernel, params in ops:
+            sp.chain.push(kernel, params, chain_key(self.key(sp), kernel, params))
+        sp.chain.position = position
+
+    def edit(
+        self, sp: "Spectrum", kernel: Callable, params: Any
+    ) -> tuple[Callable, Any]:
+        """Replaces the last active operation with one already applied to
+        the Spectrum and returns the replaced operation.
+        """
+        chain = sp.chain
+        old = chain.ops[chain.position - 1]
+        chain.position -= 1
+        self.record(sp, kernel, params)
+        return old
+
+    def undo(self, sp: "Spectrum") -> np.ndarray:
+        """Steps back one operation and returns the y data."""
+        if sp.chain.position == 0:
+            return sp.y
+        sp.chain.position -= 1
+        return self.evaluate(sp)
+
+    def redo(self, sp: "Spectrum") -> Optional[np.ndarray]:
+        """Steps forward one operation, if any, and returns the y data."""
+        if sp.chain.position >= len(sp.chain.ops):
+            return None
+        sp.chain.position += 1
+        return self.evaluate(sp)
+
+    def trim(self, nbytes: int) -> None:
+        """Evicts the least recently used results down to `nbytes` bytes."""
+        with self._lock:
+            while self.nbytes > nbytes and self._memo:
+                self.nbytes -= self._memo.popitem(last=False)[1].nbytes
+
+    def _get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            y = self._memo.get(key)
+            if y is not None:
+                self._memo.move_to_end(key)
+            return y
+
+    def _put(self, key: str, y: np.ndarray) -> None:
+        with self._lock:
+            if key in self._memo:
+                self._memo.move_to_end(key)
+                return
+            if y.nbytes > self.budget:
+                return
+
+            self._memo[key] = np.array(y, copy=True)
+            self.nbytes += y.nbytes
+
+            # Evict the least recently used results
+            while self.nbytes > self.budget:
+                self.nbytes -= self._memo.popitem(last=False)[1].nbytes
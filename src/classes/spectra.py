@@ -1,45 +1,149 @@
 """Spectrum class used in the GUI."""
 
 from itertools import count
-from typing import Iterator, Optional
+from typing import Callable, Iterator, Optional
 
 import numpy as np
 from matplotlib.axes import Axes
 from matplotlib.lines import Line2D
+from matplotlib.transforms import Affine2D
 
+from .lod import MinMaxPyramid
+from .pipeline import OpChain
 from .peaks import Peaks
+from .store import SpectrumStore
+from .store import mapped_from
 
 
 class Spectrum:
-    """Spectum class for plotted data."""
+    """Spectum class for plotted data.
+
+    The data live in a slice of a SpectrumStore. The Line2D is only
+    created while the Spectrum is shown and checked on an Axes.
+    """
+
+    __slots__ = (
+        "id",
+        "label",
+        "loaded",
+        "tristate",
+        "lod",
+        "lod_view",
+        "offset",
+        "chain",
+        "has_peaks",
+        "_store",
+        "_start",
+        "_stop",
+        "_axes",
+        "_lw",
+        "_curve",
+        "_color",
+        "_display",
+        "_x_index",
+        "_peaks_object",
+    )
 
     new_id: Iterator = count()
 
-    def __init__(self, curve: Line2D) -> None:
+    def __init__(self, store: SpectrumStore, row: int, label: str) -> None:
         # ID
         self.id = next(Spectrum.new_id)
 
         # Data
-        self.curve: Line2D = curve
-        self.x_data: np.ndarray = self.curve.get_xdata()
-        self.y_data: np.ndarray = self.curve.get_ydata()
-        self.label: str = self.curve.get_label()
+        self._store: SpectrumStore = store
+        self._start: int = int(store.bounds[row])
+        self._stop: int = int(store.bounds[row + 1])
+        self.label: str = label
 
         # State
         self.loaded: bool = False
         self.tristate: int = 1  # -1 tristate, 0 unchecked, 1 checked
 
-        # Data proccessing
-        self.y_orig: np.ndarray = np.copy(self.y_data)
+        # Line, created when the Spectrum is shown
+        self._axes: Optional[Axes] = None
+        self._lw: float = 1.0
+        self._curve: Optional[Line2D] = None
+        self._color: Optional[str] = None
+
+        # Display offset, applied by the transform of the line only
+        self.offset: tuple[float, float] = (0.0, 0.0)
+        self._display: Affine2D = Affine2D()
+
+        # Operations applied to the data in "pipeline" history mode
+        self.chain: OpChain = OpChain()
 
-        # Color
-        self._color: str = self.curve.get_color()
+        # Level of detail
+        self.lod: Optional[MinMaxPyramid] = None
+        self.lod_view: tuple[Optional[float], Optional[float], int] = (None, None, 2000)
+
+        # Sorted x values (and their order) used to snap on the data
+        self._x_index: Optional[tuple[np.ndarray, Optional[np.ndarray]]] = None
 
         # Peaks
         self.has_peaks: bool = False
         self._peaks_object: Optional[Peaks] = None
-        self.old_peaks: Optional[Peaks] = None
-    
+
+    @classmethod
+    def from_arrays(
+        cls, data: list[tuple[np.ndarray, np.ndarray, str]], dtype: str = "float64"
+    ) -> list["Spectrum"]:
+        """Creates Spectrum objects sharing one store for the (x, y, label) data."""
+        store = SpectrumStore([(x, y) for x, y, _ in data], dtype)
+        return [cls(store, row, label) for row, (_, _, label) in enumerate(data)]
+
+    @property
+    def x_data(self) -> np.ndarray:
+        """The x data, a view on the store."""
+        return self._store.x[self._start : self._stop]
+
+    @x_data.setter
+    def x_data(self, value: np.ndarray) -> None:
+        self._store.x[self._start : self._stop] = value
+
+    @property
+    def y_data(self) -> np.ndarray:
+        """The y data, a view on the store."""
+        return self._store.y[self._start : self._stop]
+
+    @y_data.setter
+    def y_data(self, value: np.ndarray) -> None:
+        self._store.y[self._start : self._stop] = value
+
+    @property
+    def y_orig(self) -> np.ndarray:
+        """The y data as loaded."""
+        return self._store.y_orig[self._start : self._stop]
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the slice of the store, the level of detail and the snap index."""
+        store = self._store
+        itemsize = store.x.itemsize + store.y.itemsize + store.y_orig.itemsize
+        nbytes = (self._stop - self._start) * itemsize
+        if self.lod is not None:
+            nbytes += self.lod.nbytes
+        if self._x_index is not None and self._x_index[1] is not None:
+            # Sorted copy of the x data and its order
+            nbytes += sum(a.nbytes for a in self._x_index)
+        return nbytes
+
+    @property
+    def color(self) -> Optional[str]:
+        """The color of the line, picked when it is first drawn."""
+        return self._color
+
+    @color.setter
+    def color(self, value: Optional[str]) -> None:
+        self._color = value
+        if self._curve is not None and self.tristate != -1:
+            self._curve.set_color(value)
+
+    @property
+    def curve(self) -> Optional[Line2D]:
+        """The line of the Spectrum, None while it is not drawn."""
+        return self._curve
+
     @property
     def y(self):
         """The y data of the Spectrum."""
@@ -48,8 +152,118 @@ class Spectrum:
     @y.setter
     def y(self, value):
         """Changes the current y values."""
-        self.curve.set_ydata(value)
         self.y_data = value
+        self.refresh()
+
+    def _line_data(self) -> tuple[np.ndarray, np.ndarray]:
+        if self.lod is None:
+            return self.x_data, self.y_data
+        return self.lod.decimate(*self.lod_view)
+
+    def refresh(self) -> None:
+        """Updates the line after a change of the x or y data."""
+        self._x_index = None
+        if self.lod is not None:
+            # Rebuild the pyramid and show the whole x range
+            self.lod = MinMaxPyramid(self.x_data, self.y_data)
+            self.lod_view = (None, None, self.lod_view[2])
+        if self._curve is not None:
+            self._curve.set_data(*self._line_data())
+
+    def enable_lod(self) -> None:
+        """Draws a min/max decimation of the data instead of every point.
+        The full resolution data stay in x_data and y_data.
+        """
+        try:
+            self.lod = MinMaxPyramid(self.x_data, self.y_data)
+        except ValueError:
+            # x data not monotonic
+            self.lod = None
+            return
+        if self._curve is not None:
+            self._curve.set_data(*self._line_data())
+
+    def detach(self, path: str) -> None:
+        """Copies the data mapped from the file into memory, e.g. before
+        the file is replaced. The level of detail is kept.
+        """
+        self._store.detach(path)
+        self._x_index = None
+        if self.lod is not None and mapped_from(self.lod.x, path):
+            levels = [(np.array(a), np.array(b)) for a, b in self.lod.levels[1:]]
+            self.lod = MinMaxPyramid.from_levels(self.x_data, self.y_data, levels)
+
+    def update_view(self, x0: float, x1: float, columns: int) -> None:
+        """Draws about two points per pixel column of the visible x range."""
+        if self.lod is None or (x0, x1, columns) == self.lod_view:
+            return
+        self.lod_view = (x0, x1, columns)
+        if self._curve is not None:
+            self._curve.set_data(*self._line_data())
+
+    def set_offset(self, dx: float, dy: float) -> None:
+        """Moves the line on the Canvas without changing the data."""
+        self.offset = (dx, dy)
+        self._display.clear().translate(dx, dy)
+
+    def apply_offset(self) -> None:
+        """Adds the display offset to the data."""
+        dx, dy = self.offset
+        self.x_data += dx
+        self.y_data += dy
+        self.set_offset(0.0, 0.0)
+        self.refresh()
+
+    def show(self, ax: Axes, lw: float) -> None:
+        """Shows the Spectrum on the Axes.
+        The line is only created if the Spectrum is not unchecked.
+        """
+        self._axes, self._lw = ax, lw
+        if self._curve is not None and self._curve.axes is not ax:
+            # The line was cleared from its Axes
+            self._curve = None
+        if self.tristate != 0:
+            self._add_line()
+
+    def hide(self) -> None:
+        """Removes the Spectrum from its Axes, freeing the line."""
+        self._remove_line()
+        self._axes = None
+
+    def _add_line(self) -> None:
+        if self._curve is None and self._axes is not None:
+            (self._curve,) = self._axes.plot(
+                *self._line_data(),
+                lw=self._lw,
+                label=self.label,
+                color=self._color,
+                transform=self._display + self._axes.transData,
+            )
+            if self._color is None:
+                self._color = self._curve.get_color()
+        if self._curve is not None:
+            self._curve.set_color("grey" if self.tristate == -1 else self._color)
+
+    def _remove_line(self) -> None:
+        if self._curve is not None:
+            if self._curve.axes is not None:
+                self._curve.remove()
+            self._curve = None
+
+    def nearest(self, x: float) -> int:
+        """Returns the index of the data point with the closest x value."""
+        if self._x_index is None:
+            if np.all(self.x_data[1:] >= self.x_data[:-1]):
+                self._x_index = (self.x_data, None)
+            else:
+                order = np.argsort(self.x_data, kind="stable")
+                self._x_index = (self.x_data[order], order)
+
+        xs, order = self._x_index
+        i = int(np.searchsorted(xs, x))
+        if i == xs.size or (i > 0 and x - xs[i - 1] <= xs[i] - x):
+            i -= 1
+        return i if order is None else int(order[i])
 
     @property
     def peaks(self):
@@ -62,18 +276,16 @@ class Spectrum:
         self._peaks_object = value
 
     def visible(self) -> None:
-        self.curve.set_visible(True)
-        self.curve.set_color(self._color)
         self.tristate = 1
+        self._add_line()
 
     def invisible(self) -> None:
-        self.curve.set_visible(False)
         self.tristate = 0
+        self._remove_line()
 
     def disabled(self) -> None:
-        self.curve.set_visible(True)
-        self.curve.set_color("grey")
         self.tristate = -1
+        self._add_line()
 
     def delete_peaks(self) -> None:
         self.has_peaks = False
@@ -90,20 +302,91 @@ class Spectrum:
 
 
 class SpectrumList:
-    """Spectrum list class to manage spectra."""
+    """Spectrum list class to manage spectra.
+
+    Ordered registry of the Spectrum objects, indexed by id, label and
+    table row. The listeners are called with (event, spectrum, row) on
+    every change, the event being "added", "removed", "changed" or
+    "cleared", so the views only update the rows that changed.
+    """
 
     def __init__(self) -> None:
-        self._list = {}
+        self._rows: list[Spectrum] = []
+        self._row_of: dict[int, int] = {}
+        self._by_label: dict[str, dict[int, Spectrum]] = {}
 
-    def add(self, spectrum):
-        if not self._list.get(spectrum.id, False):
-            self._list[spectrum.id] = {
-                "spectrum": spectrum,
-                "name": spectrum.label,
-                "visible": True,
-                "peaks": spectrum.peaks,
-            }
+        # Called on every change
+        self.listeners: list[Callable[[str, Optional[Spectrum], int], None]] = []
 
-    @property
-    def list(self):
-        return self._list
+    def _notify(self, event: str, spectrum: Optional[Spectrum], row: int) -> None:
+        for func in self.listeners:
+            func(event, spectrum, row)
+
+    def add(self, spectrum: Spectrum) -> int:
+        """Appends a Spectrum and returns its row."""
+        if spectrum.id in self._row_of:
+            return self._row_of[spectrum.id]
+
+        row = len(self._rows)
+        self._rows.append(spectrum)
+        self._row_of[spectrum.id] = row
+        self._by_label.setdefault(spectrum.label, {})[spectrum.id] = spectrum
+        self._notify("added", spectrum, row)
+        return row
+
+    def remove(self, spectrum: Spectrum) -> None:
+        """Removes a Spectrum, shifting the rows below it."""
+        row = self._row_of.pop(spectrum.id, None)
+        if row is None:
+            return
+
+        del self._rows[row]
+        for i in range(row, len(self._rows)):
+            self._row_of[self._rows[i].id] = i
+
+        same_label = self._by_label[spectrum.label]
+        del same_label[spectrum.id]
+        if not same_label:
+            del self._by_label[spectrum.label]
+
+        self._notify("removed", spectrum, row)
+
+    def clear(self) -> None:
+        """Removes every Spectrum."""
+        self._rows.clear()
+        self._row_of.clear()
+        self._by_label.clear()
+        self._notify("cleared", None, -1)
+
+    def changed(self, spectrum: Spectrum) -> None:
+        """Notifies that the state of a Spectrum changed."""
+        row = self._row_of.get(spectrum.id)
+        if row is not None:
+            self._notify("changed", spectrum, row)
+
+    def by_id(self, spectrum_id: int) -> Optional[Spectrum]:
+        row = self._row_of.get(spectrum_id)
+        return None if row is None else self._rows[row]
+
+    def by_label(self, label: str) -> Optional[Spectrum]:
+        """Returns the first Spectrum with the label."""
+        same_label = self._by_label.get(label)
+        return next(iter(same_label.values())) if same_label else None
+
+    def at(self, row: int) -> Spectrum:
+        return self._rows[row]
+
+    def row(self, spectrum: Spectrum) -> int:
+        return self._row_of[spectrum.id]
+
+    def values(self) -> list[Spectrum]:
+        return list(self._rows)
+
+    def __contains__(self, spectrum: Spectrum) -> bool:
+        return spectrum.id in self._row_of
+
+    def __iter__(self) -> Iterator[Spectrum]:
+        return iter(list(self._rows))
+
+    def __len__(self) -> int:
+        return len(self._rows)
@@ -0,0 +1,68 @@
+"""Columnar store holding the data of the Spectrum objects."""
+
+import os
+
+import numpy as np
+
+
+def mapped_from(a: np.ndarray, path: str) -> bool:
+    """Whether the array (or the array it is a view of) is mapped from the file."""
+    while isinstance(a.base, np.ndarray):
+        a = a.base
+    if not isinstance(a, np.memmap) or a.filename is None:
+        return False
+    return os.path.normcase(os.path.abspath(a.filename)) == os.path.normcase(
+        os.path.abspath(path)
+    )
+
+
+class SpectrumStore:
+    """Contiguous x, y and original y buffers of the spectra added together.
+
+    Each Spectrum keeps a reference to its store and its (start, stop)
+    slice, so thousands of spectra share three arrays instead of owning
+    three each. A store is freed with the last Spectrum using it.
+    """
+
+    __slots__ = ("x", "y", "y_orig", "bounds")
+
+    def __init__(
+        self, data: list[tuple[np.ndarray, np.ndarray]], dtype: str = "float64"
+    ) -> None:
+        sizes = [np.size(x) for x, _ in data]
+        if any(np.size(y) != size for (_, y), size in zip(data, sizes)):
+            raise ValueError("The x and y data must have the same length.")
+
+        self.bounds: np.ndarray = np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64)
+        self.x: np.ndarray = np.empty(self.bounds[-1], dtype=dtype)
+        self.y: np.ndarray = np.empty(self.bounds[-1], dtype=dtype)
+        for (x, y), start, stop in zip(data, self.bounds[:-1], self.bounds[1:]):
+            self.x[start:stop] = np.ravel(x)
+            self.y[start:stop] = np.ravel(y)
+        self.y_orig: np.ndarray = self.y.copy()
+
+    @classmethod
+    def from_buffers(
+        cls, x: np.ndarray, y: np.ndarray, y_orig: np.ndarray, bounds: np.ndarray
+    ) -> "SpectrumStore":
+        """Creates a store on the given arrays (e.g. memory maps) without copying them."""
+        store = cls.__new__(cls)
+        store.x, store.y, store.y_orig = x, y, y_orig
+        store.bounds = np.asarray(bounds, dtype=np.int64)
+        return store
+
+    def detach(self, path: str) -> None:
+        """Copies the arrays mapped from the file into memory, e.g. before
+        the file is replaced.
+        """
+        for name in self.__slots__:
+            a = getattr(self, name)
+            if mapped_from(a, path):
+                setattr(self, name, np.array(a))
+
+    def __len__(self) -> int:
+        return self.bounds.size - 1
+
+    @property
+    def nbytes(self) -> int:
+        return self.x.nbytes + self.y.nbytes + self.y_orig.nbytes
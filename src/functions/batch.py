@@ -0,0 +1,113 @@
+"""Headless batch processing of CSV files, free of any GUI dependency."""
+
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import as_completed
+from typing import Callable, Optional
+
+import numpy as np
+import pandas as pd
+from omegaconf import DictConfig
+
+from .data_process import csv_to_arrays
+from .kernels import asls_rows
+from .kernels import min_max_rows
+from .kernels import peaks_indices
+from .kernels import savgol_rows
+from .kernels import z_score_rows
+
+# Config section and row kernel of each processing step
+STEPS: dict[str, tuple[Optional[str], Callable]] = {
+    "smooth": ("smooth", savgol_rows),
+    "baseline": ("baseline", asls_rows),
+    "normalize": (None, min_max_rows),
+    "normalize_z": (None, z_score_rows),
+}
+
+
+def check_steps(steps: list[str]) -> None:
+    """Checks that every step of the chain is known."""
+    unknown = [step for step in steps if step not in STEPS and step != "peaks"]
+    if unknown:
+        raise ValueError(
+            f"Unknown batch steps {unknown}, "
+            f"choose from {list(STEPS) + ['peaks']}."
+        )
+
+
+def process_file(input_file: str, cfg: DictConfig) -> tuple[str, np.ndarray]:
+    """
+    Applies the chain of steps to one CSV file and writes the result
+    (x, y, peaks_x, peaks_y columns) in the output folder.
+    Returns the label and the x values of the peaks.
+
+    """
+    sep = "," if cfg.general.sep is None else cfg.general.sep
+    engine = "python" if len(sep) > 1 else cfg.general.engine
+
+    x, y, label, _ = csv_to_arrays(
+        input_file=input_file,
+        sep=sep,
+        engine=engine,
+        cache_dir=cfg.general.cache,
+        dtype=cfg.general.dtype,
+    )
+    y = y[np.newaxis]
+
+    peaks = np.empty(0, dtype=int)
+    for step in cfg.batch.steps:
+        if step == "peaks":
+            peaks = peaks_indices(y[0], cfg.peaks)
+        else:
+            section, kernel = STEPS[step]
+            y = kernel(y, cfg[section] if section else None)
+
+    out = pd.DataFrame({"x": x, "y": y[0]})
+    out["peaks_x"] = pd.Series(x[peaks])
+    out["peaks_y"] = pd.Series(y[0][peaks])
+
+    out_sep = "," if len(sep) > 1 else sep
+    out.to_csv(os.path.join(cfg.batch.output, f"{label}.csv"), sep=out_sep, index=False)
+
+    return label, x[peaks]
+
+
+def run_batch(cfg: DictConfig) -> dict[str, np.ndarray]:
+    """
+    Processes every file of the input folder across all cores and writes
+    the results and a peaks table (one column per file) in the output folder.
+
+    """
+    if not cfg.batch.input or not cfg.batch.output:
+        raise ValueError("Set both batch.input and batch.output.")
+    check_steps(cfg.batch.steps)
+
+    files = sorted(glob.glob(os.path.join(cfg.batch.input, cfg.batch.pattern)))
+    os.makedirs(cfg.batch.output, exist_ok=True)
+
+    peaks: dict[str, np.ndarray] = {}
+    failed: dict[str, str] = {}
+    with ProcessPoolExecutor(max_workers=cfg.batch.workers) as executor:
+        futures = {executor.submit(process_file, f, cfg): f for f in files}
+        for num, future in enumerate(as_completed(futures), start=1):
+            input_file = futures[future]
+            try:
+                label, peaks_x = future.result()
+            except Exception as e:
+                failed[input_file] = str(e)
+                print(f"[{num}/{len(files)}] {input_file}: failed ({e})")
+            else:
+                peaks[label] = peaks_x
+                print(f"[{num}/{len(files)}] {input_file}: {peaks_x.size} peaks")
+
+    if "peaks" in cfg.batch.steps:
+        table = pd.DataFrame(
+            {label: pd.Series(np.sort(peaks[label])) for label in sorted(peaks)}
+        )
+        sep = cfg.general.sep
+        sep = "," if sep is None or len(sep) > 1 else sep
+        table.to_csv(os.path.join(cfg.batch.output, "peaks.csv"), sep=sep, index=False)
+
+    print(f"Processed {len(peaks)} files, {len(failed)} failed.")
+    return peaks
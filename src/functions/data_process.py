@@ -1,19 +1,120 @@
 """Generic proccessing functions used in the GUI app."""
 
-from matplotlib.lines import Line2D
-import pandas as pd
+import glob
+import hashlib
+import os
+import threading
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
 
 from ..exceptions.exception import CustomException
+from ..functions.timings import timed
+
+if TYPE_CHECKING:
+    import pandas as pd
 
+@timed()
 def csv_to_dataframe(
     input_file: str,
     sep: str,
     engine: str
-    ) -> tuple[pd.DataFrame, str]:
+    ) -> tuple["pd.DataFrame", str]:
     """Converts the CSV file to a pd.DataFrame object."""
+    # Imported on first use, pandas is slow to import
+    import pandas as pd
+
     try:
         label = input_file.split("/")[-1].replace(".csv", "")
         df = pd.read_csv(input_file, sep=sep, engine=engine, dtype="float")
         return df, label
     except Exception as e:
         raise CustomException(e)
+
+
+def cache_path(input_file: str, cache_dir: str, dtype: str = "float64") -> str:
+    """
+    Returns the sidecar cache file of the CSV file.
+    The name is keyed by the path of the file and the dtype, then by the
+    size and modification time of the file, so any change to the CSV
+    file invalidates the cache.
+
+    """
+    path = os.path.abspath(input_file)
+    stat = os.stat(path)
+    path_key = hashlib.sha1(path.encode()).hexdigest()
+    file_key = hashlib.sha1(f"{stat.st_size}:{stat.st_mtime_ns}".encode()).hexdigest()
+    return os.path.join(cache_dir, f"{path_key}_{dtype}_{file_key[:16]}.npy")
+
+
+def write_cache(path: str, data: np.ndarray) -> None:
+    """
+    Writes the cache file and removes the stale ones of the same CSV file
+    and dtype. The caches of the other dtype are kept.
+
+    """
+    cache_dir = os.path.dirname(path)
+    os.makedirs(cache_dir, exist_ok=True)
+
+    prefix = os.path.basename(path).rsplit("_", 1)[0]
+    for old in glob.glob(os.path.join(cache_dir, f"{prefix}_*.npy")):
+        if old == path:
+            continue
+        try:
+            os.remove(old)
+        except OSError:
+            # Mapped by another load on Windows, removed by a later write
+            pass
+
+    # Write to a temporary file first so readers never see a partial file
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        np.save(f, data)
+    try:
+        os.replace(tmp, path)
+    except OSError:
+        # Written, and mapped, by another load meanwhile
+        os.remove(tmp)
+        if not os.path.exists(path):
+            raise
+
+
+@timed()
+def csv_to_arrays(
+    input_file: str,
+    sep: str,
+    engine: str,
+    cache_dir: Optional[str] = None,
+    dtype: str = "float64",
+    ) -> tuple[np.ndarray, np.ndarray, str, bool]:
+    """
+    Reads the first two columns of the CSV file
+    into contiguous x and y arrays of the dtype (float64 or float32).
+
+    With a `cache_dir` the arrays are stored in a binary sidecar file,
+    which later loads of the unchanged CSV file memory-map without parsing.
+    Returns the x and y arrays, the label and if the cache was used.
+
+    """
+    try:
+        label = input_file.split("/")[-1].replace(".csv", "")
+
+        path = None
+        if cache_dir is not None:
+            path = cache_path(input_file, os.path.expanduser(cache_dir), dtype)
+            if os.path.exists(path):
+                data = np.load(path, mmap_mode="r")
+                return data[0], data[1], label, True
+
+        import pandas as pd
+
+        df = pd.read_csv(input_file, sep=sep, engine=engine, usecols=[0, 1], dtype="float")
+        # One (2, N) block, so x and y are contiguous rows
+        data = np.ascontiguousarray(df.to_numpy(dtype=dtype).T)
+
+        if path is not None:
+            write_cache(path, data)
+
+        return data[0], data[1], label, False
+    except Exception as e:
+        raise CustomException(e)
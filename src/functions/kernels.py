@@ -0,0 +1,70 @@
+"""Row kernels applied to stacked y data, free of any GUI dependency."""
+
+import numpy as np
+from omegaconf import DictConfig
+
+from .asls import asls
+from .timings import timed
+
+
+@timed()
+def savgol_rows(y: np.ndarray, params: DictConfig) -> np.ndarray:
+    """Applies the Savitzky-Golay filter along the rows."""
+    # Imported on first use, scipy is slow to import
+    from scipy.signal import savgol_filter
+
+    return savgol_filter(
+        x=y,
+        window_length=params.window_length,
+        polyorder=params.polyorder,
+        deriv=params.deriv,
+        delta=params.delta,
+        axis=-1,
+    )
+
+
+@timed()
+def asls_rows(y: np.ndarray, params: DictConfig) -> np.ndarray:
+    """Removes the baseline of each row.
+    The baseline is solved in float64 and the result keeps the dtype of y.
+    """
+    return np.stack(
+        [abs(asls(row, params.lam, params.p, params.niter) - row) for row in y]
+    ).astype(y.dtype, copy=False)
+
+
+@timed()
+def min_max_rows(y: np.ndarray, params: None = None) -> np.ndarray:
+    """Applies the Min-Max Normalization along the rows."""
+    min_val = y.min(axis=-1, keepdims=True)
+    max_val = y.max(axis=-1, keepdims=True)
+    return (y - min_val) / (max_val - min_val)
+
+
+@timed()
+def z_score_rows(y: np.ndarray, params: None = None) -> np.ndarray:
+    """Applies the Z-score Normalization along the rows."""
+    mean_val = y.mean(axis=-1, keepdims=True)
+    std_val = y.std(axis=-1, keepdims=True)
+    return (y - mean_val) / std_val
+
+
+def shift_rows(y: np.ndarray, params: float) -> np.ndarray:
+    """Adds the offset `params` to the rows."""
+    return y + params
+
+
+@timed("find_peaks")
+def peaks_indices(y: np.ndarray, params: DictConfig) -> np.ndarray:
+    """Returns the indices of the peaks in the y data."""
+    from scipy.signal import find_peaks
+
+    peaks, _ = find_peaks(
+        x=y,
+        height=params.height,
+        threshold=params.threshold,
+        distance=params.distance,
+        prominence=params.prominence,
+        width=params.width,
+    )
+    return peaks
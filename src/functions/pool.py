@@ -0,0 +1,139 @@
+"""Process pool execution of the row kernels with shared memory arrays."""
+
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+from .kernels import asls_rows
+from .kernels import savgol_rows
+
+# Relative cost per point of the kernels worth sending to the pool.
+# The normalizations are memory bound and always run in process.
+POOL_COST: dict[Callable, float] = {
+    asls_rows: 10.0,
+    savgol_rows: 1.0,
+}
+
+_executor: Optional[ProcessPoolExecutor] = None
+_workers: int = 0
+_lock = threading.Lock()
+
+
+def get_executor(workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """Returns the process pool, starting it on first use.
+    The pool is kept alive so its startup cost is paid only once.
+    """
+    global _executor, _workers
+    workers = workers or os.cpu_count() or 1
+    with _lock:
+        if _executor is None or _workers != workers:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            # Never fork the Qt process
+            _executor = ProcessPoolExecutor(
+                max_workers=workers, mp_context=get_context("spawn")
+            )
+            _workers = workers
+        return _executor
+
+
+def shutdown() -> None:
+    """Stops the process pool."""
+    global _executor
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def use_pool(kernel: Callable, sizes: list[int], min_points: int) -> bool:
+    """
+    Decides if the work is large enough to pay for the pool overhead:
+
+    cost(kernel) * total_points >= min_points
+
+    Single spectra always run in process.
+
+    """
+    cost = POOL_COST.get(kernel, 0.0)
+    return len(sizes) > 1 and cost * sum(sizes) >= min_points
+
+
+def _balance(segments: list[tuple[int, int]], n: int) -> list[list[tuple[int, int]]]:
+    """Splits the segments into at most `n` chunks with similar number of points."""
+    chunks = [[] for _ in range(min(n, len(segments)))]
+    loads = [0] * len(chunks)
+    for start, stop in sorted(segments, key=lambda s: s[0] - s[1]):
+        i = loads.index(min(loads))
+        chunks[i].append((start, stop))
+        loads[i] += stop - start
+    return chunks
+
+
+def _run_segments(
+    shm_name: str,
+    size: int,
+    dtype: str,
+    kernel: Callable,
+    params: Any,
+    segments: list[tuple[int, int]],
+) -> None:
+    """Applies the kernel in place to the segments of the shared buffer."""
+    shm = SharedMemory(name=shm_name)
+    try:
+        buf = np.ndarray((size,), dtype=dtype, buffer=shm.buf)
+        for start, stop in segments:
+            buf[start:stop] = kernel(buf[np.newaxis, start:stop], params)[0]
+    finally:
+        # Release the view before closing the shared memory
+        buf = None
+        shm.close()
+
+
+def map_rows(
+    kernel: Callable,
+    rows: list[np.ndarray],
+    params: Any,
+    workers: Optional[int] = None,
+) -> list[np.ndarray]:
+    """
+    Applies the kernel to each row in the worker processes.
+
+    The rows are copied once into a shared memory buffer, which the
+    workers overwrite in place, so no array is pickled.
+    The rows may have different lengths and keep their common dtype.
+
+    """
+    offsets = np.concatenate([[0], np.cumsum([row.size for row in rows])])
+    size = int(offsets[-1])
+    segments = [(int(a), int(b)) for a, b in zip(offsets[:-1], offsets[1:])]
+
+    dtype = np.result_type(*rows) if rows else np.dtype(np.float64)
+
+    executor = get_executor(workers)
+
+    shm = SharedMemory(create=True, size=max(size, 1) * dtype.itemsize)
+    try:
+        buf = np.ndarray((size,), dtype=dtype, buffer=shm.buf)
+        for row, (start, stop) in zip(rows, segments):
+            buf[start:stop] = row
+
+        futures = [
+            executor.submit(_run_segments, shm.name, size, dtype.str, kernel, params, chunk)
+            for chunk in _balance(segments, _workers)
+        ]
+        for future in futures:
+            future.result()
+
+        out = buf.copy()
+    finally:
+        buf = None
+        shm.close()
+        shm.unlink()
+
+    return [out[start:stop] for start, stop in segments]
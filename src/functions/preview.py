@@ -0,0 +1,80 @@
+"""Functions computing the live preview of the processing settings."""
+
+import math
+from typing import Optional
+
+import numpy as np
+from omegaconf import DictConfig
+
+from ..functions.kernels import asls_rows
+from ..functions.kernels import peaks_indices
+from ..functions.kernels import savgol_rows
+from ..functions.timings import timings
+
+
+def visible_slice(x: np.ndarray, x0: float, x1: float) -> slice:
+    """Returns the slice of the monotonic x data inside [x0, x1]."""
+    lo, hi = min(x0, x1), max(x0, x1)
+    if x.size < 2 or x[-1] >= x[0]:
+        return slice(np.searchsorted(x, lo, "left"), np.searchsorted(x, hi, "right"))
+
+    # Decreasing x data
+    rev = x[::-1]
+    start = x.size - np.searchsorted(rev, hi, "right")
+    stop = x.size - np.searchsorted(rev, lo, "left")
+    return slice(start, stop)
+
+
+def decimate(
+    x: np.ndarray, y: np.ndarray, points: int
+) -> tuple[np.ndarray, np.ndarray, int]:
+    """Returns copies of every `stride`-th point, at most about `points` of them."""
+    stride = max(1, math.ceil(x.size / max(points, 1)))
+    return np.array(x[::stride]), np.array(y[::stride]), stride
+
+
+def scale_params(step: str, params: DictConfig, stride: int) -> DictConfig:
+    """Adapts the settings given in points of the full data to the decimated data."""
+    params = params.copy()
+    if stride == 1:
+        return params
+
+    if step == "smooth":
+        window = max(params.window_length // stride, params.polyorder + 1)
+        params.window_length = window + 1 - window % 2
+    elif step == "baseline":
+        # The second difference penalty scales with the fourth power of the step
+        params.lam = params.lam / stride**4
+    elif step == "peaks":
+        if params.distance is not None:
+            params.distance = max(1.0, params.distance / stride)
+        if isinstance(params.width, (int, float)):
+            params.width = params.width / stride
+    return params
+
+
+def preview_step(
+    step: str, x: np.ndarray, y: np.ndarray, params: DictConfig
+) -> tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+    """Returns the preview line and, for the peaks, the peak indices.
+    The kernels are timed apart from the processing, as preview_<kernel>.
+    """
+    with timings.prefixed("preview_"):
+        return _preview_step(step, x, y, params)
+
+
+def _preview_step(
+    step: str, x: np.ndarray, y: np.ndarray, params: DictConfig
+) -> tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+    if step == "smooth":
+        window = min(params.window_length, y.size - 1 + y.size % 2)
+        if window <= params.polyorder:
+            return x, y, None
+        params = params.copy()
+        params.window_length = window
+        return x, savgol_rows(y, params), None
+
+    if step == "baseline":
+        return x, asls_rows(y[np.newaxis], params)[0], None
+
+    return x, y, peaks_indices(y, params)
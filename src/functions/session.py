@@ -0,0 +1,323 @@
+"""Session files holding the spectra, the peaks and the Canvas state.
+
+A session file starts with MAGIC, the length of a JSON header as 8
+bytes (little endian) and the header. The arrays follow as raw blocks
+aligned on ALIGN bytes, with the offset (from the end of the header),
+dtype and shape of each block listed in the header. Reading maps the
+blocks in copy-on-write mode instead of parsing or copying them, the
+data are only read from the disk when they are drawn or processed.
+
+Writing over the file of an open session copies its mapped data into
+memory first, a mapped file cannot be replaced on Windows.
+"""
+
+import json
+import os
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Any, BinaryIO, Callable, Optional
+
+import numpy as np
+from omegaconf import DictConfig
+from omegaconf import OmegaConf
+
+from ..classes.history import ReplayHistory
+from ..classes.lod import MinMaxPyramid
+from ..classes.peaks import ManualPeaks
+from ..classes.peaks import PeakLayer
+from ..classes.peaks import Peaks
+from ..classes.pipeline import Pipeline
+from ..classes.spectra import Spectrum
+from ..classes.store import SpectrumStore
+from ..exceptions.exception import CustomException
+from ..functions.kernels import shift_rows
+from ..functions.spectra_process import PROCESS_ACTIONS
+from ..functions.spectra_process import ROW_KERNELS
+from ..functions.timings import timed
+
+MAGIC = b"SPECTRA\x01"
+VERSION = 1
+ALIGN = 64
+SUFFIX = ".spectra"
+
+# Kernels of the operation history, by name
+KERNELS: dict[str, Callable] = {kernel.__name__: kernel for _, kernel in ROW_KERNELS.values()}
+KERNELS[shift_rows.__name__] = shift_rows
+
+
+@dataclass
+class Session:
+    """Spectra, manual peaks, Canvas state and undo history read from a file."""
+
+    spectra: list[Spectrum]
+    my_peaks: ManualPeaks
+    state: dict[str, Any]
+    undo_stack: list[tuple] = field(default_factory=list)
+    redo_stack: list[tuple] = field(default_factory=list)
+
+
+def _aligned(size: int) -> int:
+    return -(-size // ALIGN) * ALIGN
+
+
+def _bounds(sizes: list[int]) -> np.ndarray:
+    return np.concatenate([[0], np.cumsum(sizes, dtype=np.int64)]).astype(np.int64)
+
+
+def _level_sizes(size: int) -> list[int]:
+    """Sizes of the levels above level 0 of a MinMaxPyramid."""
+    sizes = []
+    while size > 2:
+        size = (size + 1) // 2
+        sizes.append(size)
+    return sizes
+
+
+def _params_to_json(params: Any) -> Any:
+    if isinstance(params, DictConfig):
+        return OmegaConf.to_container(params, resolve=True)
+    if isinstance(params, np.generic):
+        return params.item()
+    return params
+
+
+def _params_from_json(params: Any) -> Any:
+    return OmegaConf.create(params) if isinstance(params, dict) else params
+
+
+def _entries(stack: list[tuple], index: dict[int, int]) -> list[list]:
+    """Returns the undo entries that only refer to the operation history."""
+    entries = []
+    for actions in stack:
+        if actions[0] in PROCESS_ACTIONS and actions[1] is None:
+            if actions[3].id in index:
+                entries.append(["process", actions[0], index[actions[3].id]])
+        elif actions[0] == "Apply Offset":
+            moved = [[index[sp.id], dx, dy] for sp, dx, dy in actions[1] if sp.id in index]
+            if moved:
+                entries.append(["offset", moved])
+    return entries
+
+
+def _actions(entries: list[list], spectra: list[Spectrum]) -> list[tuple]:
+    """Rebuilds the undo entries written by `_entries`."""
+    stack = []
+    for entry in entries:
+        if entry[0] == "process":
+            stack.append((entry[1], None, None, spectra[entry[2]]))
+        elif entry[0] == "offset":
+            moved = [(spectra[i], dx, dy) for i, dx, dy in entry[1]]
+            stack.append(("Apply Offset", moved, None))
+    return stack
+
+
+def _write_block(f: BinaryIO, dtype: np.dtype, parts: list[np.ndarray]) -> None:
+    """Writes the parts one after the other, then pads to ALIGN bytes."""
+    nbytes = 0
+    for part in parts:
+        part = np.ascontiguousarray(part, dtype=dtype)
+        part.tofile(f)
+        nbytes += part.nbytes
+    f.write(b"\0" * (_aligned(nbytes) - nbytes))
+
+
+@timed()
+def write_session(
+    path: str,
+    spectra: list[Spectrum],
+    my_peaks: ManualPeaks,
+    state: dict[str, Any],
+    history: Optional[ReplayHistory | Pipeline] = None,
+    undo_stack: list[tuple] = (),
+    redo_stack: list[tuple] = (),
+) -> None:
+    """Writes the spectra (with their original data, peaks and level of
+    detail), the manual peaks and the Canvas state to a session file.
+    The operations of each Spectrum and the undo entries using them
+    are kept if the history is given.
+    """
+    try:
+        dtype = np.result_type(*[sp.y_data.dtype for sp in spectra], np.float32)
+        peaks = [sp.peaks if sp.has_peaks else None for sp in spectra]
+        pyramids = [sp.lod.levels[1:] if sp.lod is not None else [] for sp in spectra]
+        lod_parts = [a for levels in pyramids for level in levels for a in level]
+        lod_dtype = np.result_type(*lod_parts) if lod_parts else np.dtype(np.int32)
+
+        # name: (dtype, shape, parts)
+        blocks = {
+            "x": (dtype, None, [sp.x_data for sp in spectra]),
+            "y": (dtype, None, [sp.y_data for sp in spectra]),
+            "y_orig": (dtype, None, [sp.y_orig for sp in spectra]),
+            "bounds": (np.int64, None, [_bounds([sp.x_data.size for sp in spectra])]),
+            "peaks_x": (dtype, None, [p.x for p in peaks if p is not None]),
+            "peaks_y": (dtype, None, [p.y for p in peaks if p is not None]),
+            "peaks_bounds": (
+                np.int64,
+                None,
+                [_bounds([0 if p is None else p.x.size for p in peaks])],
+            ),
+            "my_peaks": (np.float64, (len(my_peaks), 2), [my_peaks.xy]),
+            "lod": (lod_dtype, None, lod_parts),
+            "lod_bounds": (
+                np.int64,
+                None,
+                [_bounds([sum(a.size for level in lv for a in level) for lv in pyramids])],
+            ),
+        }
+
+        arrays, offset = {}, 0
+        for name, (block_dtype, shape, parts) in blocks.items():
+            block_dtype = np.dtype(block_dtype)
+            if shape is None:
+                shape = (sum(np.size(part) for part in parts),)
+            arrays[name] = {"offset": offset, "dtype": block_dtype.str, "shape": list(shape)}
+            offset += _aligned(int(np.prod(shape)) * block_dtype.itemsize)
+
+        header = {
+            "version": VERSION,
+            "arrays": arrays,
+            "spectra": [
+                {
+                    "label": sp.label,
+                    "loaded": sp.loaded,
+                    "tristate": sp.tristate,
+                    "color": sp.color,
+                    "offset": list(sp.offset),
+                    "lod": sp.lod is not None,
+                    "peaks": None
+                    if p is None
+                    else {"label": p.name, "visible": p.is_visible},
+                }
+                for sp, p in zip(spectra, peaks)
+            ],
+            "state": state,
+            "history": None,
+        }
+
+        if history is not None:
+            index = {sp.id: i for i, sp in enumerate(spectra)}
+            operations = []
+            for sp in spectra:
+                ops, position = history.operations(sp)
+                ops = [[kernel.__name__, _params_to_json(params)] for kernel, params in ops]
+                operations.append([ops, position])
+            header["history"] = {
+                "operations": operations,
+                "undo": _entries(undo_stack, index),
+                "redo": _entries(redo_stack, index),
+            }
+
+        text = json.dumps(header).encode()
+        start = _aligned(len(MAGIC) + 8 + len(text))
+
+        # Replace the file at the end, it may be mapped by an open session
+        temp = f"{path}.tmp"
+        try:
+            with open(temp, "wb") as f:
+                f.write(MAGIC)
+                f.write(len(text).to_bytes(8, "little"))
+                f.write(text)
+                f.write(b"\0" * (start - f.tell()))
+                for block_dtype, _, parts in blocks.values():
+                    _write_block(f, np.dtype(block_dtype), parts)
+            for sp in spectra:
+                sp.detach(path)
+            os.replace(temp, path)
+        except BaseException:
+            try:
+                os.remove(temp)
+            except OSError:
+                pass
+            raise
+    except Exception as e:
+        raise CustomException(e)
+
+
+@timed()
+def read_session(
+    path: str,
+    layer: PeakLayer,
+    history: Optional[ReplayHistory | Pipeline] = None,
+) -> Session:
+    """Reads a session file, mapping its arrays instead of copying them.
+    The peaks are created for `layer` and the operations of each
+    Spectrum are restored in the history, if given.
+    """
+    try:
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a session file.")
+            size = int.from_bytes(f.read(8), "little")
+            header = json.loads(f.read(size))
+        if header["version"] > VERSION:
+            raise ValueError(f"{path} was written by a newer version.")
+        start = _aligned(len(MAGIC) + 8 + size)
+
+        def array(name: str) -> np.ndarray:
+            meta = header["arrays"][name]
+            shape = tuple(meta["shape"])
+            if not np.prod(shape):
+                # Nothing to map
+                return np.empty(shape, dtype=meta["dtype"])
+            return np.memmap(
+                path,
+                dtype=meta["dtype"],
+                mode="c",
+                offset=start + meta["offset"],
+                shape=shape,
+            )
+
+        store = SpectrumStore.from_buffers(
+            array("x"), array("y"), array("y_orig"), array("bounds")
+        )
+        peaks_x, peaks_y = array("peaks_x"), array("peaks_y")
+        peaks_bounds = array("peaks_bounds")
+        lod, lod_bounds = array("lod"), array("lod_bounds")
+
+        spectra = []
+        for row, meta in enumerate(header["spectra"]):
+            sp = Spectrum(store, row, meta["label"])
+            sp.loaded = meta["loaded"]
+            sp.tristate = meta["tristate"]
+            # RGB(A) colors are written as JSON lists
+            color = meta["color"]
+            sp.color = tuple(color) if isinstance(color, list) else color
+            sp.set_offset(*meta["offset"])
+
+            if meta["lod"]:
+                # The indices of each level, min then max
+                levels, i = [], int(lod_bounds[row])
+                for n in _level_sizes(sp.x_data.size):
+                    levels.append((lod[i : i + n], lod[i + n : i + 2 * n]))
+                    i += 2 * n
+                sp.lod = MinMaxPyramid.from_levels(sp.x_data, sp.y_data, levels)
+
+            if meta["peaks"] is not None:
+                # Copied, the peaks are few and must not keep the file mapped
+                p0, p1 = peaks_bounds[row], peaks_bounds[row + 1]
+                peaks = Peaks(
+                    layer,
+                    sp.id,
+                    np.array(peaks_x[p0:p1]),
+                    np.array(peaks_y[p0:p1]),
+                    label=meta["peaks"]["label"],
+                    visible=meta["peaks"]["visible"],
+                )
+                sp.add_peaks(peaks)
+            spectra.append(sp)
+
+        my_peaks = ManualPeaks()
+        for x, y in array("my_peaks"):
+            my_peaks.append(x, y)
+
+        session = Session(spectra, my_peaks, header["state"])
+        saved = header["history"]
+        if history is not None and saved is not None:
+            for sp, (ops, position) in zip(spectra, saved["operations"]):
+                ops = [(KERNELS[name], _params_from_json(params)) for name, params in ops]
+                history.restore(sp, ops, position)
+            session.undo_stack = _actions(saved["undo"], spectra)
+            session.redo_stack = _actions(saved["redo"], spectra)
+        return session
+    except Exception as e:
+        raise CustomException(e)
@@ -1,18 +1,26 @@
 """Spectra processing functions used in the GUI app."""
 
+from typing import TYPE_CHECKING, Callable, Optional
+
 import numpy as np
-from matplotlib.lines import Line2D
 from omegaconf import DictConfig
-from scipy import sparse
-from scipy.signal import find_peaks
-from scipy.signal import savgol_filter
 
 from ..classes.spectra import Peaks
 from ..classes.spectra import Spectrum
-from ..functions.canvas import canvas_remove
-from ..gui.canvas import Canvas
+from ..functions.asls import asls
+from ..functions.kernels import asls_rows
+from ..functions.kernels import min_max_rows
+from ..functions.kernels import peaks_indices
+from ..functions.kernels import savgol_rows
+from ..functions.kernels import z_score_rows
+from ..functions.pool import map_rows
+from ..functions.timings import timed
+
+if TYPE_CHECKING:
+    from ..gui.canvas import Canvas
 
 
+@timed()
 def smoothing(*args) -> tuple[str, np.ndarray, np.ndarray, Spectrum]:
     """
     Smooths the lines by removing the noise in the signal,
@@ -23,6 +31,9 @@ def smoothing(*args) -> tuple[str, np.ndarray, np.ndarray, Spectrum]:
     sp: Spectrum = args[0]
     params: DictConfig = args[1]
 
+    # Imported on first use, scipy is slow to import
+    from scipy.signal import savgol_filter
+
     # Get the previous y data
     prev: np.ndarray = np.copy(sp.y_data)
 
@@ -41,52 +52,53 @@ def smoothing(*args) -> tuple[str, np.ndarray, np.ndarray, Spectrum]:
     return ("Smooth", prev, y_smooth, sp)
 
 
-def peaks_find(*args) -> tuple[str, Line2D, Spectrum]:
+@timed()
+def peaks_find(*args) -> Optional[tuple[str, Peaks, Spectrum, Optional[Peaks]]]:
     """Finds peaks in the curves."""
     # Unpack the arguments
     sp: Spectrum = args[0]
     params: DictConfig = args[1][0]
-    canvas: Canvas = args[1][1]
+    canvas: "Canvas" = args[1][1]
 
-    if sp.has_peaks:
-        # remove the sp.peak_object from the canvas
-        canvas_remove(sp.peaks)
-        sp.peaks_object = None
+    peaks = peaks_indices(sp.y_data, params)
 
-    peaks, _ = find_peaks(
-        x=sp.y_data,
-        height=params.height,
-        threshold=params.threshold,
-        distance=params.distance,
-        prominence=params.prominence,
-        width=params.width,
-    )
+    return peaks_plot(sp, peaks, canvas)
+
+
+@timed()
+def peaks_plot(
+    sp: Spectrum, peaks: np.ndarray, canvas: "Canvas"
+) -> Optional[tuple[str, Peaks, Spectrum, Optional[Peaks]]]:
+    """Adds the peaks found in the Spectrum object to the
+    peak layer of the Canvas.
+    """
+    old = sp.peaks
+    if sp.has_peaks:
+        # remove the old peaks from the peak layer
+        sp.peaks.remove()
+        sp.delete_peaks()
 
     if peaks.size > 0:
-        sp.has_peaks = True
-
-        pks = canvas.axes.scatter(
-            x=sp.x_data[peaks], 
-            y=sp.y_data[peaks],
-            c="red",
-            s=2,
-            zorder=3,
-            label=f"peak_{sp.label}"
+        pks_obj = Peaks(
+            canvas.peak_layer,
+            sp.id,
+            sp.x_data[peaks],
+            sp.y_data[peaks],
+            label=f"peak_{sp.label}",
         )
-        
-        # Update the peaks object within the Spectrum object
-        pks_obj = Peaks(pks)
-        sp.peaks = pks_obj
+        sp.add_peaks(pks_obj, canvas.axes)
 
-        return ("Peaks", pks_obj, sp)
+        return ("Peaks", pks_obj, sp, old)
 
 
+@timed()
 def baseline(*args) -> tuple[str, np.ndarray, np.ndarray, Spectrum]:
     """Removes the baseline from the lines.
 
     Based on "Asymmetric Least Squares Smoothing" paper
     by P. Eilers and H. Boelens in 2005.
-    
+    The linear systems are solved by the banded engine in `asls`.
+
     """
     # Unpack the arguments
     sp: Spectrum = args[0]
@@ -101,20 +113,10 @@ def baseline(*args) -> tuple[str, np.ndarray, np.ndarray, Spectrum]:
     p = params.p
     niter = params.niter
 
-    L = len(y_)
-    D = sparse.diags([1, -2, 1], [0, -1, -2], shape=(L, L - 2))
-    # Precompute this term since it does not depend on `w`
-    D = lam * D.dot(D.transpose())
-    w = np.ones(L)
-    W = sparse.spdiags(w, 0, L, L)
-    for _ in range(niter):
-        # Do not create a new matrix, just update diagonal values
-        W.setdiag(w)
-        Z = W + D
-        z = sparse.linalg.spsolve(Z, w * sp.y)
-        w = p * (sp.y > z) + (1 - p) * (sp.y < z)
-
-    y_baseline = abs(z - y_)
+    z = asls(y_, lam, p, niter)
+
+    # The baseline is solved in float64, keep the dtype of the data
+    y_baseline = abs(z - y_).astype(y_.dtype, copy=False)
 
     # Update the y data
     sp.y = y_baseline
@@ -122,6 +124,7 @@ def baseline(*args) -> tuple[str, np.ndarray, np.ndarray, Spectrum]:
     return ("Baseline", prev, y_baseline, sp)
 
 
+@timed()
 def norm_min_max(*args) -> tuple[str, np.ndarray, np.ndarray, Spectrum]:
     """
     Applies the Min-Max Normalization:
@@ -152,6 +155,7 @@ def norm_min_max(*args) -> tuple[str, np.ndarray, np.ndarray, Spectrum]:
     return ("Normalize Min-Max", prev, y_normalized, sp)
 
 
+@timed()
 def norm_z(*args) -> tuple[str, np.ndarray, np.ndarray, Spectrum]:
     """
     Applies the Z-score Normalization:
@@ -180,3 +184,74 @@ def norm_z(*args) -> tuple[str, np.ndarray, np.ndarray, Spectrum]:
     sp.y = y_normalized_z
 
     return ("Normalize Z", prev, y_normalized_z, sp)
+
+
+## Batch processing ##
+def same_length(spectra: list[Spectrum]) -> bool:
+    """Checks if the spectra can be stacked into one 2-D array."""
+    return len({sp.y_data.size for sp in spectra}) == 1
+
+
+def stack_y(spectra: list[Spectrum]) -> np.ndarray:
+    """Stacks the y data of the spectra into one 2-D array."""
+    return np.stack([sp.y_data for sp in spectra])
+
+
+# Action name and row kernel of each per-spectrum function
+ROW_KERNELS: dict[Callable, tuple[str, Callable]] = {
+    smoothing: ("Smooth", savgol_rows),
+    baseline: ("Baseline", asls_rows),
+    norm_min_max: ("Normalize Min-Max", min_max_rows),
+    norm_z: ("Normalize Z", z_score_rows),
+}
+
+# Names of the actions that change the y data
+PROCESS_ACTIONS: tuple[str, ...] = tuple(name for name, _ in ROW_KERNELS.values())
+
+# Functions whose kernel is vectorized over all the rows at once
+BATCH_FUNCTIONS: tuple[Callable, ...] = (smoothing, norm_min_max, norm_z)
+
+
+def write_rows(
+    name: str, spectra: list[Spectrum], prev: np.ndarray, new: np.ndarray
+) -> list[tuple[str, np.ndarray, np.ndarray, Spectrum]]:
+    """Writes the rows of `new` back to the spectra and returns the actions."""
+    actions = []
+    for row, sp in enumerate(spectra):
+        sp.y = new[row]
+        actions.append((name, prev[row], new[row], sp))
+    return actions
+
+
+@timed()
+def process_rows(
+    function: Callable, spectra: list[Spectrum], params: DictConfig
+) -> tuple[np.ndarray, np.ndarray]:
+    """Returns the stacked previous and new y data, leaving the spectra unchanged."""
+    _, kernel = ROW_KERNELS[function]
+    prev = stack_y(spectra)
+    return prev, kernel(prev, params)
+
+
+@timed()
+def process_batch(
+    function: Callable, spectra: list[Spectrum], params: DictConfig
+) -> list[tuple[str, np.ndarray, np.ndarray, Spectrum]]:
+    """Applies the function to the stacked y data of the spectra."""
+    name, _ = ROW_KERNELS[function]
+    return write_rows(name, spectra, *process_rows(function, spectra, params))
+
+
+@timed()
+def process_rows_pool(
+    function: Callable,
+    spectra: list[Spectrum],
+    params: DictConfig,
+    workers: Optional[int] = None,
+) -> tuple[list[np.ndarray], list[np.ndarray]]:
+    """Same as `process_rows` but the rows are processed in the process pool.
+    The spectra may have different lengths.
+    """
+    _, kernel = ROW_KERNELS[function]
+    prev = [np.copy(sp.y_data) for sp in spectra]
+    return prev, map_rows(kernel, prev, params, workers)
@@ -0,0 +1,36 @@
+"""Timing of the start of the GUI app."""
+
+import sys
+import time
+
+# Modules the start of the app should not need
+HEAVY_MODULES: tuple[str, ...] = ("scipy", "seaborn", "mplcursors", "pandas")
+
+
+class StartupTimer:
+    """Time of each step of the start, measured from the creation of the timer."""
+
+    def __init__(self) -> None:
+        self.start: float = time.perf_counter()
+        self._last: float = self.start
+        self.steps: list[tuple[str, float]] = []
+
+    def mark(self, step: str) -> None:
+        """Ends a step, started at the previous mark."""
+        now = time.perf_counter()
+        self.steps.append((step, now - self._last))
+        self._last = now
+
+    def report(self) -> str:
+        """Returns the breakdown of the start as text."""
+        lines = [f"{step:<28}{seconds * 1000:>9.1f} ms" for step, seconds in self.steps]
+        total = self._last - self.start
+        lines.append(f"{'total':<28}{total * 1000:>9.1f} ms")
+
+        loaded = [name for name in HEAVY_MODULES if name in sys.modules]
+        lines.append("heavy modules loaded: " + (", ".join(loaded) or "none"))
+        return "\n".join(lines)
+
+
+# Created with the first import, main.py imports it before anything else
+timer = StartupTimer()
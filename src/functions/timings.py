@@ -0,0 +1,200 @@
+"""Opt-in timing of the hot paths of the app."""
+
+import csv
+import datetime
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Iterator, Optional
+
+import numpy as np
+
+# Upper edges of the histogram buckets in seconds, 0.1 ms to 10 s
+BUCKETS: tuple[float, ...] = tuple(10 ** (e / 2) for e in range(-8, 3))
+
+
+class Timings:
+    """Rolling timings of the named steps and breakdown of the last action.
+
+    Each step keeps its last `window` durations, the histograms are
+    computed from them on demand. An action (e.g. a load) starts a new
+    breakdown that adds up the steps recorded until the next action,
+    including the ones of the background jobs it started.
+    """
+
+    def __init__(self, window: int = 1000) -> None:
+        self.enabled: bool = False
+        self.window: int = window
+
+        self._samples: dict[str, deque[float]] = {}
+        self._lock = threading.Lock()
+
+        # Prefix of the steps recorded by the current thread
+        self._local = threading.local()
+
+        # Last action
+        self.action: Optional[str] = None
+        self._start: float = 0.0
+        self._end: float = 0.0
+        self._breakdown: dict[str, list[float]] = {}
+
+    def configure(self, enabled: bool, window: int) -> None:
+        with self._lock:
+            self.enabled = enabled
+            self.window = window
+            self._samples = {}
+
+    def begin(self, action: str) -> None:
+        """Starts the breakdown of a new action."""
+        with self._lock:
+            self.action = action
+            self._start = self._end = time.perf_counter()
+            self._breakdown = {}
+
+    @contextmanager
+    def prefixed(self, prefix: str) -> Iterator[None]:
+        """Records the steps of the current thread as `prefix` + step,
+        apart from the breakdown of the last action (e.g. the previews).
+        """
+        previous = getattr(self._local, "prefix", "")
+        self._local.prefix = prefix
+        try:
+            yield
+        finally:
+            self._local.prefix = previous
+
+    def record(self, step: str, seconds: float) -> None:
+        """Adds the duration of a step, from any thread."""
+        prefix = getattr(self._local, "prefix", "")
+        step = prefix + step
+        with self._lock:
+            samples = self._samples.get(step)
+            if samples is None:
+                samples = self._samples[step] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+            if self.action is not None and not prefix:
+                total = self._breakdown.setdefault(step, [0.0, 0])
+                total[0] += seconds
+                total[1] += 1
+                self._end = max(self._end, time.perf_counter())
+
+    def histogram(self, step: str) -> dict[str, Any]:
+        """Returns the statistics and the bucket counts of the step."""
+        with self._lock:
+            samples = np.fromiter(self._samples.get(step, ()), dtype=np.float64)
+        if samples.size == 0:
+            return {"count": 0}
+
+        edges = np.array(BUCKETS + (np.inf,))
+        counts = np.bincount(np.searchsorted(edges, samples), minlength=edges.size)
+        return {
+            "count": int(samples.size),
+            "total_s": float(samples.sum()),
+            "mean_s": float(samples.mean()),
+            "p50_s": float(np.percentile(samples, 50)),
+            "p95_s": float(np.percentile(samples, 95)),
+            "max_s": float(samples.max()),
+            "buckets": [
+                {"le": None if np.isinf(edge) else edge, "count": int(count)}
+                for edge, count in zip(edges, counts)
+            ],
+        }
+
+    def histograms(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            steps = sorted(self._samples)
+        return {step: self.histogram(step) for step in steps}
+
+    def breakdown(self) -> list[tuple[str, float, int]]:
+        """Returns the (step, seconds, calls) of the last action, slowest first."""
+        with self._lock:
+            steps = [(step, s, int(n)) for step, (s, n) in self._breakdown.items()]
+        return sorted(steps, key=lambda step: step[1], reverse=True)
+
+    def summary(self, steps: int = 4) -> str:
+        """Returns the last action and its slowest steps as one line."""
+        if self.action is None:
+            return ""
+        parts = [
+            f"{step} {seconds * 1000:.0f} ms" + (f" ×{calls}" if calls > 1 else "")
+            for step, seconds, calls in self.breakdown()[:steps]
+        ]
+        total = (self._end - self._start) * 1000
+        return f"{self.action} {total:.0f} ms: " + ", ".join(parts)
+
+    def export(self, path: str) -> None:
+        """Writes the histograms to a CSV file, or a JSON file for any other suffix."""
+        histograms = self.histograms()
+        if path.lower().endswith(".csv"):
+            labels = [f"le_{edge:g}" for edge in BUCKETS] + ["le_inf"]
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(
+                    ["step", "count", "total_s", "mean_s", "p50_s", "p95_s", "max_s"]
+                    + labels
+                )
+                for step, hist in histograms.items():
+                    writer.writerow(
+                        [step]
+                        + [hist[key] for key in ("count", "total_s", "mean_s")]
+                        + [hist[key] for key in ("p50_s", "p95_s", "max_s")]
+                        + [bucket["count"] for bucket in hist["buckets"]]
+                    )
+
+                # Breakdown of the last action, after a blank row
+                writer.writerow([])
+                writer.writerow(["last_action", "total_s", "step", "seconds", "calls"])
+                total = self._end - self._start
+                for step, seconds, calls in self.breakdown():
+                    writer.writerow([self.action, total, step, seconds, calls])
+            return
+
+        trace = {
+            "exported": datetime.datetime.now().isoformat(timespec="seconds"),
+            "window": self.window,
+            "steps": histograms,
+            "last_action": {
+                "action": self.action,
+                "total_s": self._end - self._start,
+                "steps": [
+                    {"step": step, "seconds": seconds, "calls": calls}
+                    for step, seconds, calls in self.breakdown()
+                ],
+            },
+        }
+        with open(path, "w") as f:
+            json.dump(trace, f, indent=1)
+
+
+# Shared by the app, enabled from the settings
+timings = Timings()
+
+
+def timed(name: Optional[str] = None, action: bool = False) -> Callable:
+    """Records the duration of each call of the function under `name`.
+    An action also starts a new breakdown. Disabled, the call costs
+    one attribute lookup.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        step = name or func.__name__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not timings.enabled:
+                return func(*args, **kwargs)
+            if action:
+                timings.begin(step)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                timings.record(step, time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
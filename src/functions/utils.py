@@ -2,7 +2,7 @@
 
 import os
 
-import pandas as pd
+import numpy as np
 from matplotlib.axes import Axes
 from matplotlib.lines import Line2D
 
@@ -13,6 +13,9 @@ from ..classes.spectra import Spectrum
 from ..exceptions.exception import CustomException
 
 def save_as(curves: dict, sep: str) -> None:
+    # Imported on first use, pandas is slow to import
+    import pandas as pd
+
     try:
         dfs = []
         for i in curves.values():
@@ -20,8 +23,8 @@ def save_as(curves: dict, sep: str) -> None:
                 title = i.label
                 df = pd.DataFrame({"x": i.x_data, "y": i.y_data})
                 if i.peaks:
-                    df["peaks_x"] = pd.Series(i.peaks_object.get_xdata())
-                    df["peaks_y"] = pd.Series(i.peaks_object.get_ydata())
+                    df["peaks_x"] = pd.Series(i.peaks.x)
+                    df["peaks_y"] = pd.Series(i.peaks.y)
             dfs.append((title, df))
 
         direc = str(
@@ -52,6 +55,19 @@ def get_file(path: str) -> str:
     except Exception as e:
         raise CustomException(e)
 
+def get_files(path: str) -> list[str]:
+    """Popup dialog for loading one or more files."""
+    try:
+        input_files = QFileDialog.getOpenFileNames(
+            parent=None,
+            caption="Choose files",
+            directory=path,
+            filter="Data file (*.csv)",
+        )[0]
+        return input_files
+    except Exception as e:
+        raise CustomException(e)
+
 def label_options(label: str) -> tuple[str, str]:
     """Retrieves the x, y label values."""
     x, y = Label.return_value(label)
@@ -62,11 +78,12 @@ def get_handles(ax: Axes) -> list[Line2D]:
     handles = [i for i in handles if not (i.get_label() == "cursor" or i.get_label().startswith("peak_"))]
     return handles
 
-def add_spectrum(curve: Line2D) -> Spectrum:
-    """Creates a Spectrum object."""
+def add_spectra(
+    data: list[tuple[np.ndarray, np.ndarray, str]], dtype: str = "float64"
+) -> list[Spectrum]:
+    """Creates the Spectrum objects of the (x, y, label) data."""
     try:
-        sp = Spectrum(curve)
-        return sp
+        return Spectrum.from_arrays(data, dtype)
     except Exception as e:
         raise CustomException(e)
 
@@ -82,3 +99,26 @@ def check_path(file: str, title: str) -> str:
         path = os.path.join(file, f"{title}_({str(counter)}).csv")
         counter += 1
     return path
+
+
+def snap_to_spectra(
+    curves: dict, ax: Axes, x: float, y: float
+) -> tuple[float, float]:
+    """Returns the data point nearest to (x, y) on screen,
+    among the closest x values of the visible Spectrum objects.
+    """
+    candidates = []
+    for sp in curves.values():
+        if sp.tristate == 1 and sp.x_data.size:
+            # Compare with the lines as drawn, offset included
+            dx, dy = sp.offset
+            i = sp.nearest(x - dx)
+            candidates.append((sp.x_data[i] + dx, sp.y_data[i] + dy))
+    if not candidates:
+        return x, y
+
+    points = np.asarray(candidates, dtype=float)
+    # Compare the distances in pixels, whatever the units of the axes
+    dist = ax.transData.transform(points) - ax.transData.transform((x, y))
+    best = int(np.argmin(np.hypot(dist[:, 0], dist[:, 1])))
+    return float(points[best, 0]), float(points[best, 1])
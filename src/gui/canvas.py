@@ -1,23 +1,39 @@
 """Canvas class for the main app."""
 
-import seaborn as sns
+from typing import Callable
+
+import matplotlib as mpl
 from matplotlib.backend_bases import LocationEvent
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg
 from matplotlib.figure import Figure
 
 from PyQt5 import QtCore
 
-# Set style for plotting
-sns.set_style(
-    "darkgrid",
+from ..classes.peaks import PeakLayer
+from ..functions.timings import timed
+from .overlay import BlitOverlay
+from .render import RenderScheduler
+
+# Set style for plotting, the "darkgrid" style of seaborn
+# without importing it (seaborn imports scipy.stats)
+mpl.rcParams.update(
     {
+        "axes.axisbelow": True,
+        "axes.edgecolor": "white",
+        "axes.facecolor": "#EAEAF2",
+        "axes.grid": True,
+        "axes.labelcolor": ".15",
+        "grid.color": "white",
+        "lines.solid_capstyle": "round",
+        "patch.edgecolor": "w",
+        "patch.force_edgecolor": True,
+        "text.color": ".15",
+        "xtick.bottom": False,
+        "ytick.left": False,
         "xtick.color": "#999999",
         "ytick.color": "#999999",
-        "xtick.labelsize": 0.5,
-        "ytick.labelsize": 0.5,
         "font.family": "serif",
-        "axes.grid": True,
-    },
+    }
 )
 
 
@@ -30,6 +46,10 @@ class Canvas(FigureCanvasQTAgg):
         self.axes = self.fig.add_subplot(111)
         super(Canvas, self).__init__(self.fig)
 
+        # Functions called before and after each draw
+        self.pre_draw: list[Callable[[], None]] = []
+        self.post_draw: list[Callable[[], None]] = []
+
         def onframe(event: LocationEvent) -> None:
             """Make the cursor invisible."""
             self.setCursor(QtCore.Qt.BlankCursor)
@@ -41,14 +61,34 @@ class Canvas(FigureCanvasQTAgg):
             top=0.941, bottom=0.096, left=0.043, right=0.99, hspace=0.2, wspace=0.2
         )
 
+        # Coalesces the draws of the canvas
+        self.render_scheduler = RenderScheduler(self)
+
+        # Peaks of every Spectrum in a single collection
+        self.peak_layer = PeakLayer(self.axes)
+
+        # Crosshair and manual peaks blitted over the cached background
+        self.overlay = BlitOverlay(self)
+
         self.resize_canvas()
 
     def resize_canvas(self) -> None:
         """Adjust the canvas size."""
         width, height = self.size().width(), self.size().height()
         self.fig.set_size_inches(width / self.fig.dpi, height / self.fig.dpi)
-        self.fig.tight_layout(pad=1)
-        self.draw()
+        self.render_scheduler.request_layout()
+
+    def draw(self) -> None:
+        """Runs the pre-draw functions, draws the figure and runs the post-draw ones."""
+        for func in self.pre_draw:
+            func()
+        self._draw()
+        for func in self.post_draw:
+            func()
+
+    @timed("draw")
+    def _draw(self) -> None:
+        super(Canvas, self).draw()
 
     def resizeEvent(self, event) -> None:
         """Handle resize event to adjust canvas."""
@@ -1,186 +1,656 @@
 """Functions for the GUI app."""
 
-from collections import namedtuple
-from typing import Callable
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
 
 import matplotlib.pyplot as plt
-import mplcursors
 import numpy as np
-import pandas as pd
 from matplotlib.axes import Axes
 from matplotlib.lines import Line2D
-from matplotlib.widgets import Cursor
 
 from PyQt5 import QtCore
 from PyQt5 import QtWidgets
 
-from ..classes.peaks import Peaks
+from .canvas import Canvas
+from ..classes.memory import SpillStore
+from ..classes.memory import held_bytes
+from ..classes.memory import spilled
+from ..classes.history import ReplayHistory
+from ..classes.peaks import ManualPeaks
+from ..classes.pipeline import Pipeline
+from ..classes.spectra import Spectrum
 from ..exceptions.exception import CustomException
 from ..functions.canvas import canvas_clear
 from ..functions.canvas import canvas_get_zoom
-from ..functions.canvas import canvas_remove
 from ..functions.canvas import canvas_restore_zoom
 from ..functions.canvas import canvas_update
-from ..functions.data_process import csv_to_dataframe
-from ..functions.utils import add_spectrum
-from ..functions.utils import get_file
+from ..functions.data_process import csv_to_arrays
+from ..functions.kernels import shift_rows
+from ..functions.spectra_process import BATCH_FUNCTIONS
+from ..functions.spectra_process import PROCESS_ACTIONS
+from ..functions.spectra_process import ROW_KERNELS
+from ..functions.spectra_process import peaks_find
+from ..functions.spectra_process import peaks_indices
+from ..functions.spectra_process import peaks_plot
+from ..functions.pool import use_pool
+from ..functions.session import SUFFIX as SESSION_SUFFIX
+from ..functions.session import read_session
+from ..functions.session import write_session
+from ..functions.spectra_process import process_rows
+from ..functions.spectra_process import process_rows_pool
+from ..functions.spectra_process import same_length
+from ..functions.spectra_process import write_rows
+from ..functions.timings import timed
+from ..functions.timings import timings
+from ..functions.utils import add_spectra
+from ..functions.utils import get_files
 from ..functions.utils import get_handles
 from ..functions.utils import label_options
 
 
+# Check state of the Spectrum column for each Spectrum.tristate
+CHECK_STATES = {
+    1: QtCore.Qt.Checked,
+    0: QtCore.Qt.Unchecked,
+    -1: QtCore.Qt.PartiallyChecked,
+}
+
+
 class QtFunctions:
     """Function class for the GUI app."""
 
-    def plot(self, df: pd.DataFrame, label: str, ax: Axes, state: str = "Add") -> Axes:
-        """Plots the pd.DataFrame object to the Canvas."""
+    def plot(
+        self, x: np.ndarray, y: np.ndarray, label: str, ax: Axes, state: str = "Add"
+    ) -> Axes:
+        """Plots the x and y arrays to the Canvas."""
+        self.plot_many([(x, y, label)], ax=ax, state=state)
+        return ax
+
+    @timed()
+    def plot_many(
+        self,
+        data: list[tuple[np.ndarray, np.ndarray, str]],
+        ax: Axes,
+        state: str = "Add",
+    ) -> list[Spectrum]:
+        """Plots many x and y arrays to the Canvas with a single update."""
         try:
-            ax = df.plot(
-                ax=ax,
-                x=0,
-                y=1,
-                lw=self.settings.general.lw,
-                legend=self.legend,
-                label=label,
-            )
-
-            # Convert DataFrame to Spectrum object
-            sp = add_spectrum(ax.lines[-1])
-            self.curves.update({sp.label: sp})
+            # The data of all the spectra go in one store
+            new = add_spectra(data, self.settings.general.dtype)
+            for sp in new:
+                sp.loaded = state == "Load"
+                if sp.x_data.size > self.settings.general.lod_points:
+                    sp.enable_lod()
+                sp.show(ax, self.settings.general.lw)
+                self.curves.add(sp)
+
+            # Recompute the data limits once for all the lines
+            ax.relim()
+            ax.autoscale_view()
 
             if self.legend:
                 self.add_legend()
-            if state == "Load":
-                self.curves[list(self.curves)[-1]].loaded = True
 
-            self.cursor: Cursor = canvas_update(
-                self.canvas, self.xlabel, self.ylabel, self.title
-            )
+            canvas_update(self.canvas, self.xlabel, self.ylabel, self.title)
 
-            self.update_spectrum_table()
-
-            return ax
+            return new
         except Exception as e:
             raise CustomException(e)
 
+    @timed(action=True)
     def load(self) -> None:
-        """Loads the File."""
+        """Loads the Files, replacing the current lines."""
         try:
-            if self.curves:
-                for i in self.curves.values():
+            input_files = get_files(self.settings.general.path)
+            if not input_files:
+                return
+
+            # Wait for the jobs on the current spectra
+            keys = ["load"] + [i.id for i in self.curves.values()]
+            self.scheduler.submit(
+                keys=keys,
+                compute=lambda: self.read_files(input_files),
+                apply=self.load_finished,
+            )
+        except Exception as e:
+            raise CustomException(e)
+
+    def read_file(
+        self, input_file: str
+    ) -> tuple[np.ndarray, np.ndarray, str, float, bool]:
+        """Reads the file and times it."""
+        start = time.perf_counter()
+        x, y, label, cached = csv_to_arrays(
+            input_file=input_file,
+            sep=self.sep,
+            engine=self.engine,
+            cache_dir=self.settings.general.cache,
+            dtype=self.settings.general.dtype,
+        )
+        elapsed = time.perf_counter() - start
+        return x, y, label, elapsed, cached
+
+    def read_files(
+        self, input_files: list[str]
+    ) -> list[tuple[np.ndarray, np.ndarray, str, float, bool]]:
+        """Reads the files concurrently in a thread pool (on the worker thread)."""
+        with ThreadPoolExecutor() as executor:
+            return list(executor.map(self.read_file, input_files))
+
+    def report_load(
+        self, results: list[tuple[np.ndarray, np.ndarray, str, float, bool]]
+    ) -> None:
+        """Shows the load time of each file in the status bar."""
+        times = [
+            f"{label} in {elapsed * 1000:.1f} ms" + (" (cache)" if cached else "")
+            for _, _, label, elapsed, cached in results
+        ]
+        self.statusbar.showMessage("Loaded " + ", ".join(times), 5000)
+
+    def load_finished(
+        self, results: list[tuple[np.ndarray, np.ndarray, str, float, bool]]
+    ) -> None:
+        """Replaces the Canvas lines with the loaded files."""
+        try:
+            self.report_load(results)
+
+            last = ""
+            old = self.curves.values()
+            if old:
+                for i in old:
                     if i.loaded:
                         self.load_list.append(i)
-                last = self.curves.pop(list(self.curves)[-1])
-                self.curves = dict()
+                last = old[-1]
+                self.curves.clear()
 
-            input_file = get_file(self.settings.general.path)
-            df, label = csv_to_dataframe(
-                input_file=input_file, sep=self.sep, engine=self.engine
-            )
-            self.title = label
+            self.title = results[0][2]
 
             # keep the old x and y limits
             old_x_lim, old_y_lim = canvas_get_zoom(self.canvas)
 
             canvas_clear(self.canvas.axes)
-            self.plot(df=df, label=label, ax=self.canvas.axes, state="Load")
+            for i in old:
+                i.hide()
+            self.canvas.peak_layer.clear()
+            new, *added = self.plot_many(
+                [(x, y, label) for x, y, label, _, _ in results],
+                ax=self.canvas.axes,
+                state="Load",
+            )
 
             # keep the new x and y limits
             new_x_lim, new_y_lim = canvas_get_zoom(self.canvas)
 
-            new = self.curves[list(self.curves)[-1]]
-            new.loaded = True
-
             self.undo_stack.append(
-                ("Load", last, new, old_x_lim, old_y_lim, new_x_lim, new_y_lim)
+                ("Load", last, new, old_x_lim, old_y_lim, new_x_lim, new_y_lim, added)
             )
         except Exception as e:
             raise CustomException(e)
 
+    @timed(action=True)
     def add_plot(self) -> None:
-        """Adds another line to the Canvas"""
+        """Adds other lines to the Canvas"""
+        try:
+            input_files = get_files(self.settings.general.path)
+            if not input_files:
+                return
+
+            self.scheduler.submit(
+                keys=["load"],
+                compute=lambda: self.read_files(input_files),
+                apply=self.add_plot_finished,
+            )
+        except Exception as e:
+            raise CustomException(e)
+
+    def add_plot_finished(
+        self, results: list[tuple[np.ndarray, np.ndarray, str, float, bool]]
+    ) -> None:
+        """Adds the parsed files as new lines to the Canvas in one batch."""
         try:
+            self.report_load(results)
             prev = self.added[-1]
-            input_file = get_file(self.settings.general.path)
 
             # keep the old x and y limits
             old_x_lim, old_y_lim = canvas_get_zoom(self.canvas)
 
-            df, label = csv_to_dataframe(
-                input_file=input_file, sep=self.sep, engine=self.engine
+            new = self.plot_many(
+                [(x, y, label) for x, y, label, _, _ in results],
+                ax=self.canvas.axes,
+                state="Add",
             )
-            self.plot(df=df, label=label, ax=self.canvas.axes, state="Add")
 
             # keep the new x and y limits
             new_x_lim, new_y_lim = canvas_get_zoom(self.canvas)
 
-            new = self.curves[list(self.curves)[-1]]
-
+            # One undo entry for all the lines
             self.undo_stack.append(
                 ("Add Plot", prev, new, old_x_lim, old_y_lim, new_x_lim, new_y_lim)
             )
 
-            self.added.append(new)
-            self.cursor: Cursor = canvas_update(
-                self.canvas, self.xlabel, self.ylabel, self.title
-            )
+            self.added.extend(new)
+        except Exception as e:
+            raise CustomException(e)
 
+    def my_peaks_plot(self) -> None:
+        """Shows the manual peaks on the Canvas overlay."""
+        try:
+            self.canvas.overlay.set_markers(self.my_peaks.xy)
+            self.update_peaks_table()
         except Exception as e:
             raise CustomException(e)
 
-    def df_p_plot(self, ax: Axes) -> Peaks:
-        """Adds peaks to the Canvas"""
+    ## Data processing ##
+    @timed(action=True)
+    def process_data(self, function: Callable, params, edit: bool = False) -> None:
+        """Call the data processing functions
+        to the visible (checked) Spectrum objects.
+
+        The computation runs on the worker threads,
+        the results are applied on the main thread.
+        With `edit` in "pipeline" mode, the step replaces the last one
+        of each Spectrum if it is the same operation.
+        """
         try:
-            # keep the old x and y limits
-            old_x_lim, old_y_lim = canvas_get_zoom(self.canvas)
+            checked = [i for i in self.curves.values() if i.tristate == 1]
+
+            if function is peaks_find:
+                for sp in checked:
+                    self.scheduler.submit(
+                        keys=[sp.id],
+                        compute=lambda sp=sp: peaks_indices(sp.y_data, params[0]),
+                        apply=lambda peaks, sp=sp: self.peaks_finished(
+                            sp, peaks, params[1]
+                        ),
+                    )
+                return
+
+            _, kernel = ROW_KERNELS[function]
+
+            # Evaluate the chain of each Spectrum from its memoized prefix
+            if isinstance(self.history, Pipeline):
+                history = self.history
+
+                def evaluate(sp: Spectrum) -> tuple[np.ndarray, bool]:
+                    # Decided when the job runs, after the steps queued before it
+                    ops = sp.chain.active
+                    replace = edit and bool(ops) and ops[-1][0] is kernel
+                    return history.evaluate(sp, (kernel, params), replace), replace
+
+                for sp in checked:
+                    self.scheduler.submit(
+                        keys=[sp.id],
+                        compute=lambda sp=sp: evaluate(sp),
+                        apply=lambda result, sp=sp: self.process_finished(
+                            function, params, [sp], None, [result[0]], result[1]
+                        ),
+                    )
+                return
+
+            # Send heavy work on many spectra to the process pool
+            pool = self.settings.pool
+            sizes = [sp.y_data.size for sp in checked]
+            if pool.enabled and use_pool(kernel, sizes, pool.min_points):
+                self.scheduler.submit(
+                    keys=[sp.id for sp in checked],
+                    compute=lambda: process_rows_pool(
+                        function, checked, params, pool.workers
+                    ),
+                    apply=lambda result: self.process_finished(
+                        function, params, checked, *result
+                    ),
+                )
+                return
 
-            pks = ax.scatter(
-                x=self.df_p['p_x'],
-                y=self.df_p['p_y'],
-                c='red',
-                s=2,
-                zorder=3,
-                label="peak_user"
+            # Process spectra of the same length as one 2-D array
+            if function in BATCH_FUNCTIONS and len(checked) > 1 and same_length(checked):
+                groups = [checked]
+            else:
+                groups = [[sp] for sp in checked]
+
+            for group in groups:
+                self.scheduler.submit(
+                    keys=[sp.id for sp in group],
+                    compute=lambda group=group: process_rows(function, group, params),
+                    apply=lambda result, group=group: self.process_finished(
+                        function, params, group, *result
+                    ),
+                )
+        except Exception as e:
+            raise CustomException(e)
+
+    def process_finished(
+        self,
+        function: Callable,
+        params,
+        spectra: list[Spectrum],
+        prev: Optional[np.ndarray | list[np.ndarray]],
+        new: np.ndarray | list[np.ndarray],
+        replace: bool = False,
+    ) -> None:
+        """Writes the processed data back to the Spectrum objects.
+        With `replace`, the step takes the place of the last one in the
+        pipeline of the spectra.
+        """
+        name, kernel = ROW_KERNELS[function]
+        if self.history is None:
+            self.undo_stack.extend(write_rows(name, spectra, prev, new))
+        else:
+            # Recording drops the operations that could be redone
+            self.redo_stack.clear()
+
+            # Keep only the operation and its parameters
+            for row, sp in enumerate(spectra):
+                sp.y = new[row]
+                if replace:
+                    old = self.history.edit(sp, kernel, params)
+                    self.undo_stack.append(("Edit Step", old, (kernel, params), sp))
+                else:
+                    self.history.record(sp, kernel, params)
+                    self.undo_stack.append((name, None, None, sp))
+        self.rescale = True
+
+    def peaks_finished(self, sp: Spectrum, peaks: np.ndarray, canvas: Canvas) -> None:
+        """Adds the peaks found to the Canvas."""
+        actions = peaks_plot(sp, peaks, canvas)
+        if actions is not None:
+            self.undo_stack.append(actions)
+        self.curves.changed(sp)
+
+    ## Level of detail ##
+    def update_lod(self) -> None:
+        """Decimates the long spectra to the visible x range before a draw."""
+        x0, x1 = self.canvas.axes.get_xlim()
+        columns = max(int(self.canvas.width() * self.canvas.devicePixelRatioF()), 1)
+        for sp in self.curves.values():
+            dx = sp.offset[0]
+            sp.update_view(x0 - dx, x1 - dx, columns)
+
+    ## Jobs ##
+    def job_progress(self, done: int, total: int) -> None:
+        """Shows the progress of the background jobs in the status bar."""
+        self.progress_bar.setMaximum(total)
+        self.progress_bar.setValue(done)
+        self.progress_bar.setVisible(total > 0)
+        self.button_cancel.setVisible(total > 0)
+
+    def show_timings(self) -> None:
+        """Shows the breakdown of the last action in the status bar."""
+        self.timings_label.setText(timings.summary())
+
+    def export_timings(self) -> None:
+        """Exports the timing histograms to a JSON or CSV file."""
+        try:
+            path, _ = QtWidgets.QFileDialog.getSaveFileName(
+                self,
+                "Export timings",
+                self.settings.general.path,
+                "JSON (*.json);;CSV (*.csv)",
             )
+            if path:
+                timings.export(path)
+        except Exception as e:
+            raise CustomException(e)
 
-            pks_obj = Peaks(pks)
+    ## Session ##
+    def new_history(self) -> Optional[ReplayHistory | Pipeline]:
+        """Returns the operation history of the history mode of the settings.
+        In "replay" mode the history keeps operations instead of arrays,
+        in "pipeline" mode the operations are memoized per prefix.
+        """
+        history = self.settings.history
+        if history.mode == "replay":
+            return ReplayHistory(
+                checkpoint_interval=history.checkpoint_interval,
+                budget=int(history.budget_mb * 2**20),
+            )
+        if history.mode == "pipeline":
+            return Pipeline(budget=int(history.budget_mb * 2**20))
+        return None
+
+    def save_session(self) -> None:
+        """Saves the spectra, the peaks and the Canvas state to a session file."""
+        if self.wait_for_jobs("Save session"):
+            return
+        try:
+            path, _ = QtWidgets.QFileDialog.getSaveFileName(
+                self,
+                "Save session",
+                self.settings.general.path,
+                f"Spectra session (*{SESSION_SUFFIX})",
+            )
+            if not path:
+                return
+            if not path.endswith(SESSION_SUFFIX):
+                path += SESSION_SUFFIX
+
+            x_lim, y_lim = canvas_get_zoom(self.canvas)
+            state = {
+                "title": self.title,
+                "xlabel": self.xlabel,
+                "ylabel": self.ylabel,
+                "legend": self.legend,
+                "x_lim": list(x_lim),
+                "y_lim": list(y_lim),
+            }
+            write_session(
+                path,
+                self.curves.values(),
+                self.my_peaks,
+                state,
+                self.history if self.settings.history.save else None,
+                self.undo_stack,
+                self.redo_stack,
+            )
+            self.statusbar.showMessage(f"Session saved to {path}", 5000)
+        except Exception as e:
+            raise CustomException(e)
 
-            self.update_peaks_table()
-            self.cursor: Cursor = canvas_update(
-                self.canvas, self.xlabel, self.ylabel, self.title
+    def open_session(self) -> None:
+        """Replaces the spectra, the peaks and the Canvas state with a session file."""
+        if self.wait_for_jobs("Open session"):
+            return
+        try:
+            path, _ = QtWidgets.QFileDialog.getOpenFileName(
+                self,
+                "Open session",
+                self.settings.general.path,
+                f"Spectra session (*{SESSION_SUFFIX})",
             )
+            if not path:
+                return
 
-            # restore zoom
-            canvas_restore_zoom(self.canvas, old_x_lim, old_y_lim)
-            return pks_obj
+            # The history of the current spectra is dropped with them
+            history = self.new_history()
+            session = read_session(path, self.canvas.peak_layer, history)
+
+            self.preview.clear()
+            for sp in self.curves.values():
+                sp.hide()
+            self.curves.clear()
+            canvas_clear(self.canvas.axes)
+            self.canvas.peak_layer.clear()
+
+            for sp in session.spectra:
+                sp.show(self.canvas.axes, self.settings.general.lw)
+                if sp.has_peaks:
+                    sp.peaks.add_to_axes(self.canvas.axes)
+                self.curves.add(sp)
+
+            self.history = history
+            self.release_entries(self.undo_stack + self.redo_stack)
+            self.undo_stack[:] = session.undo_stack
+            self.redo_stack[:] = session.redo_stack
+            self.load_list.clear()
+
+            self.my_peaks = session.my_peaks
+            self.my_peaks_plot()
+
+            state = session.state
+            self.title, self.xlabel, self.ylabel = (
+                state["title"],
+                state["xlabel"],
+                state["ylabel"],
+            )
+            canvas_restore_zoom(self.canvas, state["x_lim"], state["y_lim"])
+            self.legend_checkBox.setChecked(state["legend"])
+            self.add_legend()
+            self.statusbar.showMessage(f"Session opened from {path}", 5000)
         except Exception as e:
             raise CustomException(e)
 
-    def plot_demo(self) -> None:
-        df = pd.DataFrame({"x": self.x, "y": self.y}, dtype="float")
-        self.plot(df=df, label=self.label, ax=self.canvas.axes, state="Load")
-
-    ## Data processing ##
-    def process_data(self, function: Callable, params) -> None:
-        """Call the data processing functions
-        to the visible (checked) Spectrum objects.
+    ## Memory ##
+    def memory_usage(self) -> dict[str, int]:
+        """Returns the bytes held by the peaks, the checked and hidden
+        curves, the operation history, the undo and redo entries and the
+        spectra kept to redo a load. Memory shared by several of them is
+        counted once, in the first one holding it.
+        """
+        seen: set[int] = set()
+        spectra = self.curves.values()
+        usage = {
+            "peaks": held_bytes([sp.peaks for sp in spectra] + [self.my_peaks], seen)
+            + self.canvas.peak_layer.nbytes,
+            "curves": held_bytes([sp for sp in spectra if sp.tristate == 1], seen),
+            "hidden": held_bytes([sp for sp in spectra if sp.tristate != 1], seen),
+            "history": 0 if self.history is None else self.history.nbytes,
+            "undo": held_bytes(self.undo_stack, seen),
+            "redo": held_bytes(self.redo_stack, seen),
+            "load_list": held_bytes(self.load_list, seen),
+        }
+        usage["total"] = sum(usage.values())
+        usage["spilled"] = 0 if self.spill_store is None else self.spill_store.nbytes
+        return usage
+
+    def release_entries(self, entries: list[tuple]) -> None:
+        """Deletes the files of the spilled undo entries dropped."""
+        if self.spill_store is None:
+            return
+        for actions in entries:
+            if actions[0] in PROCESS_ACTIONS and spilled(actions):
+                self.spill_store.release(actions[1])
+                self.spill_store.release(actions[2])
+
+    def enforce_memory_cap(self) -> None:
+        """Frees the oldest undo and redo entries while the memory used
+        is above the cap of the settings.
+
+        With the "spill" policy the arrays of the oldest processing
+        entries are first moved to temporary files, the entries are
+        evicted only if that is not enough. The results cached by the
+        operation history are dropped last.
         """
         try:
-            for i in self.curves.values():
-                if i.tristate == 1:
-                    actions = function(i, params)
-                    self.undo_stack.append(actions)
+            cap = int(self.settings.memory.cap_mb * 2**20)
+            if cap <= 0:
+                return
+
+            # Memory kept whatever the entries
+            seen: set[int] = set()
+            kept = held_bytes([self.curves.values(), self.my_peaks], seen)
+            kept += self.canvas.peak_layer.nbytes
+            if self.history is not None:
+                kept += self.history.nbytes
+
+            # Redoing a load pops the last spectra of the load list
+            stacks = {
+                "load_list": self.load_list,
+                "undo": self.undo_stack,
+                "redo": self.redo_stack,
+            }
+            spare = len(self.load_list) - sum(a[0] == "Load" for a in self.redo_stack)
+            entries = [("load_list", i) for i in range(max(spare, 0))]
+            entries += [("undo", i) for i in range(len(self.undo_stack))]
+            entries += [("redo", i) for i in range(len(self.redo_stack))]
+
+            # Oldest first, the memory shared with a newer entry is freed with it
+            sizes = [held_bytes(stacks[name][i], seen) for name, i in reversed(entries)]
+            sizes.reverse()
+            total = kept + sum(sizes)
+            if total <= cap:
+                return
+
+            moved = 0
+            if self.settings.memory.policy == "spill":
+                if self.spill_store is None:
+                    self.spill_store = SpillStore(self.settings.memory.spill_dir)
+                for n, (name, i) in enumerate(entries):
+                    if total <= cap:
+                        break
+                    actions = stacks[name][i]
+                    if (
+                        name == "load_list"
+                        or actions[0] not in PROCESS_ACTIONS
+                        or actions[1] is None
+                        or spilled(actions)
+                    ):
+                        continue
+                    stacks[name][i] = (
+                        actions[0],
+                        self.spill_store.spill(actions[1]),
+                        self.spill_store.spill(actions[2]),
+                        actions[3],
+                    )
+                    total -= sizes[n]
+                    sizes[n] = 0
+                    moved += 1
+
+            # Evict from the bottom of each stack, up to the last entry freeing memory
+            last = max((n for n, size in enumerate(sizes) if size), default=-1)
+            evicted = dict.fromkeys(stacks, 0)
+            for (name, _), size in zip(entries[: last + 1], sizes):
+                if total <= cap:
+                    break
+                evicted[name] += 1
+                total -= size
+            for name, n in evicted.items():
+                if name != "load_list":
+                    self.release_entries(stacks[name][:n])
+                del stacks[name][:n]
+
+            # The cached results can be computed again
+            trimmed = 0
+            if total > cap and self.history is not None:
+                before = self.history.nbytes
+                self.history.trim(max(0, before - (total - cap)))
+                trimmed = before - self.history.nbytes
+                total -= trimmed
+
+            removed = evicted["undo"] + evicted["redo"]
+            done = [f"{moved} undo entries moved to disk"] if moved else []
+            if removed:
+                done.append(f"{removed} undo entries removed")
+            if trimmed:
+                done.append(f"{trimmed / 2**20:.1f} MB of cached results dropped")
+            if not done:
+                done.append(f"nothing more can be freed ({total / 2**20:.1f} MB in use)")
+            self.statusbar.showMessage(
+                f"Memory above {self.settings.memory.cap_mb} MB: " + ", ".join(done), 5000
+            )
+        except Exception as e:
+            raise CustomException(e)
 
-            # Recompute the data limits
-            self.canvas.axes.relim()
+    def job_failed(self, message: str) -> None:
+        """Shows the error of a background job in the status bar."""
+        self.statusbar.showMessage(f"Error: {message}", 5000)
 
-            # Update using the new data limits
-            self.canvas.axes.autoscale_view()
+    def jobs_finished(self) -> None:
+        """Updates the Canvas and the tables once all jobs are done."""
+        try:
+            if timings.enabled:
+                self.show_timings()
+            if self.rescale:
+                # Recompute the data limits
+                self.canvas.axes.relim()
 
-            self.cursor: Cursor = canvas_update(
-                self.canvas, self.xlabel, self.ylabel, self.title
-            )
-            self.update_spectrum_table()
+                # Update using the new data limits
+                self.canvas.axes.autoscale_view()
+                self.rescale = False
+
+            canvas_update(self.canvas, self.xlabel, self.ylabel, self.title)
             self.update_peaks_table()
+            self.enforce_memory_cap()
         except Exception as e:
             raise CustomException(e)
 
@@ -193,6 +663,9 @@ class QtFunctions:
             self.prom = prev
 
     def edit_form(self) -> None:
+        # Imported on first use, only the edit window needs it
+        import mplcursors
+
         try:
             fig, ax = plt.subplots(nrows=1, ncols=1)
             for i in self.curves.values():
@@ -246,194 +719,235 @@ class QtFunctions:
                     self.y_rev = False
 
             self.undo_stack.append((f"Reverse {axis}", None))
-            self.cursor: Cursor = canvas_update(
-                self.canvas, self.xlabel, self.ylabel, self.title
-            )
+            canvas_update(self.canvas, self.xlabel, self.ylabel, self.title)
 
         except Exception as e:
             raise CustomException(e)
 
     # Undo redo
+    def wait_for_jobs(self, action: str) -> bool:
+        """Returns True, and says so in the status bar, while jobs are running."""
+        if not self.scheduler.busy:
+            return False
+        self.statusbar.showMessage(f"{action}: wait for the running jobs", 3000)
+        return True
+
     def undo(self) -> None:
+        if self.wait_for_jobs("Undo"):
+            return
         if self.undo_stack:
             actions = self.undo_stack.pop()
             self.redo_stack.append(actions)
 
             if actions[0] == "Load":
+                actions[2].hide()
+                for i in actions[7]:
+                    i.hide()
+                self.canvas.peak_layer.clear()
+                self.curves.clear()
+
+                # Nothing was plotted before the first load
                 if not actions[1] == "":
-                    canvas_remove(actions[2].curve)
-                    self.canvas.axes.add_line(actions[1].curve)
+                    actions[1].show(self.canvas.axes, self.settings.general.lw)
+                    if actions[1].has_peaks:
+                        actions[1].peaks.add_to_axes(self.canvas.axes)
+                    self.curves.add(actions[1])
 
-                    # restore zoom
-                    canvas_restore_zoom(self.canvas, actions[3], actions[4])
+                # restore zoom
+                canvas_restore_zoom(self.canvas, actions[3], actions[4])
 
-                    self.load_list.append(actions[2])
-                    self.curves = dict()
-                    self.curves.update({actions[1].label: actions[1]})
+                self.load_list.append(actions[2])
 
             elif actions[0] == "Add Plot":
-                canvas_remove(actions[2].curve)
+                for i in actions[2]:
+                    i.hide()
+                    self.curves.remove(i)
 
                 # restore zoom
                 canvas_restore_zoom(self.canvas, actions[3], actions[4])
 
-                self.curves.pop(actions[2].id)
-
-            elif actions[0] == "Smooth":
-                actions[3].y = actions[1]
+            elif actions[0] in PROCESS_ACTIONS:
+                if actions[1] is None:
+                    # Rebuild the data from the operation history
+                    actions[3].y = self.history.undo(actions[3])
+                else:
+                    actions[3].y = actions[1]
 
-            elif actions[0] == "Baseline":
-                actions[3].y = actions[1]
+            elif actions[0] == "Edit Step":
+                # Back to the replaced operation, after the memoized prefix
+                sp = actions[3]
+                sp.y = self.history.evaluate(sp, actions[1], replace=True)
+                self.history.edit(sp, *actions[1])
 
             elif actions[0] == "Peaks":
                 actions[2].peaks.remove()
                 actions[2].delete_peaks()
+                if actions[3] is not None:
+                    actions[2].add_peaks(actions[3], self.canvas.axes)
+                self.curves.changed(actions[2])
                 self.update_peaks_table()
 
-            elif actions[0] == "Normalize Min-Max":
-                actions[3].y = actions[1]
-
-            elif actions[0] == "Normalize Z":
-                actions[3].y = actions[1]
-
             elif actions[0] == "Reverse X":
                 self.canvas.axes.invert_xaxis()
 
             elif actions[0] == "Reverse Y":
                 self.canvas.axes.invert_yaxis()
 
+            elif actions[0] == "Apply Offset":
+                for sp, dx, dy in actions[1]:
+                    sp.x_data -= dx
+                    if self.history is None:
+                        sp.y_data -= dy
+                    else:
+                        sp.y_data = self.history.undo(sp)
+                    sp.set_offset(dx, dy)
+                    sp.refresh()
+
+                # The next spinbox change starts from the restored offsets,
+                # from zero on the axes where the spectra were moved apart
+                dxs = {dx for _, dx, _ in actions[1]}
+                dys = {dy for _, _, dy in actions[1]}
+                self.set_offset_spinboxes(
+                    dxs.pop() if len(dxs) == 1 else 0.0,
+                    dys.pop() if len(dys) == 1 else 0.0,
+                )
+
             elif actions[0] == "Label":
                 self.xlabel = actions[1][0]
                 self.ylabel = actions[1][1]
 
             elif actions[0] == "New_my_peak":
-                self.df_p = self.df_p.drop(self.df_p.tail(1).index).reset_index(
-                    drop=True
-                )
-                actions[2].remove()
+                self.my_peaks.pop()
+                self.my_peaks_plot()
 
             elif actions[0] == "Delete_my_peak":
-                self.df_p = pd.concat([self.df_p, actions[1]]).reset_index(drop=True)
-                actions[2].add_to_axes(self.canvas.axes)
+                self.my_peaks.append(*actions[1])
+                self.my_peaks_plot()
 
             elif actions[0] == "Clear Table":
-                # TODO
-                peaks_user =[]
-                for path_coll in actions[1]:
-                    if path_coll.get_label() == "peak_user":
-                        data = path_coll.get_offsets().data
-                        peaks_user.append((data[0][0], data[0][1]))
-                    
-                    peaks = Peaks(path_coll)
-                    # TODO: check functionality with spectrum
-                    # spectrum.add_peaks(peaks)
-                    peaks.add_to_axes(self.canvas.axes)
-
-                self.df_p = pd.DataFrame(peaks_user, columns=["p_x", "p_y"]) 
-
-            self.cursor: Cursor = canvas_update(
-                self.canvas, self.xlabel, self.ylabel, self.title
-            )
-            self.update_spectrum_table()
+                for spectrum, peaks in actions[2].items():
+                    spectrum.add_peaks(peaks, self.canvas.axes)
+                    self.curves.changed(spectrum)
+
+                self.my_peaks = actions[4]
+                self.my_peaks_plot()
+
+            canvas_update(self.canvas, self.xlabel, self.ylabel, self.title)
             self.update_peaks_table()
 
     def redo(self) -> None:
+        if self.wait_for_jobs("Redo"):
+            return
         if self.redo_stack:
             actions = self.redo_stack.pop()
             self.undo_stack.append(actions)
 
             if actions[0] == "Load":
                 if not actions[1] == "":
-                    canvas_remove(actions[1].curve)
-                    self.canvas.axes.add_line(actions[2].curve)
+                    actions[1].hide()
+                self.canvas.peak_layer.clear()
+                actions[2].show(self.canvas.axes, self.settings.general.lw)
+                for i in actions[7]:
+                    i.show(self.canvas.axes, self.settings.general.lw)
 
-                    # restore zoom
-                    canvas_restore_zoom(self.canvas, actions[5], actions[6])
+                # restore zoom
+                canvas_restore_zoom(self.canvas, actions[5], actions[6])
 
-                    new = self.load_list.pop()
-                    self.curves = dict()
-                    self.curves.update({new.label: new})
+                new = self.load_list.pop()
+                self.curves.clear()
+                self.curves.add(new)
+                for i in actions[7]:
+                    self.curves.add(i)
 
             elif actions[0] == "Add Plot":
-                self.canvas.axes.add_line(actions[2].curve)
+                for i in actions[2]:
+                    i.show(self.canvas.axes, self.settings.general.lw)
+                    self.curves.add(i)
 
                 # restore zoom
                 canvas_restore_zoom(self.canvas, actions[5], actions[6])
 
-                self.curves.update({actions[2].label: actions[2]})
-
-            elif actions[0] == "Smooth":
-                actions[3].y = actions[2]
+            elif actions[0] in PROCESS_ACTIONS:
+                if actions[2] is None:
+                    # Replay the operation from the history
+                    y = self.history.redo(actions[3])
+                    if y is None:
+                        # Nothing left to redo, the entry is stale
+                        self.undo_stack.pop()
+                    else:
+                        actions[3].y = y
+                else:
+                    actions[3].y = actions[2]
 
-            elif actions[0] == "Baseline":
-                actions[3].y = actions[2]
+            elif actions[0] == "Edit Step":
+                sp = actions[3]
+                sp.y = self.history.evaluate(sp, actions[2], replace=True)
+                self.history.edit(sp, *actions[2])
 
             elif actions[0] == "Peaks":
-                actions[1].add_to_axes(self.canvas.axes)
-                actions[2].add_peaks(actions[1])
+                actions[2].add_peaks(actions[1], self.canvas.axes)
+                self.curves.changed(actions[2])
                 self.update_peaks_table()
 
-            elif actions[0] == "Normalize Min-Max":
-                actions[3].y = actions[2]
-
-            elif actions[0] == "Normalize Z":
-                actions[3].y = actions[2]
-
             elif actions[0] == "Reverse X":
                 self.canvas.axes.invert_xaxis()
 
             elif actions[0] == "Reverse Y":
                 self.canvas.axes.invert_yaxis()
 
+            elif actions[0] == "Apply Offset":
+                for sp, dx, dy in actions[1]:
+                    sp.set_offset(dx, dy)
+                    if self.history is None:
+                        sp.apply_offset()
+                    else:
+                        # Replay the shift from the history
+                        sp.x_data += dx
+                        sp.set_offset(0.0, 0.0)
+                        sp.y = self.history.redo(sp)
+                self.set_offset_spinboxes(0.0, 0.0)
+
             elif actions[0] == "Label":
                 self.xlabel = actions[2][0]
                 self.ylabel = actions[2][1]
 
             elif actions[0] == "New_my_peak":
-                self.df_p = pd.concat([self.df_p, actions[1]])
-                actions[2].add_to_axes(self.canvas.axes)
+                self.my_peaks.append(*actions[1])
+                self.my_peaks_plot()
 
             elif actions[0] == "Delete_my_peak":
-                self.df_p = self.df_p.drop(self.df_p.tail(1).index).reset_index(drop=True)
-                actions[2].remove()
-                self.update_peaks_table()
+                self.my_peaks.pop()
+                self.my_peaks_plot()
             
             elif actions[0] == "Clear Table":
                 # TODO
                 print(actions, self.canvas.axes.collections)
 
-            self.cursor: Cursor = canvas_update(
-                self.canvas, self.xlabel, self.ylabel, self.title
-            )
-            self.update_spectrum_table()
-            self.update_peaks_table() # check it
+            canvas_update(self.canvas, self.xlabel, self.ylabel, self.title)
+            self.update_peaks_table()
 
     ## Checkbox ##
     def chkbox_clicked(self, row, col) -> None:
-        if self.table.item(row, col).checkState() == QtCore.Qt.Unchecked:
-            for i in self.curves.values():
-                if i.label == self.table.item(row, col).text():
-                    i.invisible()
-                if i.has_peaks:
-                    if i.peaks.name == self.table.item(row, col).text():
-                        i.peaks.invisible()
-
-        if self.table.item(row, col).checkState() == QtCore.Qt.Checked:
-            for i in self.curves.values():
-                if i.label == self.table.item(row, col).text():
-                    i.visible()
-                if i.has_peaks:
-                    if i.peaks.name == self.table.item(row, col).text():
-                        i.peaks.visible()
-
-        if self.table.item(row, col).checkState() == 1:
-            for i in self.curves.values():
-                if i.label == self.table.item(row, col).text():
-                    i.disabled()
+        item = self.table.item(row, col)
+        if item is None:
+            return
+
+        sp: Spectrum = self.curves.at(row)
+        state = item.checkState()
+        if col == 0:
+            if state == QtCore.Qt.Unchecked:
+                sp.invisible()
+            elif state == QtCore.Qt.Checked:
+                sp.visible()
+            else:
+                sp.disabled()
+        elif sp.has_peaks:
+            if state == QtCore.Qt.Checked:
+                sp.peaks.visible()
+            else:
+                sp.peaks.invisible()
 
-        self.cursor: Cursor = canvas_update(
-            self.canvas, self.xlabel, self.ylabel, self.title
-        )
+        canvas_update(self.canvas, self.xlabel, self.ylabel, self.title)
 
     ## Legend Checkbox ##
     def add_legend(self) -> None:
@@ -445,187 +959,160 @@ class QtFunctions:
             self.legend = False
             self.canvas.axes.legend().set_visible(False)
 
-        self.cursor: Cursor = canvas_update(
-            self.canvas, self.xlabel, self.ylabel, self.title
-        )
+        canvas_update(self.canvas, self.xlabel, self.ylabel, self.title)
 
     ## Spinbox ##
     def spinbox_value_changed(self, axis: str) -> None:
+        """Moves the checked lines by the spinbox values.
+        Only the transforms of the lines change, the data stay untouched
+        until the offsets are applied.
+        """
         value_y = self.doubleSpinBox_y_axis.value()
         value_x = self.doubleSpinBox_x_axis.value()
         for i in self.curves.values():
             if i.tristate == 1:
+                dx, dy = i.offset
                 if axis == "y":
-                    i.y_data += value_y
-                    i.curve.set_ydata(i.y_data)
+                    i.set_offset(dx, value_y)
                 elif axis == "x":
-                    i.x_data += value_x
-                    i.curve.set_xdata(i.x_data)
-        self.cursor: Cursor = canvas_update(
-            self.canvas, self.xlabel, self.ylabel, self.title
-        )
+                    i.set_offset(value_x, dy)
+        canvas_update(self.canvas, self.xlabel, self.ylabel, self.title)
+
+    def set_offset_spinboxes(self, dx: float, dy: float) -> None:
+        """Shows the offsets in the spinboxes without moving the lines."""
+        for spinbox, value in (
+            (self.doubleSpinBox_x_axis, dx),
+            (self.doubleSpinBox_y_axis, dy),
+        ):
+            spinbox.blockSignals(True)
+            spinbox.setValue(value)
+            spinbox.blockSignals(False)
+
+    def apply_offsets(self) -> None:
+        """Adds the offsets of the lines to their data."""
+        try:
+            moved = []
+            for sp in self.curves.values():
+                if sp.offset != (0.0, 0.0):
+                    dx, dy = sp.offset
+                    sp.apply_offset()
+                    if self.history is not None:
+                        self.history.record(sp, shift_rows, dy)
+                    moved.append((sp, dx, dy))
+
+            if moved:
+                self.undo_stack.append(("Apply Offset", moved, None))
+                if self.history is not None:
+                    self.redo_stack.clear()
+
+            # The spinboxes start again from zero
+            self.set_offset_spinboxes(0.0, 0.0)
+
+            canvas_update(self.canvas, self.xlabel, self.ylabel, self.title)
+        except Exception as e:
+            raise CustomException(e)
 
     ## Tables ##
     def clear_peaks_table(self) -> None:
         try:
-            old_table = dict()
-            # Get the column count and iterate through the columns
-            column_count = self.table_peaks.columnCount()
-            for column in range(column_count):
-                # Get the column header text
-                header = self.table_peaks.horizontalHeaderItem(column).text()
-                print(header)
-                # Iterate through allthe rows and get the data for that column
-                temp = []
-                for row in range(self.table_peaks.rowCount()):
-                    item = self.table_peaks.item(row, column)
-                    print(item)
-                    if item is not None and item.text() != "":
-                        temp.append(item.text())
-                old_table[header] = temp
-            
-            # Clear the table
-            self.table_peaks.setRowCount(0)
-            self.table_peaks.setColumnCount(1)
-
-            if self.canvas.axes.collections:
-                prev_coll = []
-                for path_coll in self.canvas.axes.collections:
-                    prev_coll.append(path_coll)
-                    path_coll.remove()
-            else:
-                prev_coll = []
+            old_table = self.peaks_model.columns()
 
-            self.df_p = pd.DataFrame(columns=["p_x", "p_y"])
+            prev_my_peaks = self.my_peaks
+            self.my_peaks = ManualPeaks()
+            self.canvas.overlay.set_markers(self.my_peaks.xy)
 
             prev_obj = dict()
             for spectrum in self.curves.values():
-                # TODO: check with my peaks
                 if spectrum.has_peaks:
                     prev_obj.update({spectrum: spectrum.peaks})
-                    # delete the peaks_object from the canvas
-                    spectrum.peaks.remove()                    
                     # delete the peaks_object from the Spectrum Object
                     spectrum.delete_peaks()
+                    self.curves.changed(spectrum)
 
-            self.undo_stack.append(("Clear Table", prev_coll, prev_obj, old_table))
+            # delete every peak from the peak layer
+            self.canvas.peak_layer.clear()
 
-            self.cursor: Cursor = canvas_update(
-                self.canvas, self.xlabel, self.ylabel, self.title
+            self.undo_stack.append(
+                ("Clear Table", None, prev_obj, old_table, prev_my_peaks)
             )
-            self.update_spectrum_table()
+
+            # Clear the table
+            self.update_peaks_table()
+
+            canvas_update(self.canvas, self.xlabel, self.ylabel, self.title)
         except Exception as e:
             raise CustomException(e)
 
-    def update_spectrum_table(self) -> None:
-        """Updates the spectrum table."""
+    @timed("update_spectrum_table")
+    def spectrum_list_changed(
+        self, event: str, sp: Optional[Spectrum], row: int
+    ) -> None:
+        """Updates only the rows of the spectrum table that changed."""
         try:
-            self.table.setRowCount(0)
-            self.table.insertRow(0)
-            self.table.setRowCount(len(self.curves))
-
-            for i, j in enumerate(self.curves.values()):
-                # Update Spectrum column
-                if not j.label.startswith("peak_"):
-                    chkBoxItem = QtWidgets.QTableWidgetItem(j.label)
-                    chkBoxItem.setFlags(
-                        QtCore.Qt.ItemIsUserCheckable
-                        | QtCore.Qt.ItemIsUserTristate
-                        | QtCore.Qt.ItemIsEnabled
-                    )
-                    chkBoxItem.setCheckState(QtCore.Qt.Checked)
-                    self.table.setItem(i, 0, chkBoxItem)
-                    # Update Peaks column
-                    if j.has_peaks:
-                        chkBoxItem = QtWidgets.QTableWidgetItem(f"peak_{j.label}")
-                        chkBoxItem.setFlags(
-                            QtCore.Qt.ItemIsUserCheckable | QtCore.Qt.ItemIsEnabled
-                        )
-                        chkBoxItem.setCheckState(QtCore.Qt.Checked)
-                        self.table.setItem(i, 1, chkBoxItem)
+            if event == "added":
+                self.table.insertRow(row)
+                self.update_spectrum_row(row, sp)
+            elif event == "changed":
+                self.update_spectrum_row(row, sp)
+            elif event == "removed":
+                self.table.removeRow(row)
+            elif event == "cleared":
+                self.table.setRowCount(0)
         except Exception as e:
             raise CustomException(e)
 
+    def update_spectrum_row(self, row: int, sp: Spectrum) -> None:
+        """Updates the Spectrum and Peaks cells of a row."""
+        # Update Spectrum column
+        chkBoxItem = QtWidgets.QTableWidgetItem(sp.label)
+        chkBoxItem.setFlags(
+            QtCore.Qt.ItemIsUserCheckable
+            | QtCore.Qt.ItemIsUserTristate
+            | QtCore.Qt.ItemIsEnabled
+        )
+        chkBoxItem.setCheckState(CHECK_STATES[sp.tristate])
+        self.table.setItem(row, 0, chkBoxItem)
+
+        # Update Peaks column
+        if sp.has_peaks:
+            chkBoxItem = QtWidgets.QTableWidgetItem(f"peak_{sp.label}")
+            chkBoxItem.setFlags(QtCore.Qt.ItemIsUserCheckable | QtCore.Qt.ItemIsEnabled)
+            chkBoxItem.setCheckState(
+                QtCore.Qt.Checked if sp.peaks.is_visible else QtCore.Qt.Unchecked
+            )
+            self.table.setItem(row, 1, chkBoxItem)
+        else:
+            self.table.takeItem(row, 1)
+
+    @timed()
     def update_peaks_table(self) -> None:
         """Updates the peaks table."""
         try:
-            # Clear rows and columns
-            self.table_peaks.setRowCount(0)
-            self.table_peaks.setColumnCount(1)
-
-            if not self.df_p.empty:
-                my_peaks = [str(int(i)) for i in self.df_p["p_x"].tolist()]
-            else:
-                my_peaks = []
-
-            # Initialize a numedtuple for spectrum peaks x data and labels
-            spectrum_peaks_labels = namedtuple("SpectrumPeaks",["peaks_x", "label"])
-
-            spectrum_peaks_labels_list = [
-                spectrum_peaks_labels(peaks_x=curve.peaks.x, label=curve.label) 
+            columns = [("My_peaks", self.my_peaks.x.copy())]
+            columns += [
+                (curve.label, np.sort(curve.peaks.x))
                 for curve in self.curves.values()
                 if curve.has_peaks
-                ]
-
-            # Update Spectrum Peaks
-            if spectrum_peaks_labels_list:
-                # Set row count
-                m = max([peak.peaks_x.size for peak in spectrum_peaks_labels_list])
-                self.table_peaks.setRowCount(m)
-                # Set column count
-                self.table_peaks.setColumnCount(len(spectrum_peaks_labels_list) + 1)
-                # Add the header labels
-                self.table_peaks.setHorizontalHeaderLabels(["My_peaks"] + [spectrum.label for spectrum in spectrum_peaks_labels_list])
-
-                for col, data in enumerate(spectrum_peaks_labels_list, start=1):
-                    pks = [str(int(i)) for i in np.sort(data.peaks_x)]
-                    for num, v in enumerate(pks):
-                        self.table_peaks.setItem(
-                            num, col, QtWidgets.QTableWidgetItem(v)
-                        )
-            # Update My_peaks
-            if my_peaks:
-                if not spectrum_peaks_labels_list:
-                    self.table_peaks.insertRow(0)
-                    self.table_peaks.setHorizontalHeaderLabels(["My_peaks"])
-                    self.table_peaks.setRowCount(len(self.df_p))
-                for i in range(len(my_peaks)):
-                    self.table_peaks.setItem(
-                        i, 0, QtWidgets.QTableWidgetItem(my_peaks[i])
-                    )
+            ]
+            self.peaks_model.set_columns(columns)
         except Exception as e:
             raise CustomException(e)
 
     def save_table(self) -> None:
         """Saves the peaks table to a CSV file."""
         try:
-            # Setting Column Headers
-            col_headers = []
-            for i in range(self.table_peaks.model().columnCount()):
-                col_headers.append(self.table_peaks.horizontalHeaderItem(i).text())
-
-            # Initialize a DataFrame with columns
-            df = pd.DataFrame(columns=col_headers)
-
-            # Add Peak Data to the DataFrame
-            for row in range(self.table_peaks.rowCount()):
-                for col in range(self.table_peaks.columnCount()):
-                    item = self.table_peaks.item(row, col)
-                    if item is not None and item.text() != "":
-                        df.at[row, col_headers[col]] = item.text()
-
-            # Save into a CSV file
             f = QtWidgets.QFileDialog.getSaveFileName(
                 parent=None,
                 caption="Save File",
-                directory=self.dir,
+                directory=self.settings.general.path,
                 filter="Comma Separated Values (*.csv)",
             )[0]
 
-            # in case the user wants the default separator unchanged
-            sep = "," if self.sep is None else self.sep
+            if f:
+                # in case the user wants the default separator unchanged
+                sep = "," if self.sep is None else self.sep
 
-            df.to_csv(f, sep, index=False)
+                self.peaks_model.to_frame().to_csv(f, sep=sep, index=False)
 
         except Exception as e:
             raise CustomException(e)
@@ -641,9 +1128,7 @@ class QtFunctions:
                 ("Label", label_options(prev), (self.xlabel, self.ylabel))
             )
             self.labels.append(new)
-            self.cursor: Cursor = canvas_update(
-                self.canvas, self.xlabel, self.ylabel, self.title
-            )
+            canvas_update(self.canvas, self.xlabel, self.ylabel, self.title)
         except Exception as e:
             raise CustomException(e)
         
\ No newline at end of file
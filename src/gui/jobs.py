@@ -0,0 +1,144 @@
+"""Background jobs for the GUI app."""
+
+from typing import Any, Callable, Hashable, Iterable, Optional
+
+from PyQt5 import QtCore
+
+
+class JobSignals(QtCore.QObject):
+    """Signals emitted by a Job from the worker thread."""
+
+    finished = QtCore.pyqtSignal(object, object)
+    failed = QtCore.pyqtSignal(object, str)
+
+
+class Job(QtCore.QRunnable):
+    """Unit of work for the JobScheduler.
+
+    `compute` runs on a worker thread and must not touch Qt or matplotlib
+    objects. `apply` receives its result on the main thread.
+    """
+
+    def __init__(
+        self,
+        keys: Iterable[Hashable],
+        compute: Callable[[], Any],
+        apply: Callable[[Any], None],
+    ) -> None:
+        super().__init__()
+        self.setAutoDelete(False)
+        self.keys: frozenset = frozenset(keys)
+        self.compute = compute
+        self.apply = apply
+        self.cancelled: bool = False
+        self.signals = JobSignals()
+
+    def run(self) -> None:
+        if self.cancelled:
+            self.signals.finished.emit(self, None)
+            return
+        try:
+            result = self.compute()
+        except Exception as e:
+            self.signals.failed.emit(self, str(e))
+        else:
+            self.signals.finished.emit(self, result)
+
+
+class JobScheduler(QtCore.QObject):
+    """Runs jobs on a thread pool.
+
+    Jobs that share a key (e.g. a Spectrum id) run one after the other
+    in the order they were submitted. Jobs with disjoint keys run concurrently.
+    """
+
+    progress = QtCore.pyqtSignal(int, int)  # done, total
+    idle = QtCore.pyqtSignal()
+    failed = QtCore.pyqtSignal(str)
+
+    def __init__(
+        self,
+        parent: Optional[QtCore.QObject] = None,
+        pool: Optional[QtCore.QThreadPool] = None,
+    ) -> None:
+        super().__init__(parent)
+        self.pool = QtCore.QThreadPool.globalInstance() if pool is None else pool
+        self._pending: list[Job] = []
+        self._running: list[Job] = []
+        self._done: int = 0
+        self._total: int = 0
+
+    @property
+    def busy(self) -> bool:
+        """True while there are pending or running jobs."""
+        return bool(self._pending or self._running)
+
+    def submit(
+        self,
+        keys: Iterable[Hashable],
+        compute: Callable[[], Any],
+        apply: Callable[[Any], None],
+    ) -> Job:
+        """Queues a new job."""
+        job = Job(keys, compute, apply)
+        job.signals.finished.connect(self._on_finished)
+        job.signals.failed.connect(self._on_failed)
+
+        self._pending.append(job)
+        self._total += 1
+        self.progress.emit(self._done, self._total)
+
+        self._schedule()
+        return job
+
+    def cancel(self) -> None:
+        """Drops the pending jobs and discards the results of the running ones."""
+        self._total -= len(self._pending)
+        self._pending.clear()
+        for job in self._running:
+            job.cancelled = True
+        self.progress.emit(self._done, self._total)
+
+    def wait(self) -> None:
+        """Blocks until all the jobs are finished and applied."""
+        while self.busy:
+            self.pool.waitForDone(10)
+            QtCore.QCoreApplication.processEvents()
+
+    def _schedule(self) -> None:
+        """Starts every pending job whose keys are not in use."""
+        blocked = set()
+        for job in self._running:
+            blocked |= job.keys
+
+        for job in list(self._pending):
+            if job.keys.isdisjoint(blocked):
+                self._pending.remove(job)
+                self._running.append(job)
+                self.pool.start(job)
+            # Later jobs on the same keys keep their order
+            blocked |= job.keys
+
+    def _on_finished(self, job: Job, result: Any) -> None:
+        if not job.cancelled:
+            try:
+                job.apply(result)
+            except Exception as e:
+                self.failed.emit(str(e))
+        self._release(job)
+
+    def _on_failed(self, job: Job, message: str) -> None:
+        if not job.cancelled:
+            self.failed.emit(message)
+        self._release(job)
+
+    def _release(self, job: Job) -> None:
+        self._running.remove(job)
+        self._done += 1
+        self.progress.emit(self._done, self._total)
+
+        self._schedule()
+        if not self.busy:
+            self._done = self._total = 0
+            self.progress.emit(0, 0)
+            self.idle.emit()
@@ -1,42 +1,54 @@
 """Main Window of the GUI."""
 
-from itertools import count
-from typing import Any
+from typing import Optional
 
-import pandas as pd
 from matplotlib.backend_bases import KeyEvent, MouseEvent
 from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT
 from omegaconf import DictConfig
 
 from PyQt5 import QtCore
 from PyQt5 import QtWidgets
-from PyQt5 import uic
 
 from .canvas import Canvas
 from .functions import QtFunctions
-from ..classes.spectra import Peaks
+from .jobs import JobScheduler
+from .peaks_table import PeaksTableModel
+from .preview import PreviewPanel
+from ..classes.history import ReplayHistory
+from ..classes.memory import SpillStore
+from ..classes.pipeline import Pipeline
+from ..classes.peaks import ManualPeaks
 from ..classes.spectra import Spectrum
+from ..classes.spectra import SpectrumList
 from ..functions.canvas import canvas_update
+from ..functions.pool import shutdown as pool_shutdown
 from ..functions.spectra_process import baseline
 from ..functions.spectra_process import norm_min_max
 from ..functions.spectra_process import norm_z
 from ..functions.spectra_process import peaks_find
 from ..functions.spectra_process import smoothing
+from ..functions.startup import timer as startup_timer
+from ..functions.timings import timings
 from ..functions.utils import save_as
+from ..functions.utils import snap_to_spectra
+from ..UI.main_ui import Ui_MainWindow
 
 
-class QtMain(QtWidgets.QMainWindow, QtFunctions):
+class QtMain(QtWidgets.QMainWindow, Ui_MainWindow, QtFunctions):
     """Main Window class of the GUI app."""
 
     def __init__(self, settings: DictConfig) -> None:
         """Initializes the main application."""
         super().__init__()
-        # Load UI
-        uic.loadUi("./src/UI/main.ui", self)
+        # Load UI, generated from ./UI/main.ui with pyuic5
+        self.setupUi(self)
+        startup_timer.mark("main window: UI")
 
         # Initiate Canvas and Toolbar
         self.canvas = Canvas(self, width=10, height=18, dpi=120)
         self.toolbar = NavigationToolbar2QT(self.canvas, self)
+        self.canvas.pre_draw.append(self.update_lod)
+        startup_timer.mark("main window: Canvas")
 
         # Initiate the settings from ./conf/config.yaml
         self.settings = settings
@@ -46,37 +58,58 @@ class QtMain(QtWidgets.QMainWindow, QtFunctions):
         self.engine = "python" if len(self.sep) > 1 else settings.general.engine
 
         # Initialize variables
-        self.x: list[float] = [1.0, 2.0, 3.0]
-        self.y: list[float] = [1.0, 2.0, 3.0]
         self.title: str = ""
         self.xlabel: str = ""
         self.ylabel: str = ""
         self.x_rev: bool = False
         self.y_rev: bool = False
         self.legend: bool = False
-        self.label: str = "demo"
-        self.count = count()
 
         self.load_list: list[Spectrum] = []
         self.labels: list[str] = ["None"]
         self.added: list[str] = [""]
-        self.curves: dict[str, Any] = {}
+        self.curves = SpectrumList()
+        self.curves.listeners.append(self.spectrum_list_changed)
 
-        # Plot a a demo line
-        self.plot_demo()
-
-        # Initialize My_peaks DataFrame
-        self.my_peaks = []
-        self.df_p = pd.DataFrame(columns=["p_x", "p_y"])
+        # Initialize My_peaks
+        self.my_peaks = ManualPeaks()
 
         # Undo-Redo stacks
-        self.undo_stack: list[tuple] = [("Load", "", self.canvas.axes.lines[-1])]
+        self.history: Optional[ReplayHistory | Pipeline] = self.new_history()
+        self.undo_stack: list[tuple] = []
         self.redo_stack: list[tuple] = []
 
+        # Temporary files of the undo entries moved out of memory
+        self.spill_store: Optional[SpillStore] = None
+
         # Add Canvas and Toolbar to the Layout
         self.verticalLayout_3.insertWidget(0, self.canvas)
         self.verticalLayout_3.insertWidget(1, self.toolbar)
 
+        # Background jobs
+        self.rescale: bool = False
+        self.scheduler = JobScheduler(self)
+        self.progress_bar = QtWidgets.QProgressBar(self)
+        self.progress_bar.setMaximumWidth(200)
+        self.progress_bar.setVisible(False)
+        self.button_cancel = QtWidgets.QPushButton("Cancel", self)
+        self.button_cancel.setVisible(False)
+        self.statusbar.addPermanentWidget(self.progress_bar)
+        self.statusbar.addPermanentWidget(self.button_cancel)
+
+        self.button_cancel.clicked.connect(self.scheduler.cancel)
+
+        # Timings of the last action, opt-in
+        timings.configure(settings.timings.enabled, settings.timings.window)
+        self.timings_label = QtWidgets.QLabel(self)
+        self.timings_label.setVisible(settings.timings.enabled)
+        self.statusbar.addPermanentWidget(self.timings_label)
+        if settings.timings.enabled:
+            self.canvas.post_draw.append(self.show_timings)
+        self.scheduler.progress.connect(self.job_progress)
+        self.scheduler.failed.connect(self.job_failed)
+        self.scheduler.idle.connect(self.jobs_finished)
+
         ## Buttons ##
 
         # Load
@@ -84,6 +117,8 @@ class QtMain(QtWidgets.QMainWindow, QtFunctions):
         self.button_load.setShortcut(self.settings.shortcuts.load)
 
         # Peaks Table
+        self.peaks_model = PeaksTableModel(self)
+        self.table_peaks.setModel(self.peaks_model)
         self.button_clear_table.clicked.connect(self.clear_peaks_table)
         self.button_save_table.clicked.connect(self.save_table)
 
@@ -161,8 +196,25 @@ class QtMain(QtWidgets.QMainWindow, QtFunctions):
         self.doubleSpinBox_x_axis.valueChanged.connect(
             lambda: self.spinbox_value_changed("x")
         )
+        self.button_apply_offset.clicked.connect(self.apply_offsets)
         self.legend_checkBox.stateChanged.connect(lambda: self.add_legend())
 
+        ## Preview ##
+        self.preview = PreviewPanel(self)
+        self.addDockWidget(QtCore.Qt.RightDockWidgetArea, self.preview)
+        self.preview.hide()
+        preview_action = self.preview.toggleViewAction()
+        preview_action.setShortcut(self.settings.shortcuts.preview)
+        self.toolbar.addAction(preview_action)
+        if settings.timings.enabled:
+            self.toolbar.addAction("Export timings", self.export_timings)
+
+        ## Session ##
+        open_action = self.toolbar.addAction("Open session", self.open_session)
+        open_action.setShortcut(self.settings.shortcuts.open_session)
+        save_action = self.toolbar.addAction("Save session", self.save_session)
+        save_action.setShortcut(self.settings.shortcuts.save_session)
+
         ## Show Window ##
         self.canvas.setFocusPolicy(QtCore.Qt.ClickFocus)
         self.canvas.setFocus()
@@ -172,49 +224,40 @@ class QtMain(QtWidgets.QMainWindow, QtFunctions):
         # Manual Peaks
         def add_peak(event: MouseEvent) -> None:
             """Add marks for peaks with left double click."""
-            if event.button == 1 and event.dblclick:
-                new_row = pd.DataFrame(
-                    {"p_x": event.xdata, "p_y": event.ydata},
-                    index=[str(next(self.count))],
-                )
-                if self.df_p.empty:
-                    self.df_p = new_row
-                else:
-                    self.df_p = pd.concat([self.df_p, new_row])
-               
-                pks_obj: Peaks = self.df_p_plot(self.canvas.axes)
-                self.my_peaks.append(pks_obj)
-
-                self.undo_stack.append(("New_my_peak", new_row, pks_obj))
-
-                if self.legend:
-                    self.add_legend()
-
-                self.cursor = canvas_update(
-                    self.canvas, self.xlabel, self.ylabel, self.title
-                )
+            if event.button == 1 and event.dblclick and event.inaxes:
+                point = (event.xdata, event.ydata)
+                if self.settings.general.snap_peaks:
+                    point = snap_to_spectra(self.curves, self.canvas.axes, *point)
+                self.my_peaks.append(*point)
+
+                # Only the overlay is redrawn
+                self.my_peaks_plot()
+
+                self.undo_stack.append(("New_my_peak", point, None))
 
         self.canvas.mpl_connect("button_press_event", add_peak)
 
         def delete_peaks(event: KeyEvent) -> None:
             """Delete peaks with control+delete."""
             if event.key == "ctrl+delete":
-                if not self.df_p.empty:
-                    last = self.df_p.tail(1)
-                    self.df_p = self.df_p.drop(last.index).reset_index(drop=True)
-                    
-                    last_peak: Peaks = self.my_peaks.pop()
-                    last_peak.remove()
-
-                    self.undo_stack.append(("Delete_my_peak", last, last_peak, None))
-
-                    self.update_peaks_table()
+                if not self.my_peaks.empty:
+                    last = self.my_peaks.pop()
 
-                if self.legend:
-                    self.add_legend()
+                    # Only the overlay is redrawn
+                    self.my_peaks_plot()
 
-                self.cursor = canvas_update(
-                    self.canvas, self.xlabel, self.ylabel, self.title
-                )
+                    self.undo_stack.append(("Delete_my_peak", last, None, None))
 
         self.canvas.mpl_connect("key_press_event", delete_peaks)
+        startup_timer.mark("main window: widgets")
+
+    def closeEvent(self, event) -> None:
+        """Stops the background workers before closing."""
+        self.scheduler.cancel()
+        self.preview.jobs.cancel()
+        pool_shutdown()
+        if timings.enabled and self.settings.timings.trace:
+            timings.export(self.settings.timings.trace)
+        if self.spill_store is not None:
+            self.spill_store.close()
+        super().closeEvent(event)
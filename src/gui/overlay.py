@@ -0,0 +1,115 @@
+"""Blitted overlay for the Canvas of the main app."""
+
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
+from matplotlib.artist import Artist
+from matplotlib.backend_bases import DrawEvent, MouseEvent
+from matplotlib.collections import PathCollection
+from matplotlib.lines import Line2D
+from matplotlib.markers import MarkerStyle
+from matplotlib.text import Text
+
+if TYPE_CHECKING:
+    from .canvas import Canvas
+
+
+class BlitOverlay:
+    """Crosshair, manual peak markers and hover readout drawn
+    on top of a cached background.
+
+    The background is copied once per full draw, so moving the mouse
+    only restores it and blits the overlay, whatever the number of
+    points on the Canvas.
+    """
+
+    def __init__(
+        self, canvas: "Canvas", color: str = "red", lw: float = 0.8
+    ) -> None:
+        self.canvas = canvas
+        self.axes = canvas.axes
+        self.background = None
+
+        # Crosshair
+        self.hline = Line2D(
+            [0, 1], [0, 0], color=color, lw=lw, transform=self.axes.get_yaxis_transform()
+        )
+        self.vline = Line2D(
+            [0, 0], [0, 1], color=color, lw=lw, transform=self.axes.get_xaxis_transform()
+        )
+
+        # Manual peaks
+        marker = MarkerStyle("o")
+        self.markers = PathCollection(
+            (marker.get_path().transformed(marker.get_transform()),),
+            sizes=[2],
+            facecolors=color,
+            edgecolors=color,
+            offsets=np.empty((0, 2)),
+            offset_transform=self.axes.transData,
+            zorder=3,
+        )
+
+        # Hover readout
+        self.readout = Text(
+            0.01, 0.99, "", transform=self.axes.transAxes, va="top", ha="left", size=7
+        )
+
+        # The artists are not added to the Axes,
+        # so they never take part in relim, legends or cla
+        for artist in self.artists:
+            artist.set_animated(True)
+            artist.set_figure(self.axes.figure)
+            artist.axes = self.axes
+            artist.set_clip_path(self.axes.patch)
+        self.readout.set_clip_on(False)
+        self._crosshair(False)
+
+        self.canvas.mpl_connect("draw_event", self._on_draw)
+        self.canvas.mpl_connect("motion_notify_event", self._on_move)
+        self.canvas.mpl_connect("figure_leave_event", self._on_leave)
+
+    @property
+    def artists(self) -> list[Artist]:
+        return [self.hline, self.vline, self.markers, self.readout]
+
+    def set_markers(self, offsets: np.ndarray) -> None:
+        """Shows the manual peaks markers at the (x, y) offsets."""
+        self.markers.set_offsets(np.asarray(offsets, dtype=float).reshape(-1, 2))
+        self.blit()
+
+    def _crosshair(self, visible: bool) -> None:
+        self.hline.set_visible(visible)
+        self.vline.set_visible(visible)
+        self.readout.set_visible(visible)
+
+    def _draw_artists(self) -> None:
+        for artist in self.artists:
+            self.axes.draw_artist(artist)
+
+    def _on_draw(self, event: Optional[DrawEvent]) -> None:
+        """Caches the background and draws the overlay after a full draw."""
+        self.background = self.canvas.copy_from_bbox(self.canvas.figure.bbox)
+        self._draw_artists()
+
+    def _on_move(self, event: MouseEvent) -> None:
+        if event.inaxes is not self.axes:
+            self._crosshair(False)
+        else:
+            self.hline.set_ydata([event.ydata, event.ydata])
+            self.vline.set_xdata([event.xdata, event.xdata])
+            self.readout.set_text(f"x = {event.xdata:.4g}, y = {event.ydata:.4g}")
+            self._crosshair(True)
+        self.blit()
+
+    def _on_leave(self, event) -> None:
+        self._crosshair(False)
+        self.blit()
+
+    def blit(self) -> None:
+        """Restores the background and blits the overlay."""
+        if self.background is None:
+            return
+        self.canvas.restore_region(self.background)
+        self._draw_artists()
+        self.canvas.blit(self.canvas.figure.bbox)
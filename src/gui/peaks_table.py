@@ -0,0 +1,78 @@
+"""Model of the peaks table of the main app."""
+
+from typing import TYPE_CHECKING, Any, Optional
+
+import numpy as np
+
+from PyQt5 import QtCore
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+class PeaksTableModel(QtCore.QAbstractTableModel):
+    """Peaks table reading the x values of the peaks straight from
+    their arrays, one column per array.
+
+    The view only asks for the cells it shows, so the table costs
+    the same with ten or with tens of thousands of peaks.
+    """
+
+    def __init__(self, parent: Optional[QtCore.QObject] = None) -> None:
+        super().__init__(parent)
+        self._labels: list[str] = ["My_peaks"]
+        self._columns: list[np.ndarray] = [np.empty(0)]
+        self._rows: int = 0
+
+    def set_columns(self, columns: list[tuple[str, np.ndarray]]) -> None:
+        """Replaces the columns with (label, x values) pairs."""
+        self.beginResetModel()
+        self._labels = [label for label, _ in columns]
+        self._columns = [np.asarray(values) for _, values in columns]
+        self._rows = max((values.size for values in self._columns), default=0)
+        self.endResetModel()
+
+    def columns(self) -> list[tuple[str, np.ndarray]]:
+        """Returns the (label, x values) pairs of the columns."""
+        return list(zip(self._labels, self._columns))
+
+    def rowCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:
+        return 0 if parent.isValid() else self._rows
+
+    def columnCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._columns)
+
+    def data(self, index: QtCore.QModelIndex, role: int = QtCore.Qt.DisplayRole) -> Any:
+        if role != QtCore.Qt.DisplayRole or not index.isValid():
+            return None
+        values = self._columns[index.column()]
+        if index.row() >= values.size:
+            return None
+        return str(int(values[index.row()]))
+
+    def headerData(
+        self,
+        section: int,
+        orientation: QtCore.Qt.Orientation,
+        role: int = QtCore.Qt.DisplayRole,
+    ) -> Any:
+        if role != QtCore.Qt.DisplayRole:
+            return None
+        if orientation == QtCore.Qt.Horizontal:
+            return self._labels[section]
+        return str(section + 1)
+
+    def to_frame(self) -> "pd.DataFrame":
+        """Returns the table as integers, empty cells as missing values."""
+        # Imported on first use, pandas is slow to import
+        import pandas as pd
+
+        frame = pd.concat(
+            [
+                pd.Series(pd.array(np.trunc(values).astype(np.int64), dtype="Int64"))
+                for values in self._columns
+            ],
+            axis=1,
+        )
+        frame.columns = self._labels
+        return frame.reindex(pd.RangeIndex(self._rows))
@@ -0,0 +1,311 @@
+"""Live preview panel of the processing settings."""
+
+import math
+from typing import TYPE_CHECKING, Callable, Optional
+
+import numpy as np
+from matplotlib.lines import Line2D
+
+from PyQt5 import QtCore
+from PyQt5 import QtWidgets
+
+from .jobs import JobScheduler
+from ..classes.spectra import Spectrum
+from ..exceptions.exception import CustomException
+from ..functions.canvas import canvas_update
+from ..functions.preview import decimate
+from ..functions.preview import preview_step
+from ..functions.preview import scale_params
+from ..functions.preview import visible_slice
+from ..functions.spectra_process import baseline
+from ..functions.spectra_process import peaks_find
+from ..functions.spectra_process import smoothing
+
+if TYPE_CHECKING:
+    from .main_window import QtMain
+
+# Time without slider moves before a preview is computed
+DEBOUNCE_MS = 40
+
+# Time without slider moves before the full resolution preview
+IDLE_MS = 500
+
+
+def _log10(value: Optional[float], default: float) -> float:
+    return math.log10(value) if value else default
+
+
+def _log_slider(default: float) -> tuple[Callable, Callable]:
+    """Slider in tenths of a decade."""
+    return (lambda v: 10 ** (v / 10), lambda value: round(10 * _log10(value, default)))
+
+
+# Sliders of each step: setting, label, range, slider -> value, value -> slider
+SLIDERS: dict[str, list[tuple[str, str, int, int, Callable, Callable]]] = {
+    "smooth": [
+        ("window_length", "Window", 1, 250, lambda v: 2 * v + 1, lambda w: w // 2),
+        ("polyorder", "Order", 0, 10, int, int),
+    ],
+    "baseline": [
+        ("lam", "Lambda", 10, 100, *_log_slider(4)),
+        ("p", "p", -40, -5, *_log_slider(-3)),
+    ],
+    "peaks": [
+        ("prominence", "Prominence", -50, 0, *_log_slider(-3)),
+        ("distance", "Distance", 1, 500, int, lambda d: int(d or 1)),
+    ],
+}
+
+STEPS: dict[str, tuple[str, Callable]] = {
+    "smooth": ("Smooth", smoothing),
+    "baseline": ("Baseline", baseline),
+    "peaks": ("Peaks", peaks_find),
+}
+
+
+class PreviewPanel(QtWidgets.QDockWidget):
+    """Dock with sliders for the smooth, baseline and peaks settings.
+
+    While a slider moves, the step is computed on a decimated copy of
+    the visible part of the selected Spectrum and drawn as a dashed
+    line. On release, or once the sliders rest, the step is computed on
+    the full resolution data. The previews run one at a time on their
+    own thread: a new request waits for the running one and replaces
+    the pending one, so only the latest settings are computed and drawn.
+    Nothing changes the data until the settings are applied.
+    """
+
+    def __init__(self, main: "QtMain") -> None:
+        super().__init__("Preview", main)
+        self.main = main
+        self.setObjectName("preview_dock")
+        self.setAllowedAreas(
+            QtCore.Qt.LeftDockWidgetArea | QtCore.Qt.RightDockWidgetArea
+        )
+
+        # Preview jobs run apart from the processing jobs, one at a time
+        self.pool = QtCore.QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        self.jobs = JobScheduler(self, pool=self.pool)
+        self.jobs.failed.connect(main.job_failed)
+
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(DEBOUNCE_MS)
+        self._timer.timeout.connect(lambda: self.request(full=False))
+
+        self._idle = QtCore.QTimer(self)
+        self._idle.setSingleShot(True)
+        self._idle.setInterval(IDLE_MS)
+        self._idle.timeout.connect(lambda: self.request(full=True))
+
+        # Preview artists, kept out of the legend
+        self.line = Line2D([], [], ls="--", lw=1, color="black", label="_preview")
+        self.markers = Line2D(
+            [], [], ls="", marker="x", color="black", label="_preview_peaks"
+        )
+
+        self.sliders: dict[str, dict[str, tuple[QtWidgets.QSlider, QtWidgets.QLabel]]]
+        self.sliders = {}
+        self._build()
+
+        self.visibilityChanged.connect(self._visibility_changed)
+
+    ## Widgets ##
+    def _build(self) -> None:
+        widget = QtWidgets.QWidget(self)
+        layout = QtWidgets.QVBoxLayout(widget)
+
+        self.combo_step = QtWidgets.QComboBox(widget)
+        self.pages = QtWidgets.QStackedWidget(widget)
+        for step, sliders in SLIDERS.items():
+            page = QtWidgets.QWidget(self.pages)
+            form = QtWidgets.QFormLayout(page)
+            self.sliders[step] = {}
+            for key, label, low, high, _, _ in sliders:
+                slider = QtWidgets.QSlider(QtCore.Qt.Horizontal, page)
+                slider.setRange(low, high)
+                value = QtWidgets.QLabel(page)
+                value.setMinimumWidth(60)
+
+                row = QtWidgets.QHBoxLayout()
+                row.addWidget(slider)
+                row.addWidget(value)
+                form.addRow(label, row)
+
+                slider.valueChanged.connect(self._moved)
+                slider.sliderReleased.connect(lambda: self.request(full=True))
+                self.sliders[step][key] = (slider, value)
+
+            self.combo_step.addItem(STEPS[step][0], step)
+            self.pages.addWidget(page)
+
+        self.combo_step.currentIndexChanged.connect(self._step_changed)
+
+        self.button_apply = QtWidgets.QPushButton("Apply", widget)
+        self.button_apply.setToolTip("Apply the step to the checked spectra")
+        self.button_apply.clicked.connect(lambda: self.apply())
+
+        # Only the pipeline memoizes the steps before the last one
+        self.button_replace = QtWidgets.QPushButton("Replace last step", widget)
+        self.button_replace.setToolTip(
+            "Replace the last step of the checked spectra if it is the same step"
+        )
+        self.button_replace.clicked.connect(lambda: self.apply(edit=True))
+        self.button_replace.setVisible(self.main.settings.history.mode == "pipeline")
+
+        layout.addWidget(self.combo_step)
+        layout.addWidget(self.pages)
+        layout.addWidget(self.button_apply)
+        layout.addWidget(self.button_replace)
+        layout.addStretch()
+        self.setWidget(widget)
+
+        self.load_settings()
+
+    @property
+    def step(self) -> str:
+        return self.combo_step.currentData()
+
+    def load_settings(self) -> None:
+        """Moves the sliders to the values of the settings."""
+        for step, sliders in SLIDERS.items():
+            params = self.main.settings[step]
+            for key, _, _, _, to_value, to_slider in sliders:
+                slider, label = self.sliders[step][key]
+                slider.blockSignals(True)
+                slider.setValue(to_slider(params[key]))
+                slider.blockSignals(False)
+                label.setText(f"{to_value(slider.value()):.4g}")
+
+    def params(self, step: str):
+        """Returns a copy of the settings of the step with the slider values."""
+        params = self.main.settings[step].copy()
+        for key, _, _, _, to_value, _ in SLIDERS[step]:
+            params[key] = to_value(self.sliders[step][key][0].value())
+        return params
+
+    ## Preview ##
+    def target(self) -> Optional[Spectrum]:
+        """The selected Spectrum if it is checked, else the first checked one."""
+        curves = self.main.curves
+        row = self.main.table.currentRow()
+        if 0 <= row < len(curves) and curves.at(row).tristate == 1:
+            return curves.at(row)
+        return next((sp for sp in curves.values() if sp.tristate == 1), None)
+
+    def _moved(self) -> None:
+        for key, _, _, _, to_value, _ in SLIDERS[self.step]:
+            slider, label = self.sliders[self.step][key]
+            label.setText(f"{to_value(slider.value()):.4g}")
+
+        # Keyboard and wheel changes have no release, the idle timer
+        # computes them in full once they stop
+        self._timer.start()
+        self._idle.start()
+
+    def _step_changed(self) -> None:
+        self.pages.setCurrentIndex(self.combo_step.currentIndex())
+        self.request(full=True)
+
+    def _visibility_changed(self, visible: bool) -> None:
+        if visible:
+            self.load_settings()
+            self.request(full=True)
+        else:
+            self.clear()
+
+    def request(self, full: bool) -> None:
+        """Computes the preview of the current step in the background.
+        The pending preview is dropped and the result of the running one
+        is discarded, it finishes before the new one starts.
+        """
+        try:
+            self._timer.stop()
+            if full:
+                self._idle.stop()
+            self.jobs.cancel()
+
+            sp = self.target()
+            if sp is None or not self.isVisible():
+                self.clear()
+                return
+
+            step = self.step
+            params = self.params(step)
+            x, y = sp.x_data, sp.y_data
+            dx, dy = sp.offset
+            if full:
+                x, y, stride = np.array(x), np.array(y), 1
+            else:
+                x0, x1 = self.main.canvas.axes.get_xlim()
+                view = visible_slice(x, x0 - dx, x1 - dx)
+                points = self.main.settings.general.preview_points
+                x, y, stride = decimate(x[view], y[view], points)
+            params = scale_params(step, params, stride)
+
+            self.jobs.submit(
+                keys=["preview"],
+                compute=lambda: preview_step(step, x, y, params),
+                apply=lambda result: self.draw(*result, offset=(dx, dy)),
+            )
+        except Exception as e:
+            raise CustomException(e)
+
+    def draw(
+        self,
+        x: np.ndarray,
+        y: np.ndarray,
+        peaks: Optional[np.ndarray],
+        offset: tuple[float, float],
+    ) -> None:
+        """Draws the preview line, or the peaks, on the Canvas."""
+        ax = self.main.canvas.axes
+        for artist in (self.line, self.markers):
+            # Clearing the Axes drops the artists
+            if artist not in ax.lines:
+                ax.add_line(artist)
+
+        dx, dy = offset
+        if peaks is None:
+            self.line.set_data(x + dx, y + dy)
+            self.markers.set_data([], [])
+        else:
+            self.line.set_data([], [])
+            self.markers.set_data(x[peaks] + dx, y[peaks] + dy)
+        self._update()
+
+    def clear(self) -> None:
+        """Removes the preview from the Canvas."""
+        self._timer.stop()
+        self._idle.stop()
+        self.jobs.cancel()
+        for artist in (self.line, self.markers):
+            if artist in self.main.canvas.axes.lines:
+                artist.remove()
+        self._update()
+
+    def _update(self) -> None:
+        main = self.main
+        canvas_update(main.canvas, main.xlabel, main.ylabel, main.title)
+
+    def apply(self, edit: bool = False) -> None:
+        """Keeps the slider values in the settings and processes the checked spectra.
+        With `edit` the step replaces the last one of the pipeline.
+        """
+        try:
+            step = self.step
+            params = self.params(step)
+            for key, _, _, _, _, _ in SLIDERS[step]:
+                self.main.settings[step][key] = params[key]
+
+            self.clear()
+            _, function = STEPS[step]
+            if function is peaks_find:
+                self.main.process_data(
+                    function, [self.main.settings.peaks, self.main.canvas]
+                )
+            else:
+                self.main.process_data(function, self.main.settings[step], edit=edit)
+        except Exception as e:
+            raise CustomException(e)
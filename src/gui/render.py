@@ -0,0 +1,81 @@
+"""Render scheduler for the Canvas of the main app."""
+
+from typing import TYPE_CHECKING, Optional
+
+from PyQt5 import QtCore
+
+from ..functions.canvas import canvas_render
+
+if TYPE_CHECKING:
+    from .canvas import Canvas
+
+# Minimum time between two draws (~60 frames per second)
+FRAME_MS = 16
+
+
+class RenderScheduler(QtCore.QObject):
+    """Coalesces the update requests of the Canvas
+    into at most one draw per frame.
+    """
+
+    def __init__(self, canvas: "Canvas") -> None:
+        super().__init__(canvas)
+        self.canvas = canvas
+
+        # Dirty state
+        self._labels: Optional[tuple[str, str, str]] = None
+        self._layout: bool = False
+
+        # Counters
+        self.requested: int = 0
+        self.performed: int = 0
+
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(FRAME_MS)
+        self._timer.timeout.connect(self.flush)
+
+    @property
+    def skipped(self) -> int:
+        """Number of requests merged into another draw."""
+        return self.requested - self.performed - self._timer.isActive()
+
+    def stats(self) -> dict[str, int]:
+        """Returns the draws requested, performed and skipped."""
+        return {
+            "requested": self.requested,
+            "performed": self.performed,
+            "skipped": self.skipped,
+        }
+
+    def request(self, xlabel: str, ylabel: str, title: str) -> None:
+        """Marks the labels and lines as dirty."""
+        self._labels = (xlabel, ylabel, title)
+        self._schedule()
+
+    def request_layout(self) -> None:
+        """Marks the figure layout as dirty."""
+        self._layout = True
+        self._schedule()
+
+    def _schedule(self) -> None:
+        self.requested += 1
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def flush(self) -> None:
+        """Draws the Canvas now if anything is dirty."""
+        self._timer.stop()
+        if self._labels is None and not self._layout:
+            return
+
+        if self._layout:
+            self.canvas.fig.tight_layout(pad=1)
+            self._layout = False
+
+        if self._labels is not None:
+            canvas_render(self.canvas, *self._labels)
+            self._labels = None
+
+        self.canvas.draw()
+        self.performed += 1
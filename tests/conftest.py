@@ -0,0 +1,25 @@
+"""Fixtures of the tests, the windows are created without a display."""
+
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import pytest
+from omegaconf import OmegaConf
+
+CONFIG = os.path.join(os.path.dirname(__file__), "..", "src", "conf", "config.yaml")
+
+
+@pytest.fixture
+def settings():
+    return OmegaConf.load(CONFIG)
+
+
+@pytest.fixture
+def window(qtbot, settings):
+    from src.gui.main_window import QtMain
+
+    window = QtMain(settings=settings)
+    qtbot.addWidget(window)
+    yield window
+    window.scheduler.wait()
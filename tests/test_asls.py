@@ -0,0 +1,34 @@
+"""Banded AsLS engine against the sparse solver it replaces."""
+
+import numpy as np
+import pytest
+from scipy import sparse
+
+from benchmarks.bench_baseline import asls_sparse
+from benchmarks.bench_baseline import synthetic_spectrum
+from src.functions.asls import asls
+from src.functions.asls import penalty_bands
+
+
+@pytest.mark.parametrize("length", [3, 4, 5, 6, 10, 101])
+def test_penalty_bands(length):
+    D = sparse.diags([1.0, -2.0, 1.0], [0, -1, -2], shape=(length, length - 2)).toarray()
+    penalty = 10.0 * D @ D.T
+    bands = penalty_bands(length, 10.0)
+    for k in range(3):
+        assert np.array_equal(bands[k, : length - k], np.diag(penalty, -k))
+        assert not bands[k, length - k :].any()
+
+
+def test_penalty_bands_too_short():
+    with pytest.raises(ValueError):
+        penalty_bands(2, 10.0)
+
+
+@pytest.mark.parametrize("length", [3, 4, 5, 10, 500, 3000])
+@pytest.mark.parametrize("lam, p, niter", [(1e4, 0.001, 10), (1e2, 0.05, 3)])
+def test_asls_matches_spsolve(length, lam, p, niter):
+    y = synthetic_spectrum(length, seed=length)
+    np.testing.assert_allclose(
+        asls(y, lam, p, niter), asls_sparse(y, lam, p, niter), rtol=1e-8, atol=1e-8
+    )
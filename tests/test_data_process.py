@@ -0,0 +1,77 @@
+"""Loading of the CSV files and their cache."""
+
+import os
+
+import numpy as np
+import pytest
+
+from src.functions import data_process
+from src.functions.data_process import csv_to_arrays
+
+
+@pytest.fixture
+def csv(tmp_path):
+    path = tmp_path / "a.csv"
+    x = np.linspace(0, 1, 50)
+    data = np.column_stack([x, x**2])
+    np.savetxt(path, data, delimiter=",", header="x,y", comments="")
+    return str(path)
+
+
+def load(csv: str, cache: str, dtype: str = "float64"):
+    return csv_to_arrays(csv, sep=",", engine="c", cache_dir=cache, dtype=dtype)
+
+
+def test_cache(csv, tmp_path):
+    cache = str(tmp_path / "cache")
+    x, y, label, cached = load(csv, cache)
+    assert label.endswith("a") and not cached
+    assert np.allclose(y, x**2)
+
+    x2, y2, _, cached = load(csv, cache)
+    assert cached
+    assert np.array_equal(x2, x) and np.array_equal(y2, y)
+
+
+def test_cache_per_dtype(csv, tmp_path):
+    cache = str(tmp_path / "cache")
+    load(csv, cache, "float64")
+    _, y, _, _ = load(csv, cache, "float32")
+    assert y.dtype == np.float32
+    assert len(os.listdir(cache)) == 2
+
+    # Switching the dtype back uses the cache of each dtype
+    assert load(csv, cache, "float64")[3]
+    assert load(csv, cache, "float32")[3]
+
+
+def test_stale_cache_removed(csv, tmp_path):
+    cache = str(tmp_path / "cache")
+    load(csv, cache, "float64")
+    load(csv, cache, "float32")
+    with open(csv, "a") as f:
+        f.write("2.0,4.0\n")
+    os.utime(csv, ns=(0, 0))
+
+    x, _, _, cached = load(csv, cache, "float64")
+    assert not cached and x[-1] == 2.0
+    names = os.listdir(cache)
+    assert len(names) == 2
+    assert data_process.cache_path(csv, cache, "float64") in [
+        os.path.join(cache, name) for name in names
+    ]
+
+
+def test_stale_cache_in_use(csv, tmp_path, monkeypatch):
+    cache = str(tmp_path / "cache")
+    load(csv, cache)
+    os.utime(csv, ns=(0, 0))
+
+    # A sidecar mapped by another load cannot be removed on Windows
+    def remove(path):
+        raise PermissionError(path)
+
+    monkeypatch.setattr(data_process.os, "remove", remove)
+    assert not load(csv, cache)[3]
+    monkeypatch.undo()
+    assert load(csv, cache)[3]
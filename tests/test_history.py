@@ -0,0 +1,158 @@
+"""Record, undo and redo of the replay history mode."""
+
+import numpy as np
+import pytest
+
+from src.classes.history import ReplayHistory
+from src.classes.spectra import Spectrum
+from src.functions.spectra_process import norm_min_max
+from src.functions.spectra_process import smoothing
+
+# Names of the kernels computed, in order
+CALLS: list[str] = []
+
+
+def scale_rows(y: np.ndarray, params: float) -> np.ndarray:
+    CALLS.append("scale")
+    return y * params
+
+
+def shift_rows(y: np.ndarray, params: float) -> np.ndarray:
+    CALLS.append("shift")
+    return y + params
+
+
+@pytest.fixture(autouse=True)
+def calls():
+    CALLS.clear()
+    yield CALLS
+
+
+@pytest.fixture
+def sp():
+    x = np.linspace(0, 1, 100)
+    return Spectrum.from_arrays([(x, np.sin(x), "s")])[0]
+
+
+def apply(history: ReplayHistory, sp: Spectrum, kernel, params) -> None:
+    """Applies and records an operation as the GUI does."""
+    sp.y = kernel(sp.y[np.newaxis], params)[0]
+    history.record(sp, kernel, params)
+
+
+def test_record_undo_redo(sp, calls):
+    history = ReplayHistory(checkpoint_interval=10, budget=2**20)
+    apply(history, sp, scale_rows, 2.0)
+    apply(history, sp, shift_rows, 1.0)
+    assert history.operations(sp) == ([(scale_rows, 2.0), (shift_rows, 1.0)], 2)
+
+    sp.y = history.undo(sp)
+    assert np.allclose(sp.y, sp.y_orig * 2)
+    sp.y = history.undo(sp)
+    assert np.allclose(sp.y, sp.y_orig)
+    assert np.array_equal(history.undo(sp), sp.y)
+
+    sp.y = history.redo(sp)
+    assert np.allclose(sp.y, sp.y_orig * 2)
+    sp.y = history.redo(sp)
+    assert np.allclose(sp.y, sp.y_orig * 2 + 1)
+    assert history.redo(sp) is None
+
+
+def test_record_drops_redo(sp):
+    history = ReplayHistory(checkpoint_interval=1, budget=2**20)
+    apply(history, sp, scale_rows, 2.0)
+    apply(history, sp, shift_rows, 1.0)
+    sp.y = history.undo(sp)
+
+    apply(history, sp, scale_rows, 3.0)
+    assert history.operations(sp) == ([(scale_rows, 2.0), (scale_rows, 3.0)], 2)
+    assert history.redo(sp) is None
+    sp.y = history.undo(sp)
+    assert np.allclose(sp.y, sp.y_orig * 2)
+
+
+def test_undo_from_checkpoint(sp, calls):
+    history = ReplayHistory(checkpoint_interval=2, budget=2**20)
+    for i in range(5):
+        apply(history, sp, shift_rows, float(i))
+    assert history.nbytes == 2 * sp.y.nbytes
+
+    # Back to 3 operations: replayed from the checkpoint after 2
+    calls.clear()
+    sp.y = history.undo(sp)
+    sp.y = history.undo(sp)
+    assert calls == ["shift"]
+    assert np.allclose(sp.y, sp.y_orig + 3)
+
+
+def test_undo_after_eviction(sp, calls):
+    # Room for one checkpoint, the newest evicts the others
+    history = ReplayHistory(checkpoint_interval=1, budget=sp.y.nbytes)
+    for i in range(3):
+        apply(history, sp, shift_rows, float(i + 1))
+    assert history.nbytes == sp.y.nbytes
+
+    # Only the checkpoint after 3 operations is left, the state after 1
+    # is replayed from y_orig
+    calls.clear()
+    sp.y = history.undo(sp)
+    assert np.allclose(sp.y, sp.y_orig + 3)
+    assert calls == ["shift", "shift"]
+    assert history.nbytes <= history.budget
+
+    calls.clear()
+    sp.y = history.undo(sp)
+    assert np.allclose(sp.y, sp.y_orig + 1)
+    assert calls == ["shift"]
+
+
+def test_trim(sp):
+    history = ReplayHistory(checkpoint_interval=1, budget=2**20)
+    for i in range(4):
+        apply(history, sp, shift_rows, 1.0)
+    history.trim(sp.y.nbytes)
+    assert history.nbytes == sp.y.nbytes
+    history.trim(0)
+    assert history.nbytes == 0
+    assert np.allclose(history.state(sp, 2), sp.y_orig + 2)
+
+
+def test_restore(sp):
+    history = ReplayHistory(checkpoint_interval=1, budget=2**20)
+    apply(history, sp, scale_rows, 2.0)
+    ops, position = history.operations(sp)
+
+    restored = ReplayHistory(checkpoint_interval=1, budget=2**20)
+    restored.restore(sp, ops, position)
+    sp.y = restored.undo(sp)
+    assert np.allclose(sp.y, sp.y_orig)
+    sp.y = restored.redo(sp)
+    assert np.allclose(sp.y, sp.y_orig * 2)
+
+
+def test_new_step_clears_redo_stack(window, settings):
+    window.settings.history.mode = "replay"
+    window.history = window.new_history()
+    x = np.linspace(0, 10, 500)
+    window.plot(x=x, y=np.sin(x) + x, label="s", ax=window.canvas.axes)
+    sp = window.curves.values()[0]
+
+    window.process_data(smoothing, settings.smooth)
+    window.scheduler.wait()
+    window.undo()
+    assert len(window.redo_stack) == 1
+
+    window.process_data(norm_min_max, None)
+    window.scheduler.wait()
+    assert window.redo_stack == []
+    window.redo()
+    assert window.history.operations(sp)[1] == 1
+
+    # Applying offsets is a new step too
+    window.undo()
+    assert len(window.redo_stack) == 1
+    sp.set_offset(0.0, 1.0)
+    window.apply_offsets()
+    assert window.redo_stack == []
+    assert window.history.operations(sp)[1] == 1
@@ -0,0 +1,63 @@
+"""Memory accounting of the arrays, spectra and sessions."""
+
+import numpy as np
+from PyQt5 import QtWidgets
+
+from src.classes.memory import held_bytes
+from src.classes.peaks import ManualPeaks
+from src.classes.spectra import Spectrum
+from src.functions.session import write_session
+from src.functions.spectra_process import norm_min_max
+
+STATE = {
+    "title": "",
+    "xlabel": "",
+    "ylabel": "",
+    "legend": False,
+    "x_lim": [0.0, 10.0],
+    "y_lim": [-1.0, 1.0],
+}
+
+
+def test_held_bytes_of_maps(tmp_path):
+    path = str(tmp_path / "a.npy")
+    np.save(path, np.arange(1000.0))
+
+    # Read-only maps hold no memory, copy-on-write maps are counted
+    assert held_bytes(np.load(path, mmap_mode="r"), set()) == 0
+    assert held_bytes(np.load(path, mmap_mode="c"), set()) == 8000
+    assert held_bytes(np.load(path, mmap_mode="c")[::2], set()) == 8000
+
+
+def test_held_bytes_counts_shared_memory_once():
+    a = np.zeros((4, 100))
+    seen: set[int] = set()
+    assert held_bytes([a[0], a[1], (a[2], {"a": a})], seen) == a.nbytes
+    assert held_bytes(a, seen) == 0
+
+
+def test_processed_session(tmp_path, window, monkeypatch):
+    path = str(tmp_path / "a.spectra")
+    x = np.linspace(0, 10, 5000)
+    data = [(x, np.sin(x * (i + 1)), f"s{i}") for i in range(4)]
+    write_session(path, Spectrum.from_arrays(data), ManualPeaks(), STATE)
+    monkeypatch.setattr(
+        QtWidgets.QFileDialog, "getOpenFileName", lambda *args, **kwargs: (path, "")
+    )
+    window.open_session()
+    spectra = window.curves.values()
+    assert window.memory_usage()["curves"] == sum(sp.nbytes for sp in spectra)
+
+    window.process_data(norm_min_max, None)
+    window.scheduler.wait()
+    usage = window.memory_usage()
+    assert usage["curves"] == sum(sp.nbytes for sp in spectra)
+
+    # The y data before and after of each spectrum
+    assert usage["undo"] == 2 * sum(sp.y_data.nbytes for sp in spectra)
+    assert usage["total"] >= usage["curves"] + usage["undo"]
+
+    # Capped at the size of the curves, every undo entry is freed
+    window.settings.memory.cap_mb = usage["curves"] / 2**20
+    window.enforce_memory_cap()
+    assert window.undo_stack == []
@@ -0,0 +1,52 @@
+"""Display offsets of the lines and their spinboxes."""
+
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def spectra(window):
+    x = np.linspace(0, 10, 200)
+    for i in range(2):
+        window.plot(x=x, y=np.sin(x) + i, label=f"s{i}", ax=window.canvas.axes)
+    return window.curves.values()
+
+
+def spinboxes(window) -> tuple[float, float]:
+    return window.doubleSpinBox_x_axis.value(), window.doubleSpinBox_y_axis.value()
+
+
+def test_apply_and_undo(window, spectra):
+    y = [sp.y_data.copy() for sp in spectra]
+    window.doubleSpinBox_y_axis.setValue(2.0)
+    assert [sp.offset for sp in spectra] == [(0.0, 2.0), (0.0, 2.0)]
+
+    window.apply_offsets()
+    assert spinboxes(window) == (0.0, 0.0)
+    for sp, y0 in zip(spectra, y):
+        assert np.allclose(sp.y_data, y0 + 2.0) and sp.offset == (0.0, 0.0)
+
+    window.undo()
+    assert spinboxes(window) == (0.0, 2.0)
+    for sp, y0 in zip(spectra, y):
+        assert np.allclose(sp.y_data, y0) and sp.offset == (0.0, 2.0)
+
+    window.redo()
+    assert spinboxes(window) == (0.0, 0.0)
+    for sp, y0 in zip(spectra, y):
+        assert np.allclose(sp.y_data, y0 + 2.0)
+
+
+def test_undo_different_offsets(window, spectra):
+    spectra[0].set_offset(1.0, 2.0)
+    spectra[1].set_offset(1.0, 3.0)
+    window.apply_offsets()
+    window.undo()
+
+    # The x offset is shared, the y offsets are not
+    assert spinboxes(window) == (1.0, 0.0)
+    assert [sp.offset for sp in spectra] == [(1.0, 2.0), (1.0, 3.0)]
+
+    # Moving along x keeps the y offset of each spectrum
+    window.doubleSpinBox_x_axis.setValue(1.5)
+    assert [sp.offset for sp in spectra] == [(1.5, 2.0), (1.5, 3.0)]
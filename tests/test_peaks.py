@@ -0,0 +1,98 @@
+"""Shared marker collection of the peaks."""
+
+import numpy as np
+import pytest
+from matplotlib.figure import Figure
+
+from src.classes.peaks import PeakLayer
+
+
+@pytest.fixture
+def layer():
+    # Small capacity, so the arrays grow in the tests
+    return PeakLayer(Figure().add_subplot(111), capacity=4)
+
+
+def peaks(owner: int, n: int) -> tuple[np.ndarray, np.ndarray]:
+    """Peaks telling their owner and their index apart."""
+    x = np.arange(n, dtype=float) + 100 * owner
+    return x, -x
+
+
+def check(layer: PeakLayer, expected: dict[int, int]) -> None:
+    """Checks the layer holds the `expected` number of peaks of each owner."""
+    assert layer.size == sum(expected.values())
+    owners = sorted(owner for owner, n in expected.items() if n)
+    assert sorted(set(layer.owners.tolist())) == owners
+    for owner, n in expected.items():
+        rows = np.flatnonzero(layer.owners == owner)
+        # One contiguous slice per owner
+        assert rows.size == n
+        assert n == 0 or np.array_equal(rows, np.arange(rows[0], rows[0] + n))
+        x, y = peaks(owner, n)
+        assert np.array_equal(layer.offsets[rows], np.column_stack([x, y]))
+    assert np.array_equal(layer.collection.get_offsets(), layer.offsets)
+
+
+def test_set(layer):
+    for owner, n in [(1, 2), (2, 3), (3, 1)]:
+        layer.set(owner, *peaks(owner, n))
+    check(layer, {1: 2, 2: 3, 3: 1})
+    assert 2 in layer and 4 not in layer
+
+
+def test_remove_middle_owner(layer):
+    for owner, n in [(1, 2), (2, 3), (3, 4), (4, 1)]:
+        layer.set(owner, *peaks(owner, n))
+    layer.remove(2)
+    check(layer, {1: 2, 3: 4, 4: 1})
+    assert 2 not in layer
+
+    # The spans moved down are still the ones of their owner
+    layer.set_visible(3, False)
+    alpha = layer.collection.get_facecolor()[:, 3]
+    assert np.array_equal(alpha, np.where(layer.owners == 3, 0.0, 1.0))
+    layer.remove(4)
+    check(layer, {1: 2, 3: 4})
+
+
+def test_remove_first_and_last_owner(layer):
+    for owner, n in [(1, 2), (2, 3), (3, 1)]:
+        layer.set(owner, *peaks(owner, n))
+    layer.remove(1)
+    check(layer, {2: 3, 3: 1})
+    layer.remove(3)
+    check(layer, {2: 3})
+    layer.remove(3)
+    check(layer, {2: 3})
+
+
+@pytest.mark.parametrize("n", [1, 2, 5])
+def test_resize_owner(layer, n):
+    for owner, size in [(1, 2), (2, 3), (3, 4)]:
+        layer.set(owner, *peaks(owner, size))
+    layer.set(2, *peaks(2, n))
+    check(layer, {1: 2, 2: n, 3: 4})
+
+    layer.remove(1)
+    check(layer, {2: n, 3: 4})
+    layer.set(3, *peaks(3, 1))
+    check(layer, {2: n, 3: 1})
+
+
+def test_same_size_in_place(layer):
+    for owner, n in [(1, 2), (2, 3)]:
+        layer.set(owner, *peaks(owner, n))
+    rows = np.flatnonzero(layer.owners == 1)
+    x, y = peaks(1, 2)
+    layer.set(1, x + 0.5, y)
+    assert np.array_equal(np.flatnonzero(layer.owners == 1), rows)
+    assert np.array_equal(layer.offsets[rows, 0], x + 0.5)
+
+
+def test_clear(layer):
+    layer.set(1, *peaks(1, 3))
+    layer.clear()
+    check(layer, {})
+    layer.set(2, *peaks(2, 2))
+    check(layer, {2: 2})
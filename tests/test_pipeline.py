@@ -0,0 +1,171 @@
+"""Evaluation, memo and undo of the pipeline history mode."""
+
+import numpy as np
+import pytest
+
+from src.classes.pipeline import Pipeline
+from src.classes.spectra import Spectrum
+from src.functions.spectra_process import norm_min_max
+from src.functions.spectra_process import smoothing
+
+# Names of the kernels computed, in order
+CALLS: list[str] = []
+
+
+def scale_rows(y: np.ndarray, params: float) -> np.ndarray:
+    CALLS.append("scale")
+    return y * params
+
+
+def shift_rows(y: np.ndarray, params: float) -> np.ndarray:
+    CALLS.append("shift")
+    return y + params
+
+
+@pytest.fixture(autouse=True)
+def calls():
+    CALLS.clear()
+    yield CALLS
+
+
+@pytest.fixture
+def sp():
+    x = np.linspace(0, 1, 100)
+    return Spectrum.from_arrays([(x, np.sin(x), "s")])[0]
+
+
+def apply(pipeline: Pipeline, sp: Spectrum, kernel, params) -> None:
+    """Applies and records an operation as the GUI does."""
+    sp.y = pipeline.evaluate(sp, (kernel, params))
+    pipeline.record(sp, kernel, params)
+
+
+def test_evaluate(sp):
+    pipeline = Pipeline(budget=2**20)
+    apply(pipeline, sp, scale_rows, 2.0)
+    apply(pipeline, sp, shift_rows, 1.0)
+    assert np.allclose(sp.y, sp.y_orig * 2 + 1)
+    assert np.array_equal(pipeline.evaluate(sp), sp.y)
+    assert [kernel for kernel, _ in sp.chain.active] == [scale_rows, shift_rows]
+
+
+def test_memo_reuse(sp, calls):
+    pipeline = Pipeline(budget=2**20)
+    apply(pipeline, sp, scale_rows, 2.0)
+    apply(pipeline, sp, shift_rows, 1.0)
+    assert calls == ["scale", "shift"]
+
+    # Only the step after the memoized prefix is computed
+    calls.clear()
+    pipeline.evaluate(sp, (shift_rows, 3.0))
+    assert calls == ["shift"]
+
+    # Without the memo, the chain is computed from the original data
+    calls.clear()
+    pipeline.trim(0)
+    assert pipeline.nbytes == 0
+    assert np.allclose(pipeline.evaluate(sp), sp.y_orig * 2 + 1)
+    assert calls == ["scale", "shift"]
+
+
+def test_same_data_shares_the_memo(calls):
+    x = np.linspace(0, 1, 100)
+    a, b = Spectrum.from_arrays([(x, np.cos(x), "a"), (x, np.cos(x), "b")])
+    pipeline = Pipeline(budget=2**20)
+    apply(pipeline, a, scale_rows, 2.0)
+    calls.clear()
+    assert np.array_equal(pipeline.evaluate(b, (scale_rows, 2.0)), a.y)
+    assert calls == []
+
+
+def test_undo_redo(sp, calls):
+    pipeline = Pipeline(budget=2**20)
+    apply(pipeline, sp, scale_rows, 2.0)
+    apply(pipeline, sp, shift_rows, 1.0)
+
+    calls.clear()
+    sp.y = pipeline.undo(sp)
+    assert np.allclose(sp.y, sp.y_orig * 2)
+    sp.y = pipeline.undo(sp)
+    assert np.allclose(sp.y, sp.y_orig)
+    assert np.array_equal(pipeline.undo(sp), sp.y)
+    assert sp.chain.position == 0
+
+    sp.y = pipeline.redo(sp)
+    sp.y = pipeline.redo(sp)
+    assert np.allclose(sp.y, sp.y_orig * 2 + 1)
+    assert pipeline.redo(sp) is None
+    assert calls == []
+
+    # A new operation drops the ones that could be redone
+    sp.y = pipeline.undo(sp)
+    apply(pipeline, sp, scale_rows, 3.0)
+    assert len(sp.chain.ops) == 2 and pipeline.redo(sp) is None
+    assert np.allclose(sp.y, sp.y_orig * 6)
+
+
+def test_edit(sp, calls):
+    pipeline = Pipeline(budget=2**20)
+    apply(pipeline, sp, scale_rows, 2.0)
+    apply(pipeline, sp, shift_rows, 1.0)
+
+    # The last step is computed again from the memoized prefix
+    calls.clear()
+    sp.y = pipeline.evaluate(sp, (shift_rows, 5.0), replace=True)
+    assert calls == ["shift"]
+    old = pipeline.edit(sp, shift_rows, 5.0)
+    assert old == (shift_rows, 1.0)
+    assert np.allclose(sp.y, sp.y_orig * 2 + 5)
+    assert sp.chain.active == [(scale_rows, 2.0), (shift_rows, 5.0)]
+
+    # Undoing the edit, as the "Edit Step" entries do, computes nothing
+    calls.clear()
+    sp.y = pipeline.evaluate(sp, old, replace=True)
+    assert pipeline.edit(sp, *old) == (shift_rows, 5.0)
+    assert np.allclose(sp.y, sp.y_orig * 2 + 1)
+    assert calls == []
+    assert np.allclose(pipeline.undo(sp), sp.y_orig * 2)
+
+
+def test_budget(sp):
+    pipeline = Pipeline(budget=2 * sp.y.nbytes)
+    for i in range(5):
+        apply(pipeline, sp, shift_rows, float(i))
+    assert pipeline.nbytes <= 2 * sp.y.nbytes
+    assert np.allclose(pipeline.evaluate(sp), sp.y_orig + 10)
+
+
+def test_restore(sp):
+    pipeline = Pipeline(budget=2**20)
+    apply(pipeline, sp, scale_rows, 2.0)
+    apply(pipeline, sp, shift_rows, 1.0)
+    keys = list(sp.chain.keys)
+    ops, position = pipeline.operations(sp)
+
+    restored = Pipeline(budget=2**20)
+    restored.restore(sp, ops, position - 1)
+    assert sp.chain.keys == keys
+    assert np.allclose(restored.evaluate(sp), sp.y_orig * 2)
+
+
+def test_replace_after_queued_step(window, settings):
+    # The step replaced is the one of the job queued before
+    window.settings.history.mode = "pipeline"
+    window.history = window.new_history()
+    x = np.linspace(0, 10, 500)
+    window.plot(x=x, y=np.sin(x) + x, label="s", ax=window.canvas.axes)
+    sp = window.curves.values()[0]
+
+    window.process_data(norm_min_max, None)
+    window.scheduler.wait()
+    smooth = settings.smooth.copy()
+    smooth.window_length = 21
+    window.process_data(smoothing, settings.smooth)
+    window.process_data(smoothing, smooth, edit=True)
+    window.scheduler.wait()
+
+    ops = sp.chain.active
+    assert len(ops) == 2
+    assert ops[1][1].window_length == 21
+    names = [actions[0] for actions in window.undo_stack]
+    assert names == ["Normalize Min-Max", "Smooth", "Edit Step"]
@@ -0,0 +1,200 @@
+"""Round trip of the session files, without Qt."""
+
+import numpy as np
+import pytest
+from matplotlib.figure import Figure
+from omegaconf import OmegaConf
+
+from src.classes.history import ReplayHistory
+from src.classes.peaks import ManualPeaks
+from src.classes.peaks import PeakLayer
+from src.classes.peaks import Peaks
+from src.classes.pipeline import Pipeline
+from src.classes.spectra import Spectrum
+from src.classes.store import mapped_from
+from src.exceptions.exception import CustomException
+from src.functions.kernels import min_max_rows
+from src.functions.kernels import savgol_rows
+from src.functions.session import read_session
+from src.functions.session import write_session
+
+SMOOTH = OmegaConf.create(
+    {"window_length": 11, "polyorder": 3, "deriv": 0, "delta": 1, "axis": -1}
+)
+STATE = {
+    "title": "Title",
+    "xlabel": "x",
+    "ylabel": "y",
+    "x_lim": [0.0, 10.0],
+    "y_lim": [-1.0, 2.0],
+    "legend": True,
+}
+
+
+def new_layer() -> PeakLayer:
+    return PeakLayer(Figure().add_subplot(111))
+
+
+def new_spectra(layer: PeakLayer) -> list:
+    """Spectra of different sizes, one with peaks and one with a level of detail."""
+    rng = np.random.default_rng(0)
+    data = []
+    for i, size in enumerate([200, 500, 1000]):
+        x = np.linspace(0, 10, size)
+        data.append((x, np.sin(x * (i + 1)) + rng.random(size), f"s{i}"))
+    spectra = Spectrum.from_arrays(data)
+
+    peaks = Peaks(layer, spectra[0].id, np.array([1.0, 2.0]), np.array([0.5, 0.7]), "p0")
+    spectra[0].add_peaks(peaks)
+    spectra[1].set_offset(1.5, -0.5)
+    spectra[1].tristate = 0
+    spectra[2].enable_lod()
+    spectra[2].color = (0.1, 0.2, 0.3)
+    return spectra
+
+
+def new_history(mode: str) -> ReplayHistory | Pipeline:
+    if mode == "replay":
+        return ReplayHistory(checkpoint_interval=1, budget=2**20)
+    return Pipeline(budget=2**20)
+
+
+def process(sp, kernel, params, history) -> None:
+    """Applies an operation as the GUI does in the history modes."""
+    sp.y = kernel(sp.y[np.newaxis], params)[0]
+    history.record(sp, kernel, params)
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "a.spectra")
+    spectra = new_spectra(new_layer())
+    my_peaks = ManualPeaks()
+    my_peaks.append(3.0, 0.25)
+    my_peaks.append(4.0, 0.75)
+    write_session(path, spectra, my_peaks, STATE)
+
+    session = read_session(path, new_layer())
+    assert session.state == STATE
+    assert np.array_equal(session.my_peaks.xy, my_peaks.xy)
+    assert session.undo_stack == session.redo_stack == []
+
+    for old, new in zip(spectra, session.spectra, strict=True):
+        assert new.label == old.label
+        assert new.tristate == old.tristate
+        assert new.color == old.color
+        assert new.offset == old.offset
+        assert np.array_equal(new.x_data, old.x_data)
+        assert np.array_equal(new.y_data, old.y_data)
+        assert np.array_equal(new.y_orig, old.y_orig)
+        assert new.has_peaks == old.has_peaks
+        if old.has_peaks:
+            assert new.peaks.name == old.peaks.name
+            assert np.array_equal(new.peaks.x, old.peaks.x)
+            assert np.array_equal(new.peaks.y, old.peaks.y)
+        assert (new.lod is None) == (old.lod is None)
+        if old.lod is not None:
+            assert len(new.lod.levels) == len(old.lod.levels)
+            for a, b in zip(new.lod.levels[1:], old.lod.levels[1:]):
+                assert np.array_equal(a[0], b[0]) and np.array_equal(a[1], b[1])
+
+
+@pytest.mark.parametrize("mode", ["replay", "pipeline"])
+def test_undo_after_reopening(tmp_path, mode):
+    path = str(tmp_path / "a.spectra")
+    spectra = new_spectra(new_layer())
+    history = new_history(mode)
+    undo_stack = []
+    states = [[sp.y.copy() for sp in spectra]]
+    operations = [
+        ("Smooth", savgol_rows, SMOOTH),
+        ("Normalize Min-Max", min_max_rows, None),
+    ]
+    for name, kernel, params in operations:
+        for sp in spectra:
+            process(sp, kernel, params, history)
+            undo_stack.append((name, None, None, sp))
+        states.append([sp.y.copy() for sp in spectra])
+
+    # The last operation is undone before saving, it can be redone after
+    redo_stack = [undo_stack.pop() for _ in spectra]
+    for sp in spectra:
+        sp.y = history.undo(sp)
+    write_session(
+        path, spectra, ManualPeaks(), STATE, history, undo_stack, redo_stack
+    )
+
+    history = new_history(mode)
+    session = read_session(path, new_layer(), history)
+    reopened = session.spectra
+    index = {sp.id: i for i, sp in enumerate(spectra)}
+    assert [(a[0], reopened.index(a[3])) for a in session.undo_stack] == [
+        (a[0], index[a[3].id]) for a in undo_stack
+    ]
+    assert len(session.redo_stack) == len(redo_stack)
+
+    for sp, y in zip(reopened, states[1]):
+        assert np.allclose(sp.y, y)
+        y = history.redo(sp)
+        assert y is not None
+        sp.y = y
+    for sp, y in zip(reopened, states[2]):
+        assert np.allclose(sp.y, y)
+    for _ in range(2):
+        for sp in reopened:
+            sp.y = history.undo(sp)
+    for sp, y in zip(reopened, states[0]):
+        assert np.allclose(sp.y, y)
+
+
+def test_file_unchanged_by_edits(tmp_path):
+    path = tmp_path / "a.spectra"
+    spectra = new_spectra(new_layer())
+    write_session(str(path), spectra, ManualPeaks(), STATE)
+    written = path.read_bytes()
+
+    session = read_session(str(path), new_layer())
+    for sp in session.spectra:
+        sp.y = sp.y * 2 + 1
+        sp.apply_offset()
+        sp.x_data[0] = -1.0
+    session.spectra[0].peaks.x[:] = 0.0
+    assert session.spectra[2].y_data[0] == 2 * spectra[2].y_data[0] + 1
+
+    assert path.read_bytes() == written
+    reopened = read_session(str(path), new_layer())
+    for old, new in zip(spectra, reopened.spectra):
+        assert np.array_equal(new.x_data, old.x_data)
+        assert np.array_equal(new.y_data, old.y_data)
+
+
+def test_save_over_open_session(tmp_path):
+    path = str(tmp_path / "a.spectra")
+    write_session(path, new_spectra(new_layer()), ManualPeaks(), STATE)
+
+    session = read_session(path, new_layer())
+    spectra = session.spectra
+    for sp in spectra:
+        sp.y = sp.y * 2
+    expected = [sp.y.copy() for sp in spectra]
+    write_session(path, spectra, ManualPeaks(), STATE)
+
+    # Nothing keeps the replaced file mapped
+    for sp in spectra:
+        assert not mapped_from(sp.x_data, path)
+        assert not mapped_from(sp.y_orig, path)
+        assert sp.lod is None or not mapped_from(sp.lod.x, path)
+    assert not (tmp_path / "a.spectra.tmp").exists()
+
+    reopened = read_session(path, new_layer())
+    for sp, y in zip(reopened.spectra, expected):
+        assert np.array_equal(sp.y, y)
+    assert reopened.spectra[2].lod is not None
+
+
+def test_failed_save_leaves_no_temp_file(tmp_path):
+    # A folder cannot be replaced by a file
+    path = tmp_path / "a.spectra"
+    path.mkdir()
+    with pytest.raises(CustomException):
+        write_session(str(path), new_spectra(new_layer()), ManualPeaks(), STATE)
+    assert not (tmp_path / "a.spectra.tmp").exists()